@@ -1,104 +1,304 @@
+import io
+import os
 import re
-import PyPDF2
-import openpyxl
-from docx import Document # Importa a biblioteca para trabalhar com .docx
-from docx.shared import Inches # Para unidades de medida em .docx
+import copy
+import contextlib
+import threading
+import time
 import datetime # Para manipulação de datas
+# PyPDF2, openpyxl e python-docx (com o lxml) são importados dentro das funções que
+# os usam: este módulo é importado pelos blueprints, e carregá-los no boot atrasa a
+# subida de todos os workers, inclusive dos que só atendem pedidos.
 
 # ==============================================================================
 # FUNÇÃO 1: Extrai o texto bruto do PDF
 # ==============================================================================
-def extrair_texto_de_pdf(caminho_do_pdf):
+# Quantos caracteres do final de uma página entram na busca de 'parar_apos' na página seguinte
+TAMANHO_SOBREPOSICAO_PAGINAS = 200
+
+class LimiteDoPdfExcedido(ValueError):
+    """O PDF passou de algum limite de processamento (ex: número de páginas)."""
+
+def _abrir_pdf(origem):
+    """Abre a origem do PDF: caminho, bytes (ou memoryview) ou arquivo binário já aberto."""
+    if isinstance(origem, (str, os.PathLike)):
+        return open(origem, 'rb')
+    if isinstance(origem, (bytes, bytearray, memoryview)):
+        return io.BytesIO(origem)
+    return contextlib.nullcontext(origem)
+
+def extrair_texto_de_pdf(origem, max_paginas=None, parar_apos=None):
     """
-    Extrai o texto de todas as páginas de um arquivo PDF.
+    Extrai o texto das páginas de um arquivo PDF.
+    'origem' pode ser o caminho do arquivo, os bytes do PDF ou um arquivo binário aberto
+    (ex: o stream do upload), lido direto, sem cópia para o disco.
+    Se 'max_paginas' for informado e o PDF tiver mais páginas, lança LimiteDoPdfExcedido.
+    Se 'parar_apos' (regex compilada) for informado, as páginas seguintes à que completar
+    o padrão não são lidas (ex: anexos escaneados depois da última seção usada).
     """
-    texto_completo = ""
+    import PyPDF2
+
+    paginas = []
     try:
-        with open(caminho_do_pdf, 'rb') as arquivo:
+        with _abrir_pdf(origem) as arquivo:
             leitor_pdf = PyPDF2.PdfReader(arquivo)
+            if max_paginas is not None and len(leitor_pdf.pages) > max_paginas:
+                raise LimiteDoPdfExcedido(
+                    f"O PDF tem {len(leitor_pdf.pages)} páginas (limite: {max_paginas}).")
+            final_anterior = ""
             for pagina in leitor_pdf.pages:
-                texto_completo += pagina.extract_text() + "\n"
+                texto_pagina = pagina.extract_text() + "\n"
+                paginas.append(texto_pagina)
+                # O final da página anterior entra na busca: o padrão pode começar em uma página e terminar na outra
+                if parar_apos is not None and parar_apos.search(final_anterior + texto_pagina):
+                    break
+                final_anterior = texto_pagina[-TAMANHO_SOBREPOSICAO_PAGINAS:]
     except FileNotFoundError:
-        print(f"ERRO: Arquivo não encontrado em '{caminho_do_pdf}'. Verifique o caminho.")
+        print(f"ERRO: Arquivo não encontrado em '{origem}'. Verifique o caminho.")
         return None
+    except (LimiteDoPdfExcedido, TimeoutError):
+        raise  # Limites de processamento são tratados por quem chamou
     except Exception as e:
         print(f"Ocorreu um erro inesperado ao ler o PDF: {e}")
         return None
-    return texto_completo
+    return "".join(paginas)
 
 # ==============================================================================
 # FUNÇÃO 2: Extrai os dados específicos do texto
+#
+# As regras são compiladas uma única vez (no import). Cada regra começa por um
+# marcador literal ("CONTRATANTE", "PRODUTOS CONTRATADOS", "Local do evento"...):
+# o marcador é localizado com str.find sobre o texto em minúsculas (busca rápida,
+# sem o motor de regex) e a regex do campo é aplicada só a partir dele, até o fim
+# da seção (a próxima "CLÁUSULA"), como na tabela de produtos. Assim os '.*?' não
+# percorrem o contrato inteiro (PDFs longos ou malformados travavam o upload por segundos).
 # ==============================================================================
-def extrair_dados_do_contrato(texto_do_contrato):
+FLAGS_CONTRATO = re.DOTALL | re.IGNORECASE
+
+# Versão das regras de extração. Incremente ao alterar REGRAS_CONTRATO ou a leitura
+# da tabela de produtos: os resultados em cache de versões anteriores são descartados.
+VERSAO_REGRAS_CONTRATO = 4
+
+# Regras de cada campo: (marcador em minúsculas, regex ancorada no marcador, janela mínima,
+# literal obrigatório na janela ou None). Sem o literal obrigatório a regex nem roda.
+# A janela da regex vai do marcador até o fim da seção (MARCADOR_SECAO) e nunca é menor que
+# a janela mínima (em caracteres), nem maior que JANELA_MAXIMA: um valor a mais de
+# JANELA_MAXIMA caracteres do seu marcador não é encontrado (ver o caso 'valores_distantes'
+# de benchmarks/bench_extrator_contratos.py).
+REGRAS_CONTRATO = {
+    'Contratante': ('contratante', re.compile(
+        r"CONTRATANTE\s*:\s*Sr\(a\)\s*(.*?),\s*brasileiro\(a\).*?RG:\s*([\d.\s-]+?)\s*e\s*CPF:\s*([\d.\s-]+?),",
+        FLAGS_CONTRATO), 2000, 'cpf:'),
+    'Contratado': ('contratado', re.compile(
+        r"CONTRATADO\s*(.*?),\s*inscrito\s*sob\s*o\s*CNPJ:\s*([\d./\s-]+?),",
+        FLAGS_CONTRATO), 1000, 'cnpj:'),
+    'Valor Total do Pedido': ('o valor total de r$', re.compile(r"O valor total de R\$\s*([\d,.]+)", FLAGS_CONTRATO), 200, None),
+    'Data de Pagamento': ('pagos no dia', re.compile(r"pagos no dia\s*(\d{2}/\d{2}/\d{4})", FLAGS_CONTRATO), 200, None),
+    'Data do Evento': ('o evento acontecerá no dia:', re.compile(r"O evento acontecerá no dia:\s*([\d/]+)", FLAGS_CONTRATO), 200, None),
+    'Local do Evento': ('local do', re.compile(r"Local do\s*evento\s*:\s*(.*?)\n", FLAGS_CONTRATO), 500, None),
+}
+
+# Fim da seção de um campo e limite da janela em textos sem seções (PDFs malformados).
+# O custo da regex do contratante cresce bem mais rápido que a janela quando ela não casa:
+# num texto patológico, ~40 ms com 2000 caracteres, ~0,6 s com 5000 e ~11 s com 20000.
+MARCADOR_SECAO = 'cláusula'
+JANELA_MAXIMA = 5000
+
+# Última seção usada pelas regras: a linha do local do evento já completa. Depois dela
+# as páginas do PDF não precisam ser lidas (ver extrair_texto_de_pdf(parar_apos=...)).
+FIM_DOS_CAMPOS_CONTRATO = re.compile(r"Local do\s*evento\s*:[^\n]*\n", re.IGNORECASE)
+
+# Limites da tabela de produtos
+MARCADOR_PRODUTOS = 'produtos contratados'
+MARCADOR_FIM_PRODUTOS = 'cláusula 2'
+
+# Linha da tabela de produtos: (Quantidade) (Produto) (Valor Unitário) (Valor Total Item)
+# Ajuste a regex se o formato da tabela for diferente
+_REGEX_LINHA_PRODUTO = re.compile(r'^\s*(\d+)\s+(.*?)\s+([\d,.]+)\s+([\d,.]+)\s*$')
+
+# Valores usados quando um campo não é encontrado
+PADROES_NAO_ENCONTRADO = {
+    'Contratante': "Não encontrado",
+    'Contratado': "Não encontrado",
+    'Valor Total do Pedido': "Não encontrado",
+    'Data de Pagamento': "Não encontrada",
+    'Data do Evento': "Não encontrada",
+    'Local do Evento': "Não encontrado",
+}
+
+# Caracteres que o re.IGNORECASE iguala a letras ASCII mas que str.lower() não converte
+_CARACTERES_CASEFOLD_ESPECIAIS = ('\u017f', '\u212a')  # 'ſ' (s longo) e 'K' (Kelvin)
+
+def _localizador_de_marcadores(texto):
     """
-    Extrai dados específicos do conteúdo textual de um contrato.
+    Retorna ocorrencias(marcador, inicio=0): gerador das posições do marcador no
+    texto (sem diferenciar maiúsculas), em ordem, a partir de 'inicio'.
     """
-    dados_extraidos = {}
-    flags = re.DOTALL | re.IGNORECASE
+    minusculo = texto.lower()
+    if len(minusculo) != len(texto) or any(c in texto for c in _CARACTERES_CASEFOLD_ESPECIAIS):
+        # Raro: lower() mudaria as posições. Usa a regex, que compara sem alterar o texto.
+        def ocorrencias(marcador, inicio=0):
+            regex = re.compile(re.escape(marcador), FLAGS_CONTRATO)
+            posicao = inicio
+            while (match := regex.search(texto, posicao)):
+                yield match.start()
+                posicao = match.start() + 1
+        return ocorrencias
 
-    # 1. Extrair dados do CONTRATANTE
-    contratante_match = re.search(
-        r"CONTRATANTE\s*:\s*Sr\(a\)\s*(.*?),\s*brasileiro\(a\).*?RG:\s*([\d.\s-]+?)\s*e\s*CPF:\s*([\d.\s-]+?),",
-        texto_do_contrato, flags)
-    if contratante_match:
-        dados_extraidos['Contratante'] = {'Nome': contratante_match.group(1).strip(), 'RG': contratante_match.group(2).strip(), 'CPF': contratante_match.group(3).strip(),}
-    else:
-        dados_extraidos['Contratante'] = "Não encontrado"
+    def ocorrencias(marcador, inicio=0):
+        posicao = minusculo.find(marcador, inicio)
+        while posicao != -1:
+            yield posicao
+            posicao = minusculo.find(marcador, posicao + 1)
+    return ocorrencias
 
-    # 2. Extrair dados do CONTRATADO
-    contratado_match = re.search(
-        r"CONTRATADO\s*(.*?),\s*inscrito\s*sob\s*o\s*CNPJ:\s*([\d./\s-]+?),",
-        texto_do_contrato, flags)
-    if contratado_match:
-        dados_extraidos['Contratado'] = {'Nome Empresa': contratado_match.group(1).strip(), 'CNPJ': contratado_match.group(2).strip(),}
-    else:
-        dados_extraidos['Contratado'] = "Não encontrado"
-
-    # 3. Extrair Produtos Contratados
-    dados_extraidos['Produtos Contratados'] = []
-    secao_produtos_match = re.search(r'PRODUTOS CONTRATADOS\s*(.*?)\s*CLÁUSULA 2', texto_do_contrato, flags)
-    if secao_produtos_match:
-        texto_tabela = secao_produtos_match.group(1)
-        linhas = texto_tabela.strip().split('\n')
-        for linha in linhas:
-            linha_limpa = linha.strip()
-            if not linha_limpa or not linha_limpa[0].isdigit():
+def _procurar_campo(texto, ocorrencias, regra):
+    """
+    Tenta a regex da regra em cada ocorrência do marcador, na ordem do texto.
+    Retorna (match, índice da ocorrência) ou (None, None).
+    """
+    marcador, regex, janela, obrigatorio = regra
+    for indice, posicao in enumerate(ocorrencias(marcador)):
+        fim_da_secao = next(ocorrencias(MARCADOR_SECAO, posicao + len(marcador)), len(texto))
+        fim = min(len(texto), posicao + JANELA_MAXIMA, max(posicao + janela, fim_da_secao))
+        if obrigatorio:
+            posicao_obrigatorio = next(ocorrencias(obrigatorio, posicao), None)
+            if posicao_obrigatorio is None:
+                break  # Não aparece mais no texto: nenhuma ocorrência seguinte pode casar
+            if posicao_obrigatorio + len(obrigatorio) > fim:
                 continue
-            # Ajuste a regex se o formato da tabela for diferente
-            # Ex: (Quantidade) (Produto) (Valor Unitário) (Valor Total Item)
-            produto_match = re.match(r'^\s*(\d+)\s+(.*?)\s+([\d,.]+)\s+([\d,.]+)\s*$', linha_limpa)
-            if produto_match:
-                dados_extraidos['Produtos Contratados'].append({
-                    'Quantidade': produto_match.group(1).strip(),
-                    'Produto': produto_match.group(2).strip().strip(),
-                    'Valor Unitário': produto_match.group(3).strip(),
-                    'Valor Total Item': produto_match.group(4).strip()
-                })
-
-    # 4, 5, 6. Extrair outros dados
-    valor_total_match = re.search(r"O valor total de R\$\s*([\d,.]+)", texto_do_contrato, flags)
-    dados_extraidos['Valor Total do Pedido'] = valor_total_match.group(1).strip() if valor_total_match else "Não encontrado"
-    
-    data_pagamento_match = re.search(r"pagos no dia\s*(\d{2}/\d{2}/\d{4})", texto_do_contrato, flags)
-    dados_extraidos['Data de Pagamento'] = data_pagamento_match.group(1).strip() if data_pagamento_match else "Não encontrada"
-    
-    data_evento_match = re.search(r"O evento acontecerá no dia:\s*([\d/]+)", texto_do_contrato, flags)
-    dados_extraidos['Data do Evento'] = data_evento_match.group(1).strip() if data_evento_match else "Não encontrada"
-    
-    local_evento_match = re.search(r"Local do\s*evento\s*:\s*(.*?)\n", texto_do_contrato, flags)
-    dados_extraidos['Local do Evento'] = local_evento_match.group(1).strip() if local_evento_match else "Não encontrado"
-            
+        match = regex.match(texto, posicao, fim)
+        if match:
+            return match, indice
+    return None, None
+
+def _data_valida(valor):
+    try:
+        datetime.datetime.strptime(valor, '%d/%m/%Y')
+        return True
+    except ValueError:
+        return False
+
+def _extrair_produtos(texto, ocorrencias):
+    """
+    Lê a tabela entre "PRODUTOS CONTRATADOS" e "CLÁUSULA 2".
+    Retorna (produtos, linhas candidatas), onde as candidatas são as linhas
+    que começam com dígito (usadas no cálculo da confiança).
+    """
+    inicio = next(ocorrencias(MARCADOR_PRODUTOS), None)
+    if inicio is None:
+        return [], 0
+    inicio += len(MARCADOR_PRODUTOS)
+    fim = next(ocorrencias(MARCADOR_FIM_PRODUTOS, inicio), None)
+    if fim is None:
+        return [], 0
+
+    produtos = []
+    candidatas = 0
+    for linha in texto[inicio:fim].strip().split('\n'):
+        linha_limpa = linha.strip()
+        if not linha_limpa or not linha_limpa[0].isdigit():
+            continue
+        candidatas += 1
+        produto_match = _REGEX_LINHA_PRODUTO.match(linha_limpa)
+        if produto_match:
+            produtos.append({
+                'Quantidade': produto_match.group(1).strip(),
+                'Produto': produto_match.group(2).strip(),
+                'Valor Unitário': produto_match.group(3).strip(),
+                'Valor Total Item': produto_match.group(4).strip()
+            })
+    return produtos, candidatas
+
+def extrair_dados_do_contrato_detalhado(texto_do_contrato):
+    """
+    Extrai os dados do contrato e retorna (dados_extraidos, detalhes), onde
+    detalhes = {campo: {'tempo_ms': ..., 'confianca': 0.0 a 1.0}}.
+
+    Confiança: 0 se o campo não foi encontrado; 1 se foi encontrado na primeira
+    ocorrência do marcador e o valor tem o formato esperado; menor quando só uma
+    ocorrência posterior casou, o valor tem formato duvidoso (ex: data inexistente)
+    ou parte das linhas da tabela de produtos não foi reconhecida.
+    """
+    relogio = time.perf_counter
+    detalhes = {}
+    dados_extraidos = {}
+
+    ocorrencias = _localizador_de_marcadores(texto_do_contrato)
+
+    for campo, regra in REGRAS_CONTRATO.items():
+        inicio = relogio()
+        match, ocorrencia = _procurar_campo(texto_do_contrato, ocorrencias, regra)
+        if match is None:
+            valor = PADROES_NAO_ENCONTRADO[campo]
+            confianca = 0.0
+        else:
+            if campo == 'Contratante':
+                valor = {'Nome': match.group(1).strip(), 'RG': match.group(2).strip(), 'CPF': match.group(3).strip(),}
+                valido = all(valor.values())
+            elif campo == 'Contratado':
+                valor = {'Nome Empresa': match.group(1).strip(), 'CNPJ': match.group(2).strip(),}
+                valido = all(valor.values())
+            else:
+                valor = match.group(1).strip()
+                valido = _data_valida(valor) if campo.startswith('Data') else bool(valor)
+            confianca = 1.0 if ocorrencia == 0 else 0.8
+            if not valido:
+                confianca *= 0.5
+        dados_extraidos[campo] = valor
+        detalhes[campo] = {'tempo_ms': (relogio() - inicio) * 1000, 'confianca': confianca}
+
+        if campo == 'Contratado':
+            # Mantém a ordem original das chaves do dicionário de saída
+            inicio = relogio()
+            produtos, candidatas = _extrair_produtos(texto_do_contrato, ocorrencias)
+            dados_extraidos['Produtos Contratados'] = produtos
+            detalhes['Produtos Contratados'] = {
+                'tempo_ms': (relogio() - inicio) * 1000,
+                'confianca': len(produtos) / candidatas if candidatas else 0.0,
+            }
+
+    return dados_extraidos, detalhes
+
+def extrair_dados_do_contrato(texto_do_contrato):
+    """
+    Extrai dados específicos do conteúdo textual de um contrato.
+    """
+    dados_extraidos, _ = extrair_dados_do_contrato_detalhado(texto_do_contrato)
     return dados_extraidos
 
+# ==============================================================================
+# AUXILIAR: Salva documentos (xlsx/docx) em memória
+# ==============================================================================
+def _salvar_em_memoria(salvar, destino):
+    """
+    Chama salvar(stream) com um BytesIO e devolve os bytes gerados. Se 'destino' for
+    um caminho, grava o arquivo; se for um stream binário (BytesIO, resposta HTTP,
+    arquivo aberto), escreve nele.
+    """
+    buffer = io.BytesIO()
+    salvar(buffer)
+    conteudo = buffer.getvalue()
+
+    if isinstance(destino, (str, os.PathLike)):
+        with open(destino, 'wb') as arquivo:
+            arquivo.write(conteudo)
+    elif destino is not None:
+        destino.write(conteudo)
+    return conteudo
+
 # ==============================================================================
 # FUNÇÃO 3: Exporta os dados para um arquivo Excel
 # ==============================================================================
-def exportar_para_excel(dados, nome_do_arquivo="dados_contrato.xlsx"):
+def exportar_para_excel(dados, destino=None):
     """
     Exporta o dicionário de dados extraídos para uma planilha Excel.
     Esta função é focada em dados de contrato (singular).
     Para exportar uma LISTA de pedidos, a lógica precisará ser adaptada.
+    'destino' pode ser um caminho, um arquivo binário aberto ou None. Retorna os bytes do .xlsx.
     """
+    import openpyxl
+
     workbook = openpyxl.Workbook()
     sheet = workbook.active
     sheet.title = "Dados do Contrato"
@@ -137,21 +337,172 @@ def exportar_para_excel(dados, nome_do_arquivo="dados_contrato.xlsx"):
                 sheet.cell(row=linha_atual, column=col_idx, value=produto.get(header, 'N/A'))
             linha_atual += 1
     
-    try:
-        workbook.save(filename=nome_do_arquivo)
-        print(f"\n[SUCESSO] Dados exportados para o arquivo '{nome_do_arquivo}'")
-    except Exception as e:
-        print(f"\n[ERRO] Não foi possível salvar a planilha: {e}")
+    return _salvar_em_memoria(workbook.save, destino)
 
 # ==============================================================================
 # FUNÇÃO 4: Gera o Relatório de Entrega em DOCX (MOVIMENTO DO relatorio_entrega.py)
 # ==============================================================================
-def gerar_relatorio_entrega(dados, nome_arquivo='relatorio_entrega.docx'):
+def gerar_relatorio_entrega(dados, destino=None):
     """
     Gera um relatório de entrega em formato .docx com base nos dados do pedido.
+    'destino' pode ser um caminho, um arquivo binário aberto ou None. Retorna os bytes do .docx.
+    """
+    document, corpo_modelo = _documento_de_trabalho()
+    corpo = _novo_corpo(document, corpo_modelo)
+    _preencher_relatorio(corpo, corpo_modelo, dados)
+    return _salvar_em_memoria(document.save, destino)
+
+def gerar_relatorios_entrega_unificado(lista_dados, destino=None):
+    """
+    Gera um único .docx com um relatório de entrega por página, para impressão em lote.
+    'destino' pode ser um caminho, um arquivo binário aberto ou None. Retorna os bytes do .docx.
+    """
+    from docx.oxml.ns import qn
+
+    document, corpo_modelo = _documento_de_trabalho()
+    corpo = _novo_corpo(document, corpo_modelo)
+    propriedades_secao = corpo.find(qn('w:sectPr'))
+
+    # Cada relatório é preenchido em uma cópia do modelo e o conteúdo é movido para o corpo final
+    for indice, dados in enumerate(lista_dados):
+        copia = copy.deepcopy(corpo_modelo)
+        _preencher_relatorio(copia, corpo_modelo, dados)
+        if indice == 0:
+            for elemento in list(corpo):
+                if elemento is not propriedades_secao:
+                    corpo.remove(elemento)
+        else:
+            propriedades_secao.addprevious(_quebra_de_pagina())
+        for elemento in list(copia):
+            if elemento.tag != qn('w:sectPr'):
+                propriedades_secao.addprevious(elemento)
+    return _salvar_em_memoria(document.save, destino)
+
+# ------------------------------------------------------------------------------
+# Modelo do relatório em cache
+#
+# Criar um Document() do zero e montar cada parágrafo pelo python-docx custa caro
+# (alocação de objetos XML). O modelo é montado uma única vez por processo, com
+# marcadores como {cliente}, e cada relatório é uma cópia (deepcopy) do corpo do
+# modelo com os marcadores substituídos. As linhas da tabela de produtos são
+# clonadas de uma linha-protótipo.
+# ------------------------------------------------------------------------------
+_MARCADOR = re.compile(r'\{(\w+)\}')
+
+# Produto usado como linha-protótipo da tabela no modelo
+_PRODUTO_PROTOTIPO = {
+    'Quantidade': '{quantidade}',
+    'Produto': '{produto}',
+    'Valor Unitário': '{valor_unitario}',
+    'Valor Total Item': '{valor_total_item}',
+}
+
+_bytes_do_modelo = None
+_documentos_por_thread = threading.local()
+
+def _modelo_relatorio_entrega():
+    """Retorna os bytes do .docx modelo, montado na primeira chamada do processo."""
+    global _bytes_do_modelo
+    if _bytes_do_modelo is None:
+        from docx import Document
+        document = Document()
+        _escrever_relatorio_entrega(document, {
+            'Contratante': {'Nome': '{cliente}'},
+            'Data do Evento': '{data_evento}',
+            'Local do Evento': '{local_evento}',
+            'Valor Total do Pedido': '{valor_total}',
+            'Produtos Contratados': [_PRODUTO_PROTOTIPO],
+        }, data_emissao='{data_emissao}')
+        buffer = io.BytesIO()
+        document.save(buffer)
+        _bytes_do_modelo = buffer.getvalue()
+    return _bytes_do_modelo
+
+def _documento_de_trabalho():
+    """
+    Documento reaproveitado pela thread atual (estilos e demais partes já carregados)
+    e o corpo original do modelo. Só o corpo é trocado a cada relatório.
+    """
+    if getattr(_documentos_por_thread, 'documento', None) is None:
+        from docx import Document
+        document = Document(io.BytesIO(_modelo_relatorio_entrega()))
+        _documentos_por_thread.documento = document
+        _documentos_por_thread.corpo_modelo = copy.deepcopy(document.element.body)
+    return _documentos_por_thread.documento, _documentos_por_thread.corpo_modelo
+
+def _novo_corpo(document, corpo_modelo):
+    """Substitui o corpo do documento de trabalho por uma cópia limpa do modelo."""
+    corpo = copy.deepcopy(corpo_modelo)
+    document.element.replace(document.element.body, corpo)
+    return corpo
+
+def _substituir_marcadores(elemento, valores):
+    from docx.oxml.ns import qn
+    for texto in elemento.iter(qn('w:t')):
+        if texto.text and '{' in texto.text:
+            texto.text = _MARCADOR.sub(lambda m: valores.get(m.group(1), m.group(0)), texto.text)
+
+def _paragrafo(texto):
+    """Parágrafo simples, equivalente ao criado por document.add_paragraph(texto)."""
+    from docx.oxml import OxmlElement
+    paragrafo = OxmlElement('w:p')
+    trecho = OxmlElement('w:r')
+    elemento_texto = OxmlElement('w:t')
+    elemento_texto.text = texto
+    trecho.append(elemento_texto)
+    paragrafo.append(trecho)
+    return paragrafo
+
+def _quebra_de_pagina():
+    """Parágrafo com quebra de página, equivalente a document.add_page_break()."""
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    paragrafo = OxmlElement('w:p')
+    trecho = OxmlElement('w:r')
+    quebra = OxmlElement('w:br')
+    quebra.set(qn('w:type'), 'page')
+    trecho.append(quebra)
+    paragrafo.append(trecho)
+    return paragrafo
+
+def _preencher_relatorio(corpo, corpo_modelo, dados):
+    """Preenche uma cópia do corpo do modelo com os dados de um pedido."""
+    from docx.oxml.ns import qn
+
+    contratante = dados.get('Contratante', {})
+    _substituir_marcadores(corpo, {
+        'cliente': str(contratante.get('Nome', 'Não encontrado')),
+        'data_evento': str(dados.get('Data do Evento', 'Não informada')),
+        'local_evento': str(dados.get('Local do Evento', 'Não informado')),
+        'data_emissao': datetime.datetime.now().strftime('%d/%m/%Y'),
+        'valor_total': str(dados.get('Valor Total do Pedido', 'Não encontrado')),
+    })
+
+    tabela = corpo.find(qn('w:tbl'))
+    produtos = dados.get('Produtos Contratados', [])
+    if not produtos:
+        tabela.addprevious(_paragrafo("Nenhum produto encontrado."))
+        corpo.remove(tabela)
+        return
+
+    # A última linha da tabela do modelo é a linha-protótipo dos produtos
+    prototipo = tabela.findall(qn('w:tr'))[-1]
+    for item in produtos:
+        linha = copy.deepcopy(prototipo)
+        _substituir_marcadores(linha, {
+            'quantidade': str(item.get('Quantidade', 'N/A')),
+            'produto': str(item.get('Produto', 'N/A')),
+            'valor_unitario': str(item.get('Valor Unitário', 'N/A')),
+            'valor_total_item': str(item.get('Valor Total Item', 'N/A')),
+        })
+        prototipo.addprevious(linha)
+    tabela.remove(prototipo)
+
+def _escrever_relatorio_entrega(document, dados, data_emissao=None):
+    """
+    Escreve o conteúdo de um relatório de entrega no documento pelo python-docx.
+    Usada para montar o modelo em cache (e como referência no benchmark).
     """
-    document = Document()
-    
     # Título
     document.add_heading('RELATÓRIO DE ENTREGA', 0)
     
@@ -163,7 +514,8 @@ def gerar_relatorio_entrega(dados, nome_arquivo='relatorio_entrega.docx'):
     document.add_paragraph(f"Nome do Cliente: {contratante.get('Nome', 'Não encontrado')}")
     document.add_paragraph(f"Data do Evento: {data_evento}")
     document.add_paragraph(f"Local do Evento: {local_evento}")
-    document.add_paragraph(f"Data de Emissão: {datetime.datetime.now().strftime('%d/%m/%Y')}")
+    data_emissao = data_emissao or datetime.datetime.now().strftime('%d/%m/%Y')
+    document.add_paragraph(f"Data de Emissão: {data_emissao}")
 
     document.add_paragraph("\nProdutos Contratados:")
     
@@ -195,48 +547,15 @@ def gerar_relatorio_entrega(dados, nome_arquivo='relatorio_entrega.docx'):
     document.add_paragraph("\n\n")
     document.add_paragraph("______________________________\nResponsável pela Retirada")
 
-    # Salvar o arquivo
-    try:
-        document.save(nome_arquivo)
-        print(f"[OK] Relatório de entrega salvo em: {nome_arquivo}")
-    except Exception as e:
-        print(f"[ERRO] Falha ao salvar relatório de entrega: {e}")
-
 # ==============================================================================
-# BLOCO DE EXECUÇÃO: O "Gerente de Operações" para testes local
+# BLOCO DE EXECUÇÃO: Extração em lote pela linha de comando
+#   python -m app.Extractor <pastas, PDFs ou padrões glob> [--saida dados.xlsx|.csv|.jsonl]
+# Veja 'python -m app.Extractor --help' e app/contratos/cli.py.
 # ==============================================================================
 if __name__ == "__main__":
-    caminho_do_pdf = "modelo_contrato.pdf" # Certifique-se de ter este arquivo no mesmo diretório
-
-    # Exemplo de uso das funções
-    print(f"Tentando extrair texto de: {caminho_do_pdf}")
-    texto_extraido = extrair_texto_de_pdf(caminho_do_pdf)
-    
-    if texto_extraido:
-        print("\nTexto extraído com sucesso. Tentando extrair dados...")
-        dados_do_contrato = extrair_dados_do_contrato(texto_extraido)
-        
-        # Imprime os resultados no terminal
-        print("\n--- DADOS EXTRAÍDOS DO CONTRATO ---")
-        for chave, valor in dados_do_contrato.items():
-            print(f"\n>> {chave}:")
-            if isinstance(valor, dict):
-                for sub_chave, sub_valor in valor.items():
-                    print(f"    {sub_chave}: {sub_valor}")
-            elif isinstance(valor, list) and valor:
-                for item in valor:
-                    print(f"    - {item}")
-            else:
-                print(f"    {valor}")
-        print("\n----------------------------------------------------")
-
-        # Chama a função para criar a planilha Excel
-        nome_excel = f"dados_contrato_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        exportar_para_excel(dados_do_contrato, nome_do_arquivo=nome_excel)
-
-        # Chama a nova função para criar o relatório de entrega em DOCX
-        nome_docx = f"relatorio_entrega_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-        gerar_relatorio_entrega(dados_do_contrato, nome_arquivo=nome_docx)
-
-    else:
-        print("\nNão foi possível processar o PDF.")
\ No newline at end of file
+    import sys
+    if not __package__:
+        # Executado como 'python app/Extractor.py': torna o pacote 'app' importável
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app.contratos.cli import main
+    sys.exit(main())
\ No newline at end of file
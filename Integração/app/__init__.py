@@ -4,52 +4,68 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
+from app.replica import SessaoComReplica
 
 # Carrega as variáveis de ambiente do arquivo .env ANTES de tudo.
 # Isso garante que a Config encontre a DATABASE_URL.
 basedir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 load_dotenv(os.path.join(basedir, '.env'))
 
-db = SQLAlchemy()
+# SELECTs de relatórios, exportações e listagem podem ir para a réplica (app/replica.py)
+db = SQLAlchemy(session_options={'class_': SessaoComReplica})
 
 def create_app():
     """
     Função Application Factory: configura e retorna a instância da aplicação Flask.
     """
     app = Flask(__name__, instance_relative_config=True)
-    CORS(app)
+    CORS(app, expose_headers=["X-Next-Cursor"])
 
     # Carrega as configurações do nosso objeto Config
     app.config.from_object('app.config.Config')
+    if not app.config['SECRET_KEY']:
+        if not app.debug:
+            raise RuntimeError(
+                'SECRET_KEY não configurada: defina a variável de ambiente (ou o .env) antes de subir a aplicação.'
+            )
+        # Só em desenvolvimento (FLASK_DEBUG=1): tokens assinados com uma chave conhecida
+        app.logger.warning('SECRET_KEY não configurada; usando uma chave de desenvolvimento.')
+        app.config['SECRET_KEY'] = 'chave-de-desenvolvimento-nao-usar-em-producao'
+
+    from .serializacao import configurar_json
+    configurar_json(app)
 
-    # --- DEBUG: Imprime a URI do banco para confirmar que está correta ---
-    print("*" * 80)
-    print(f"INFO: Conectando ao banco de dados: {app.config['SQLALCHEMY_DATABASE_URI']}")
-    print("*" * 80)
-    
     db.init_app(app)
 
-    # ... (o resto do seu código de criação de pasta e registro de blueprints continua igual) ...
-    UPLOAD_FOLDER = os.path.join(app.root_path, 'uploads_temp')
-    if not os.path.exists(UPLOAD_FOLDER):
-        os.makedirs(UPLOAD_FOLDER)
-    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    # Resultados das tarefas em segundo plano (compartilhados entre os workers)
+    TAREFAS_PASTA = os.path.join(app.instance_path, 'tarefas')
+    os.makedirs(TAREFAS_PASTA, exist_ok=True)
+    app.config['TAREFAS_PASTA'] = TAREFAS_PASTA
 
     from .main_pages.routes import main_pages_bp
     from .auth.routes import auth_bp
     from .pedidos.routes import pedidos_bp
     from .contratos.routes import contratos_bp
     from .relatorios.routes import relatorios_bp
+    from .tarefas.routes import tarefas_bp
 
     app.register_blueprint(main_pages_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(pedidos_bp)
     app.register_blueprint(contratos_bp)
     app.register_blueprint(relatorios_bp)
-    
-    with app.app_context():
-        db.create_all()
-        print("Banco de dados inicializado e tabelas criadas (se necessário).")
+    app.register_blueprint(tarefas_bp)
+
+    from .migracoes import migrar_command
+    app.cli.add_command(migrar_command)
+    from .importacao import importar_legado_command
+    app.cli.add_command(importar_legado_command)
+    from .relatorios.metricas import recalcular_metricas_command
+    app.cli.add_command(recalcular_metricas_command)
+
+    # O esquema do banco não é tocado aqui: as tabelas são criadas e migradas pelo
+    # 'flask migrar'. Assim a fábrica não abre conexões e pode rodar no processo
+    # mestre do gunicorn (--preload) antes do fork dos workers.
 
     @app.route('/status', methods=['GET'])
     def status_check():
@@ -1,9 +1,10 @@
 # Arquivo: app/auth/routes.py
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
 from app.models import User
+from app.auth.sessao import gerar_token, usuario_obrigatorio, usuarios
 
 # O Blueprint continua o mesmo
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -47,8 +48,26 @@ def login_user():
 
     # 2. VERIFICA se o usuário existe E se a senha fornecida corresponde ao hash salvo
     if user and check_password_hash(user.password_hash, password):
-        # Em um sistema real, você geraria e retornaria um token JWT aqui.
-        # Por enquanto, retornamos o email como 'userId' para o frontend.
-        return jsonify({'message': 'Login bem-sucedido!', 'userId': user.email}), 200
+        # 3. EMITE O TOKEN da sessão (validado depois sem consultar o banco).
+        # O 'userId' (e-mail) continua na resposta para o frontend exibir/compatibilidade.
+        usuarios.guardar(user.id, user.email)
+        return jsonify({
+            'message': 'Login bem-sucedido!',
+            'userId': user.email,
+            'token': gerar_token(user.id, user.email),
+        }), 200
     else:
-        return jsonify({'message': 'E-mail ou senha incorretos.'}), 401
\ No newline at end of file
+        return jsonify({'message': 'E-mail ou senha incorretos.'}), 401
+
+@auth_bp.route('/renovar', methods=['POST'])
+@usuario_obrigatorio
+def renovar_sessao():
+    """
+    Troca um token válido por um novo (o frontend chama ao abrir as páginas), sem pedir
+    a senha de novo. O novo token mantém o horário do login: depois de
+    SESSAO_IDADE_MAXIMA_HORAS o token é recusado (401) e é preciso fazer login.
+    """
+    if g.usuario_origem != 'token':
+        return jsonify({'message': 'Faça login para obter um token.'}), 401
+    token = gerar_token(g.usuario_id, g.usuario_email, g.usuario_login)
+    return jsonify({'userId': g.usuario_email, 'token': token}), 200
\ No newline at end of file
@@ -0,0 +1,112 @@
+# Arquivo: app/auth/sessao.py
+# Identificação do usuário nas rotas da API.
+#
+# O login (/api/auth/login) emite um token assinado com a SECRET_KEY (itsdangerous)
+# contendo o id e o e-mail do usuário e o horário do login; o frontend o envia em
+# 'Authorization: Bearer ...'. O token é validado só pela assinatura e pela idade, sem
+# consultar o banco. A renovação (/api/auth/renovar) emite um token novo com o mesmo
+# horário de login, então uma sessão dura no máximo SESSAO_IDADE_MAXIMA_HORAS.
+# O cabeçalho antigo 'X-User-Id' (e-mail, sem assinatura) só é aceito se habilitado
+# explicitamente (AUTH_ACEITAR_X_USER_ID=1), enquanto houver clientes antigos; o
+# e-mail é resolvido para o id por um cache com validade.
+
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from app import db
+from app.models import User
+
+SALT_SESSAO = 'sessao-usuario'
+
+def _serializador():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=SALT_SESSAO)
+
+def gerar_token(user_id, email, login_em=None):
+    """
+    Token da sessão para o usuário (vale por SESSAO_VALIDADE_HORAS). 'login_em' é o
+    horário do login (segundos desde a época): só o login o omite; a renovação repassa
+    o do token anterior.
+    """
+    return _serializador().dumps({
+        'id': user_id, 'email': email, 'login': int(time.time()) if login_em is None else login_em,
+    })
+
+def ler_token(token):
+    """
+    Retorna (id, e-mail, horário do login) de um token válido. Lança SignatureExpired
+    se o token passou de SESSAO_VALIDADE_HORAS ou a sessão de SESSAO_IDADE_MAXIMA_HORAS,
+    ou BadSignature.
+    """
+    config = current_app.config
+    dados, emitido_em = _serializador().loads(
+        token, max_age=config['SESSAO_VALIDADE_HORAS'] * 3600, return_timestamp=True)
+    # Tokens emitidos antes do horário de login no payload contam a partir da emissão
+    login_em = dados.get('login', int(emitido_em.timestamp()))
+    if time.time() - login_em > config['SESSAO_IDADE_MAXIMA_HORAS'] * 3600:
+        raise SignatureExpired('Sessão além da idade máxima.')
+    return dados['id'], dados['email'], login_em
+
+class CacheDeUsuarios:
+    """Cache LRU, com validade, do id de cada e-mail (compartilhado pelas threads do worker)."""
+
+    def __init__(self):
+        self._por_email = OrderedDict()  # email -> (id, expira_em)
+        self._lock = threading.Lock()
+
+    def guardar(self, user_id, email):
+        config = current_app.config
+        with self._lock:
+            self._por_email[email] = (user_id, time.monotonic() + config['USUARIOS_CACHE_TTL_SEGUNDOS'])
+            self._por_email.move_to_end(email)
+            while len(self._por_email) > config['USUARIOS_CACHE_MAX_ENTRADAS']:
+                self._por_email.popitem(last=False)
+
+    def id_por_email(self, email):
+        """Id do usuário com o e-mail, ou None se não existir. Só consulta o banco quando não está no cache."""
+        with self._lock:
+            entrada = self._por_email.get(email)
+            if entrada and entrada[1] > time.monotonic():
+                self._por_email.move_to_end(email)
+                return entrada[0]
+        user_id = db.session.scalar(db.select(User.id).where(User.email == email))
+        if user_id is not None:
+            self.guardar(user_id, email)
+        return user_id
+
+usuarios = CacheDeUsuarios()
+
+def _nao_autenticado(mensagem='Usuário não autenticado.'):
+    return jsonify({'message': mensagem}), 401
+
+def usuario_obrigatorio(view):
+    """
+    Exige um usuário identificado e o deixa em g.usuario_id / g.usuario_email
+    (g.usuario_origem diz se veio do 'token' ou do 'cabecalho' X-User-Id; com token,
+    g.usuario_login tem o horário do login).
+    É o único ponto em que a identidade da requisição é resolvida.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        autorizacao = request.headers.get('Authorization', '')
+        if autorizacao.startswith('Bearer '):
+            try:
+                g.usuario_id, g.usuario_email, g.usuario_login = ler_token(autorizacao[len('Bearer '):].strip())
+            except SignatureExpired:
+                return _nao_autenticado('Sessão expirada. Faça login novamente.')
+            except (BadSignature, KeyError, TypeError, ValueError):
+                return _nao_autenticado('Sessão inválida. Faça login novamente.')
+            g.usuario_origem = 'token'
+            return view(*args, **kwargs)
+
+        email = request.headers.get('X-User-Id')
+        if not email or not current_app.config['AUTH_ACEITAR_X_USER_ID']:
+            return _nao_autenticado()
+        user_id = usuarios.id_por_email(email)
+        if user_id is None:
+            return _nao_autenticado('Usuário inválido.')
+        g.usuario_id, g.usuario_email, g.usuario_origem = user_id, email, 'cabecalho'
+        return view(*args, **kwargs)
+    return wrapper
\ No newline at end of file
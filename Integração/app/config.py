@@ -1,14 +1,101 @@
 # Arquivo: app/config.py
 import os
 
+def _opcoes_do_pool():
+    """
+    Opções dos engines do SQLAlchemy (primário e réplica) lidas das variáveis de ambiente.
+    pool_pre_ping descarta conexões derrubadas pelo servidor antes de usá-las e
+    pool_recycle as renova periodicamente; o tamanho do pool só muda se for informado.
+    """
+    opcoes = {
+        'pool_pre_ping': os.environ.get('DATABASE_POOL_PRE_PING', '1') == '1',
+        'pool_recycle': int(os.environ.get('DATABASE_POOL_RECYCLE', 1800)),
+    }
+    for variavel, opcao in (
+        ('DATABASE_POOL_SIZE', 'pool_size'),
+        ('DATABASE_POOL_MAX_OVERFLOW', 'max_overflow'),
+        ('DATABASE_POOL_TIMEOUT', 'pool_timeout'),
+    ):
+        if os.environ.get(variavel):
+            opcoes[opcao] = int(os.environ[variavel])
+    return opcoes
+
 class Config:
     """
     Classe de configuração da aplicação Flask.
     Lê as configurações a partir das variáveis de ambiente.
     """
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'uma_chave_secreta_padrao_para_desenvolvimento'
+    # Assina os tokens de sessão. Obrigatória: sem ela a aplicação só sobe em modo debug (ver create_app)
+    SECRET_KEY = os.environ.get('SECRET_KEY')
 
     # A URI do banco de dados será lida diretamente da variável de ambiente
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    SQLALCHEMY_ENGINE_OPTIONS = _opcoes_do_pool()
+
+    # Réplica somente leitura usada por relatórios, exportações e listagem (app/replica.py).
+    # Sem ela, essas consultas vão para o banco principal. (O Flask-SQLAlchemy não aplica
+    # o SQLALCHEMY_ENGINE_OPTIONS aos binds, por isso as opções do pool vão junto.)
+    SQLALCHEMY_BINDS = {
+        'leitura': {'url': os.environ['DATABASE_REPLICA_URL'], **_opcoes_do_pool()},
+    } if os.environ.get('DATABASE_REPLICA_URL') else {}
+
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Paginação da listagem de pedidos (GET /api/pedidos)
+    PEDIDOS_LIMITE_PADRAO = int(os.environ.get('PEDIDOS_LIMITE_PADRAO', 50))
+    PEDIDOS_LIMITE_MAXIMO = int(os.environ.get('PEDIDOS_LIMITE_MAXIMO', 500))
+
+    # Codifica o JSON das respostas com o orjson, se instalado (app/serializacao.py)
+    JSON_RAPIDO = os.environ.get('JSON_RAPIDO', '1') == '1'
+
+    # Tarefas em segundo plano (exportações e comprovantes)
+    TAREFAS_MAX_PROCESSOS = int(os.environ.get('TAREFAS_MAX_PROCESSOS', 2))
+    TAREFAS_VALIDADE_MINUTOS = int(os.environ.get('TAREFAS_VALIDADE_MINUTOS', 60))
+    # Tarefa na fila há mais que isso é dada como perdida (o worker que a enfileirou morreu)
+    TAREFAS_TEMPO_MAXIMO_MINUTOS = int(os.environ.get('TAREFAS_TEMPO_MAXIMO_MINUTOS', 120))
+    # O processo que executa uma tarefa renova o sinal de vida nesse intervalo; sem sinal
+    # por TAREFAS_SINAL_LIMITE_SEGUNDOS, a tarefa em execução é dada como interrompida
+    TAREFAS_SINAL_SEGUNDOS = int(os.environ.get('TAREFAS_SINAL_SEGUNDOS', 30))
+    TAREFAS_SINAL_LIMITE_SEGUNDOS = int(os.environ.get('TAREFAS_SINAL_LIMITE_SEGUNDOS', 180))
+
+    # Upload de contratos em lote (POST /api/contracts/upload-batch)
+    CONTRATOS_MAX_PROCESSOS = int(os.environ.get('CONTRATOS_MAX_PROCESSOS', os.cpu_count() or 2))
+    CONTRATOS_TIMEOUT_SEGUNDOS = int(os.environ.get('CONTRATOS_TIMEOUT_SEGUNDOS', 30))
+    CONTRATOS_MAX_PAGINAS = int(os.environ.get('CONTRATOS_MAX_PAGINAS', 50))
+    CONTRATOS_MAX_BYTES = int(os.environ.get('CONTRATOS_MAX_BYTES', 10 * 1024 * 1024))
+    CONTRATOS_MAX_ARQUIVOS_LOTE = int(os.environ.get('CONTRATOS_MAX_ARQUIVOS_LOTE', 500))
+
+    # Cache dos dados extraídos de contratos (pela SHA-256 do PDF)
+    CONTRATOS_CACHE_MAX_ENTRADAS = int(os.environ.get('CONTRATOS_CACHE_MAX_ENTRADAS', 2000))
+    CONTRATOS_CACHE_VALIDADE_DIAS = int(os.environ.get('CONTRATOS_CACHE_VALIDADE_DIAS', 30))
+
+    # Sessão por token assinado (app/auth/sessao.py)
+    SESSAO_VALIDADE_HORAS = int(os.environ.get('SESSAO_VALIDADE_HORAS', 12))
+    # Idade máxima da sessão desde o login, mesmo renovando o token
+    SESSAO_IDADE_MAXIMA_HORAS = int(os.environ.get('SESSAO_IDADE_MAXIMA_HORAS', 7 * 24))
+    # Aceita o cabeçalho antigo X-User-Id (e-mail) de clientes que ainda não usam o token.
+    # Desligado por padrão: o cabeçalho não é assinado, qualquer um pode enviar o e-mail de outro usuário
+    AUTH_ACEITAR_X_USER_ID = os.environ.get('AUTH_ACEITAR_X_USER_ID', '0') == '1'
+    # Cache e-mail -> id usado com o X-User-Id
+    USUARIOS_CACHE_TTL_SEGUNDOS = int(os.environ.get('USUARIOS_CACHE_TTL_SEGUNDOS', 300))
+    USUARIOS_CACHE_MAX_ENTRADAS = int(os.environ.get('USUARIOS_CACHE_MAX_ENTRADAS', 1024))
+
+    # Painel de relatórios (GET /api/reports): validade do cache por worker
+    METRICAS_CACHE_TTL_SEGUNDOS = int(os.environ.get('METRICAS_CACHE_TTL_SEGUNDOS', 30))
+    # Agenda de produção (GET /api/reports/producao): validade do cache por worker
+    PRODUCAO_CACHE_TTL_SEGUNDOS = int(os.environ.get('PRODUCAO_CACHE_TTL_SEGUNDOS', 60))
+    # Comprovantes de retirada já gerados, por versão do pedido (cache em memória por worker)
+    COMPROVANTES_CACHE_MAX_ENTRADAS = int(os.environ.get('COMPROVANTES_CACHE_MAX_ENTRADAS', 256))
 
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    # Feed de alterações dos pedidos (GET /api/pedidos/stream)
+    # Por quanto tempo os eventos ficam guardados para um cliente retomar de onde parou
+    EVENTOS_RETENCAO_HORAS = int(os.environ.get('EVENTOS_RETENCAO_HORAS', 24))
+    # Intervalo dos comentários de keepalive (e da consulta aos eventos gravados por outros workers)
+    EVENTOS_KEEPALIVE_SEGUNDOS = int(os.environ.get('EVENTOS_KEEPALIVE_SEGUNDOS', 20))
+    # Cada conexão é encerrada depois deste tempo e o cliente reconecta (libera a thread do worker)
+    EVENTOS_DURACAO_MAXIMA_SEGUNDOS = int(os.environ.get('EVENTOS_DURACAO_MAXIMA_SEGUNDOS', 300))
+    EVENTOS_RECONEXAO_MS = int(os.environ.get('EVENTOS_RECONEXAO_MS', 3000))
+    # Streams abertos ao mesmo tempo por worker (cada um ocupa uma thread; deve ficar abaixo
+    # de GUNICORN_THREADS para sobrar thread às demais requisições) e o Retry-After do 503
+    EVENTOS_MAX_STREAMS_POR_WORKER = int(os.environ.get('EVENTOS_MAX_STREAMS_POR_WORKER', 4))
+    EVENTOS_ESPERA_LOTADO_SEGUNDOS = int(os.environ.get('EVENTOS_ESPERA_LOTADO_SEGUNDOS', 30))
\ No newline at end of file
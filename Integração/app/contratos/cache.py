@@ -0,0 +1,81 @@
+# Arquivo: app/contratos/cache.py
+# Cache dos dados extraídos de contratos, pela SHA-256 do PDF.
+#
+# Reenviar o mesmo contrato (ex: depois de um erro de validação no cadastro) não
+# passa de novo pelo PyPDF2 nem pelas regras de extração. Cada entrada guarda a
+# versão das regras que a gerou (VERSAO_REGRAS_CONTRATO); entradas de outra versão,
+# vencidas (CONTRATOS_CACHE_VALIDADE_DIAS) ou menos usadas além de
+# CONTRATOS_CACHE_MAX_ENTRADAS são descartadas.
+
+import json
+import hashlib
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models import CacheContrato, Pedido
+from app.Extractor import VERSAO_REGRAS_CONTRATO
+
+# Tamanho dos blocos lidos ao calcular o hash de um arquivo aberto
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+def hash_do_contrato(conteudo):
+    """SHA-256 (hexadecimal) dos bytes do PDF ou de um arquivo binário aberto (volta ao início ao final)."""
+    if isinstance(conteudo, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(conteudo).hexdigest()
+    sha256 = hashlib.sha256()
+    for bloco in iter(lambda: conteudo.read(TAMANHO_BLOCO_HASH), b''):
+        sha256.update(bloco)
+    conteudo.seek(0)
+    return sha256.hexdigest()
+
+def _validade():
+    return timedelta(days=current_app.config['CONTRATOS_CACHE_VALIDADE_DIAS'])
+
+def buscar_no_cache(sha256):
+    """Retorna (dados extraídos, confiança por campo) do contrato, ou None se não houver entrada válida."""
+    entrada = db.session.get(CacheContrato, sha256)
+    if entrada is None:
+        return None
+    agora = datetime.utcnow()
+    if entrada.versaoRegras != VERSAO_REGRAS_CONTRATO or entrada.createdAt < agora - _validade():
+        return None
+
+    entrada.ultimoAcesso = agora
+    db.session.commit()
+    return json.loads(entrada.dadosJson), json.loads(entrada.confiancaJson or '{}')
+
+def guardar_no_cache(sha256, dados_extraidos, confianca):
+    """Grava (ou substitui) a entrada do contrato e descarta as entradas excedentes."""
+    agora = datetime.utcnow()
+    entrada = db.session.get(CacheContrato, sha256) or CacheContrato(sha256=sha256)
+    entrada.versaoRegras = VERSAO_REGRAS_CONTRATO
+    entrada.dadosJson = json.dumps(dados_extraidos, ensure_ascii=False)
+    entrada.confiancaJson = json.dumps(confianca)
+    entrada.createdAt = agora
+    entrada.ultimoAcesso = agora
+    db.session.add(entrada)
+    db.session.commit()
+    _descartar_excedentes()
+
+def _descartar_excedentes():
+    """Remove entradas vencidas ou de outra versão das regras e, acima do limite, as menos acessadas (LRU)."""
+    limite_validade = datetime.utcnow() - _validade()
+    CacheContrato.query.filter(
+        (CacheContrato.createdAt < limite_validade) | (CacheContrato.versaoRegras != VERSAO_REGRAS_CONTRATO)
+    ).delete(synchronize_session=False)
+
+    excedentes = CacheContrato.query.count() - current_app.config['CONTRATOS_CACHE_MAX_ENTRADAS']
+    if excedentes > 0:
+        menos_usadas = (
+            db.session.query(CacheContrato.sha256)
+            .order_by(CacheContrato.ultimoAcesso)
+            .limit(excedentes)
+            .scalar_subquery()
+        )
+        CacheContrato.query.filter(CacheContrato.sha256.in_(menos_usadas)).delete(synchronize_session=False)
+    db.session.commit()
+
+def pedidos_do_contrato(sha256):
+    """IDs dos pedidos já criados a partir do mesmo contrato (mesmo hash do PDF)."""
+    return [pedido_id for (pedido_id,) in
+            db.session.query(Pedido.id).filter(Pedido.contratoSha256 == sha256).order_by(Pedido.id)]
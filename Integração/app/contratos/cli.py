@@ -0,0 +1,255 @@
+# Arquivo: app/contratos/cli.py
+# Extração de contratos em lote pela linha de comando (reprocessamento offline).
+#
+# Uso (na pasta Integração):
+#   python -m app.Extractor contratos/ "arquivo_morto/**/*.pdf" --saida extraidos.xlsx
+#   python -m app.Extractor contratos/ --saida extraidos.jsonl --inserir-pedidos --usuario admin@empresa.com
+#
+# Os PDFs são processados em paralelo pelo mesmo pool do upload em lote
+# (app/contratos/processamento.py), com os limites de tempo, páginas e tamanho
+# da configuração (podem ser trocados pelas opções).
+
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import argparse
+import datetime
+import openpyxl
+
+from app.config import Config
+from app.contratos.processamento import dados_para_pedido, processar_lote
+
+# Colunas das saídas .csv e .xlsx: uma linha por produto do contrato
+# (contratos sem produtos ou com erro ocupam uma linha com as colunas de produto vazias)
+COLUNAS_SAIDA = [
+    'Arquivo', 'Status', 'Erro', 'SHA-256',
+    'Contratante', 'RG', 'CPF', 'Contratado', 'CNPJ',
+    'Valor Total do Pedido', 'Data de Pagamento', 'Data do Evento', 'Local do Evento',
+    'Quantidade', 'Produto', 'Valor Unitário', 'Valor Total Item',
+]
+
+# Pedidos inseridos por comando INSERT (executemany)
+LOTE_INSERCAO = 500
+
+def encontrar_pdfs(entradas):
+    """Expande pastas (recursivamente) e padrões glob em uma lista ordenada de PDFs, sem repetições."""
+    encontrados = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = glob.glob(os.path.join(entrada, '**', '*'), recursive=True)
+        elif glob.has_magic(entrada):
+            candidatos = glob.glob(entrada, recursive=True)
+        else:
+            candidatos = [entrada]
+        encontrados.extend(c for c in sorted(candidatos) if c.lower().endswith('.pdf') and os.path.isfile(c))
+    return list(dict.fromkeys(encontrados))
+
+def ler_pdfs(caminhos, max_bytes):
+    """Gerador de (caminho, bytes) lendo um arquivo por vez; arquivos recusados saem com a mensagem de erro."""
+    for caminho in caminhos:
+        try:
+            if os.path.getsize(caminho) > max_bytes:
+                yield caminho, f'Arquivo maior que o limite de {max_bytes // (1024 * 1024)} MB.'
+                continue
+            with open(caminho, 'rb') as arquivo:
+                yield caminho, arquivo.read()
+        except OSError as e:
+            yield caminho, f'Erro ao ler o arquivo: {e}'
+
+def linhas_do_resultado(resultado):
+    """Achata o resultado de um contrato nas linhas de COLUNAS_SAIDA."""
+    if resultado['status'] != 'ok':
+        return [[resultado['arquivo'], 'erro', resultado['message']] + [''] * (len(COLUNAS_SAIDA) - 3)]
+
+    dados = resultado['dados']
+    contratante = dados['Contratante'] if isinstance(dados['Contratante'], dict) else {}
+    contratado = dados['Contratado'] if isinstance(dados['Contratado'], dict) else {}
+    base = [
+        resultado['arquivo'], 'ok', '', resultado['sha256'],
+        contratante.get('Nome', ''), contratante.get('RG', ''), contratante.get('CPF', ''),
+        contratado.get('Nome Empresa', ''), contratado.get('CNPJ', ''),
+        dados['Valor Total do Pedido'], dados['Data de Pagamento'], dados['Data do Evento'], dados['Local do Evento'],
+    ]
+    produtos = dados['Produtos Contratados'] or [{}]
+    return [
+        base + [p.get('Quantidade', ''), p.get('Produto', ''), p.get('Valor Unitário', ''), p.get('Valor Total Item', '')]
+        for p in produtos
+    ]
+
+class Saida:
+    """Grava os resultados conforme chegam, no formato indicado pela extensão (.xlsx, .csv ou .jsonl)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.formato = os.path.splitext(caminho)[1].lower()
+        if self.formato == '.jsonl':
+            self.arquivo = open(caminho, 'w', encoding='utf-8')
+        elif self.formato == '.csv':
+            self.arquivo = open(caminho, 'w', encoding='utf-8-sig', newline='')
+            self.escritor = csv.writer(self.arquivo, delimiter=';')
+            self.escritor.writerow(COLUNAS_SAIDA)
+        elif self.formato == '.xlsx':
+            self.workbook = openpyxl.Workbook(write_only=True)
+            self.sheet = self.workbook.create_sheet(title='Contratos')
+            self.sheet.append(COLUNAS_SAIDA)
+        else:
+            raise ValueError(f"Formato de saída não suportado: '{self.formato}'. Use .xlsx, .csv ou .jsonl.")
+
+    def gravar(self, resultado):
+        if self.formato == '.jsonl':
+            self.arquivo.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+        elif self.formato == '.csv':
+            self.escritor.writerows(linhas_do_resultado(resultado))
+        else:
+            for linha in linhas_do_resultado(resultado):
+                self.sheet.append(linha)
+
+    def fechar(self):
+        if self.formato == '.xlsx':
+            self.workbook.save(self.caminho)
+        else:
+            self.arquivo.close()
+
+def inserir_pedidos(resultados, email_usuario, tipo_pedido, permitir_duplicados):
+    """
+    Cria um Pedido para cada contrato extraído, em lotes de LOTE_INSERCAO por INSERT.
+    Contratos sem data do evento e (salvo 'permitir_duplicados') contratos que já geraram
+    um pedido são ignorados. Retorna (inseridos, lista de (arquivo, motivo) ignorados).
+    """
+    from sqlalchemy import insert
+    from app import create_app, db
+    from app.models import Pedido, User
+    from app.utils import normalizar_data
+    from app.relatorios.metricas import fotografia, registrar_alteracoes
+    from app.pedidos.itens import gravar_itens
+    from app.pedidos.eventos import registrar_eventos
+
+    app = create_app()
+    with app.app_context():
+        user = User.query.filter_by(email=email_usuario).first()
+        if not user:
+            raise ValueError(f"Usuário '{email_usuario}' não encontrado.")
+
+        ja_usados = set()
+        if not permitir_duplicados:
+            hashes = [r['sha256'] for r in resultados]
+            for inicio in range(0, len(hashes), LOTE_INSERCAO):
+                ja_usados.update(sha256 for (sha256,) in db.session.query(Pedido.contratoSha256).filter(
+                    Pedido.contratoSha256.in_(hashes[inicio:inicio + LOTE_INSERCAO])))
+
+        linhas = []
+        ignorados = []
+        for resultado in resultados:
+            if resultado['sha256'] in ja_usados:
+                ignorados.append((resultado['arquivo'], 'contrato já usado em outro pedido'))
+                continue
+            campos = dados_para_pedido(resultado['dados'], os.path.basename(resultado['arquivo']))
+            data_evento = normalizar_data(campos['dataEvento'])
+            if data_evento is None:
+                ignorados.append((resultado['arquivo'], 'data do evento não encontrada'))
+                continue
+            ja_usados.add(resultado['sha256'])
+            linhas.append({
+                **{campo: campos[campo] for campo in (
+                    'clienteNome', 'clienteRG', 'clienteCPF', 'nomeContratado', 'cnpjContratado',
+                    'valorTotalPedidoContrato', 'localEvento', 'produtosContratadosJson',
+                    'observacoes', 'quantidade', 'sabores')},
+                'dataEvento': data_evento,
+                # Mesmo padrão do cadastro a partir de contrato: retirada no dia do evento, ao meio-dia
+                'dataRetirada': data_evento,
+                'horarioRetirada': datetime.time(12, 0),
+                'dataPagamentoContrato': normalizar_data(campos['dataPagamentoContrato']),
+                'tipoPedido': tipo_pedido,
+                'tipoEmbalagem': '',
+                'status': 'pendente',
+                'user_id': user.id,
+                'contratoSha256': resultado['sha256'],
+                'createdAt': datetime.datetime.utcnow(),
+            })
+
+        for inicio in range(0, len(linhas), LOTE_INSERCAO):
+            lote = linhas[inicio:inicio + LOTE_INSERCAO]
+            ids = db.session.scalars(insert(Pedido).returning(Pedido.id, sort_by_parameter_order=True), lote).all()
+            gravar_itens(zip(ids, (linha['produtosContratadosJson'] for linha in lote)))
+        registrar_alteracoes(depois=[fotografia(linha) for linha in linhas])
+        if linhas:
+            registrar_eventos('recarregar', [(None, None, {'pedidos': len(linhas)})])
+        db.session.commit()
+    return len(linhas), ignorados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m app.Extractor',
+        description='Extrai os dados de contratos em PDF em lote.')
+    parser.add_argument('entradas', nargs='+', help='Pastas, arquivos .pdf ou padrões glob (ex: "contratos/**/*.pdf").')
+    parser.add_argument('--saida', help='Arquivo consolidado: .xlsx, .csv ou .jsonl.')
+    parser.add_argument('--processos', type=int, default=Config.CONTRATOS_MAX_PROCESSOS)
+    parser.add_argument('--timeout', type=int, default=Config.CONTRATOS_TIMEOUT_SEGUNDOS, help='Segundos por arquivo.')
+    parser.add_argument('--max-paginas', type=int, default=Config.CONTRATOS_MAX_PAGINAS)
+    parser.add_argument('--max-bytes', type=int, default=Config.CONTRATOS_MAX_BYTES)
+    parser.add_argument('--inserir-pedidos', action='store_true', help='Cria um pedido para cada contrato extraído.')
+    parser.add_argument('--usuario', help='E-mail do usuário dono dos pedidos criados (com --inserir-pedidos).')
+    parser.add_argument('--tipo-pedido', default='Contrato', help='Tipo dos pedidos criados (padrão: Contrato).')
+    parser.add_argument('--permitir-duplicados', action='store_true',
+                        help='Cria pedidos mesmo para contratos que já geraram um pedido.')
+    args = parser.parse_args(argv)
+
+    if args.inserir_pedidos and not args.usuario:
+        parser.error('--inserir-pedidos exige --usuario.')
+
+    caminhos = encontrar_pdfs(args.entradas)
+    if not caminhos:
+        print('Nenhum PDF encontrado.', file=sys.stderr)
+        return 1
+
+    try:
+        saida = Saida(args.saida) if args.saida else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f'Processando {len(caminhos)} contrato(s) com {args.processos} processo(s)...')
+    inicio = time.perf_counter()
+    total_bytes = sum(os.path.getsize(c) for c in caminhos)
+    extraidos = []
+    erros = 0
+    resultados = processar_lote(
+        ler_pdfs(caminhos, args.max_bytes),
+        max_processos=args.processos, timeout=args.timeout, max_paginas=args.max_paginas,
+    )
+    for indice, resultado in enumerate(resultados, start=1):
+        if resultado['status'] == 'ok':
+            extraidos.append(resultado)
+        else:
+            erros += 1
+            print(f"  ERRO {resultado['arquivo']}: {resultado['message']}", file=sys.stderr)
+        if saida:
+            saida.gravar(resultado)
+        if indice % 50 == 0:
+            decorrido = time.perf_counter() - inicio
+            print(f'  {indice}/{len(caminhos)} ({indice / decorrido:.1f} arquivos/s)')
+    if saida:
+        saida.fechar()
+
+    decorrido = time.perf_counter() - inicio
+    print(f'\n{len(caminhos)} arquivo(s) em {decorrido:.1f}s: {len(extraidos)} extraído(s), {erros} com erro.')
+    print(f'Vazão: {len(caminhos) / decorrido:.1f} arquivos/s, {total_bytes / (1024 * 1024) / decorrido:.1f} MB/s.')
+    if extraidos:
+        tempos = sorted(r['tempo_ms'] for r in extraidos)
+        print(f'Tempo por arquivo: mediana {tempos[len(tempos) // 2]:.0f} ms, máximo {tempos[-1]:.0f} ms.')
+    if saida:
+        print(f'Resultados gravados em: {args.saida}')
+
+    if args.inserir_pedidos and extraidos:
+        try:
+            inseridos, ignorados = inserir_pedidos(extraidos, args.usuario, args.tipo_pedido, args.permitir_duplicados)
+        except ValueError as e:
+            print(f'ERRO: {e}', file=sys.stderr)
+            return 1
+        print(f'{inseridos} pedido(s) criado(s).')
+        for arquivo, motivo in ignorados:
+            print(f'  Ignorado {arquivo}: {motivo}', file=sys.stderr)
+
+    return 1 if erros else 0
@@ -0,0 +1,273 @@
+# Arquivo: app/contratos/processamento.py
+# Extração de dados de contratos fora da thread da requisição.
+#
+# O PyPDF2 consome muita CPU, então cada contrato de um lote é processado em um
+# ProcessPoolExecutor próprio (criado sob demanda em cada worker do gunicorn),
+# com limite de tempo, de páginas e de tamanho por arquivo. Os resultados são
+# entregues conforme ficam prontos, para a rota enviá-los em NDJSON.
+
+import os
+import json
+import time
+import hashlib
+import signal
+import zipfile
+import zlib
+import lzma
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from app.Extractor import (
+    extrair_texto_de_pdf, extrair_dados_do_contrato_detalhado, LimiteDoPdfExcedido, FIM_DOS_CAMPOS_CONTRATO
+)
+from app.utils import normalizar_data
+
+_pool = None
+_pool_pid = None
+
+# Quantos arquivos ficam aguardando no pool por processo (limita a memória usada pelo lote)
+ARQUIVOS_EM_ESPERA_POR_PROCESSO = 2
+
+def dados_para_pedido(dados_extraidos_raw, nome_arquivo):
+    """
+    Mapeia os dados extraídos para o formato que o formulário de pedido espera.
+    Isso permite que o frontend pré-preencha o formulário de criação de pedido.
+    """
+    contratante = dados_extraidos_raw.get('Contratante')
+    contratante = contratante if isinstance(contratante, dict) else {}  # Pode ser "Não encontrado"
+    contratado = dados_extraidos_raw.get('Contratado')
+    contratado = contratado if isinstance(contratado, dict) else {}
+
+    extracted_data_for_pedido = {
+        'clienteNome': contratante.get('Nome', 'Cliente Desconhecido'),
+        'clienteRG': contratante.get('RG', ''),
+        'clienteCPF': contratante.get('CPF', ''),
+        'nomeContratado': contratado.get('Nome Empresa', ''),
+        'cnpjContratado': contratado.get('CNPJ', ''),
+        'valorTotalPedidoContrato': dados_extraidos_raw.get('Valor Total do Pedido', ''),
+        'dataPagamentoContrato': data_do_contrato_iso(dados_extraidos_raw.get('Data de Pagamento')),
+        'dataEvento': data_do_contrato_iso(dados_extraidos_raw.get('Data do Evento')),
+        'localEvento': dados_extraidos_raw.get('Local do Evento', ''),
+        'produtosContratadosJson': json.dumps(dados_extraidos_raw.get('Produtos Contratados', [])),
+        'observacoes': f"Extraído de contrato: {nome_arquivo}. Valor Total: R${dados_extraidos_raw.get('Valor Total do Pedido', 'N/A')}",
+    }
+
+    # Calcula a quantidade total de produtos e os sabores
+    total_quantidade_produtos = 0
+    sabores_list = []
+    if isinstance(dados_extraidos_raw.get('Produtos Contratados'), list):
+        for produto_item in dados_extraidos_raw['Produtos Contratados']:
+            try:
+                total_quantidade_produtos += int(produto_item.get('Quantidade', '0'))
+            except (ValueError, TypeError):
+                pass # Ignora se a quantidade não for um número válido
+            if produto_item.get('Produto'):
+                sabores_list.append(produto_item['Produto'])
+
+    extracted_data_for_pedido['quantidade'] = total_quantidade_produtos
+    extracted_data_for_pedido['sabores'] = ', '.join(sabores_list)
+    return extracted_data_for_pedido
+
+def data_do_contrato_iso(valor):
+    """Normaliza uma data extraída do contrato (ex: '02/07/2025') para 'YYYY-MM-DD', ou '' se ausente."""
+    try:
+        data = normalizar_data(valor)
+    except ValueError:
+        return ''  # Ex: 'Não encontrada'
+    return data.isoformat() if data else ''
+
+# ==============================================================================
+# Processamento de um contrato (roda dentro de um processo do pool)
+# ==============================================================================
+def _estourou_o_tempo(signum, frame):
+    raise TimeoutError()
+
+@contextlib.contextmanager
+def _limite_de_tempo(segundos):
+    """
+    Interrompe o bloco com TimeoutError depois de 'segundos' (via SIGALRM).
+    Em sistemas sem SIGALRM (Windows) o bloco roda sem limite.
+    """
+    if not segundos or not hasattr(signal, 'setitimer'):
+        yield
+        return
+    anterior = signal.signal(signal.SIGALRM, _estourou_o_tempo)
+    signal.setitimer(signal.ITIMER_REAL, segundos)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, anterior)
+
+class ContratoIlegivel(ValueError):
+    """Não foi possível extrair texto do PDF."""
+
+def extrair_contrato(origem, max_paginas=None):
+    """
+    Extrai o texto e os dados de um contrato (caminho, bytes ou arquivo aberto).
+    As páginas depois da última seção usada pelas regras não são lidas.
+    Retorna (dados extraídos, confiança por campo). Lança ContratoIlegivel se o PDF
+    não tiver texto e LimiteDoPdfExcedido se passar de 'max_paginas'.
+    """
+    texto_extraido = extrair_texto_de_pdf(origem, max_paginas=max_paginas, parar_apos=FIM_DOS_CAMPOS_CONTRATO)
+    if not texto_extraido:
+        raise ContratoIlegivel('Não foi possível extrair texto do contrato.')
+    dados_extraidos_raw, detalhes_extracao = extrair_dados_do_contrato_detalhado(texto_extraido)
+    return dados_extraidos_raw, {campo: info['confianca'] for campo, info in detalhes_extracao.items()}
+
+def processar_contrato(nome_arquivo, conteudo, max_paginas=None, timeout=None):
+    """
+    Extrai os dados de um contrato (bytes do PDF). Nunca lança exceção: retorna
+    {'arquivo', 'status': 'ok', 'dados', 'confianca', 'sha256', 'tempo_ms'}
+    ou {'arquivo', 'status': 'erro', 'message'}.
+    """
+    inicio = time.perf_counter()
+    try:
+        with _limite_de_tempo(timeout):
+            dados_extraidos_raw, confianca = extrair_contrato(conteudo, max_paginas)
+    except TimeoutError:
+        return _erro(nome_arquivo, f'Tempo limite de {timeout}s excedido ao processar o contrato.')
+    except (LimiteDoPdfExcedido, ContratoIlegivel) as e:
+        return _erro(nome_arquivo, str(e))
+    except Exception as e:
+        return _erro(nome_arquivo, f'Erro ao processar o contrato: {str(e)}')
+
+    return {
+        'arquivo': nome_arquivo,
+        'status': 'ok',
+        'dados': dados_extraidos_raw,
+        'confianca': confianca,
+        'sha256': hashlib.sha256(conteudo).hexdigest(),
+        'tempo_ms': round((time.perf_counter() - inicio) * 1000, 1),
+    }
+
+def _erro(nome_arquivo, mensagem):
+    return {'arquivo': nome_arquivo, 'status': 'erro', 'message': mensagem}
+
+# ==============================================================================
+# Lote
+# ==============================================================================
+def _obter_pool(max_processos):
+    """Cria o pool no primeiro lote do processo atual (seguro após fork do gunicorn)."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        # 'spawn' evita herdar conexões do banco e threads do worker web
+        _pool = ProcessPoolExecutor(max_workers=max_processos, mp_context=multiprocessing.get_context('spawn'))
+        _pool_pid = os.getpid()
+    return _pool
+
+def _descartar_pool():
+    """Descarta um pool quebrado (ex: processo morto por falta de memória); o próximo lote cria outro."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+def arquivos_do_lote(uploads, max_bytes, max_arquivos):
+    """
+    Gerador de (nome, bytes do PDF) a partir dos arquivos enviados ((nome, stream)),
+    abrindo os .zip. Arquivos recusados saem como (nome, mensagem de erro em str).
+    Os streams são fechados ao final.
+    """
+    total = 0
+    try:
+        for nome, stream in uploads:
+            if nome.lower().endswith('.zip'):
+                try:
+                    compactado = zipfile.ZipFile(stream)
+                except zipfile.BadZipFile:
+                    yield nome, 'Arquivo .zip inválido.'
+                    continue
+                with compactado:
+                    for info in compactado.infolist():
+                        if info.is_dir() or info.filename.startswith('__MACOSX/'):
+                            continue
+                        total += 1
+                        if total > max_arquivos:
+                            yield info.filename, f'Limite de {max_arquivos} arquivos por lote excedido.'
+                            return
+                        if not info.filename.lower().endswith('.pdf'):
+                            yield info.filename, 'Formato de arquivo inválido. Apenas .pdf é permitido.'
+                        elif info.file_size > max_bytes:
+                            # Verificado pelo tamanho declarado, antes de descompactar
+                            yield info.filename, f'Arquivo maior que o limite de {max_bytes // (1024 * 1024)} MB.'
+                        else:
+                            yield info.filename, _ler_do_zip(compactado, info)
+                continue
+
+            total += 1
+            if total > max_arquivos:
+                yield nome, f'Limite de {max_arquivos} arquivos por lote excedido.'
+                return
+            if not nome.lower().endswith('.pdf'):
+                yield nome, 'Formato de arquivo inválido. Apenas .pdf ou .zip são permitidos.'
+                continue
+            conteudo = stream.read(max_bytes + 1)
+            if len(conteudo) > max_bytes:
+                yield nome, f'Arquivo maior que o limite de {max_bytes // (1024 * 1024)} MB.'
+            else:
+                yield nome, conteudo
+    finally:
+        for _, stream in uploads:
+            stream.close()
+
+def _ler_do_zip(compactado, info):
+    """Bytes de um arquivo do .zip, ou a mensagem de erro (str) se ele não puder ser lido."""
+    try:
+        return compactado.read(info)
+    except NotImplementedError:  # Subclasse de RuntimeError: precisa vir antes
+        return 'Método de compressão não suportado dentro do .zip.'
+    except RuntimeError:
+        return 'Arquivo protegido por senha dentro do .zip.'
+    except (zipfile.BadZipFile, zlib.error, EOFError, OSError, lzma.LZMAError):
+        # CRC errado, cabeçalho inválido ou dados compactados corrompidos
+        return 'Arquivo corrompido dentro do .zip.'
+
+def processar_lote(arquivos, max_processos, timeout, max_paginas):
+    """
+    Distribui os contratos de 'arquivos' ((nome, bytes ou mensagem de erro), ver
+    arquivos_do_lote) entre os processos do pool e gera os resultados de
+    processar_contrato na ordem em que ficam prontos. Um dict no lugar dos bytes
+    é um resultado já pronto (ex: vindo do cache) e é entregue sem passar pelo pool.
+    """
+    pool = _obter_pool(max_processos)
+    limite_em_espera = max_processos * ARQUIVOS_EM_ESPERA_POR_PROCESSO
+    nomes_por_futuro = {}
+
+    def resultado(futuro):
+        nome = nomes_por_futuro.pop(futuro)
+        try:
+            return futuro.result()
+        except BrokenProcessPool:
+            _descartar_pool()
+            return _erro(nome, 'O processo de extração foi encerrado inesperadamente.')
+
+    pendentes = set()
+    for nome, conteudo in arquivos:
+        if isinstance(conteudo, str):
+            yield _erro(nome, conteudo)
+            continue
+        if isinstance(conteudo, dict):
+            yield conteudo
+            continue
+        try:
+            futuro = pool.submit(processar_contrato, nome, conteudo, max_paginas, timeout)
+        except BrokenProcessPool:
+            _descartar_pool()
+            pool = _obter_pool(max_processos)
+            futuro = pool.submit(processar_contrato, nome, conteudo, max_paginas, timeout)
+        nomes_por_futuro[futuro] = nome
+        pendentes.add(futuro)
+
+        # Não envia o lote inteiro de uma vez: os bytes de cada PDF ficam em memória até serem processados
+        if len(pendentes) >= limite_em_espera:
+            concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                yield resultado(futuro)
+
+    while pendentes:
+        concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+        for futuro in concluidos:
+            yield resultado(futuro)
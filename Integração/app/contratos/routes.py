@@ -1,21 +1,37 @@
 # Arquivo: app/contratos/routes.py
 
-import os
+import io
 import json
-from flask import Blueprint, request, jsonify, current_app
+import time
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 
-# Importa as funções do nosso módulo Extractor
-from app.Extractor import extrair_texto_de_pdf, extrair_dados_do_contrato
+from app.contratos.processamento import (
+    ContratoIlegivel, dados_para_pedido, extrair_contrato, arquivos_do_lote, processar_lote
+)
+from app.contratos.cache import hash_do_contrato, buscar_no_cache, guardar_no_cache, pedidos_do_contrato
+from app.auth.sessao import usuario_obrigatorio
 
 # O Blueprint continua o mesmo
 contratos_bp = Blueprint('contratos', __name__, url_prefix='/api/contracts')
 
+def resposta_do_contrato(nome_arquivo, dados_extraidos_raw, confianca, sha256, do_cache):
+    """Monta a resposta de um contrato extraído, com o aviso de contrato já usado em outro pedido."""
+    extracted_data_for_pedido = dados_para_pedido(dados_extraidos_raw, nome_arquivo)
+    # Volta no POST /api/pedidos para gravar a origem do pedido e detectar duplicados
+    extracted_data_for_pedido['contratoSha256'] = sha256
+    pedidos_existentes = pedidos_do_contrato(sha256)
+    return {
+        'extractedData': extracted_data_for_pedido,
+        # Confiança (0 a 1) de cada campo, para o frontend destacar o que precisa de revisão
+        'confiancaExtracao': confianca,
+        'cache': do_cache,
+        'contratoDuplicado': bool(pedidos_existentes),
+        'pedidosDoContrato': pedidos_existentes,
+    }
+
 @contratos_bp.route('/upload', methods=['POST'])
+@usuario_obrigatorio
 def upload_contract():
-    user_id = request.headers.get('X-User-Id')
-    if not user_id:
-        return jsonify({'message': 'Usuário não autenticado.'}), 401
-
     if 'file' not in request.files:
         return jsonify({'message': 'Nenhum arquivo enviado.'}), 400
 
@@ -23,64 +39,99 @@ def upload_contract():
     if file.filename == '':
         return jsonify({'message': 'Nenhum arquivo selecionado.'}), 400
 
-    upload_folder = current_app.config.get('UPLOAD_FOLDER')
-    if not upload_folder:
-        return jsonify({'message': 'Pasta de upload não configurada.'}), 500
-
     if not file.filename.endswith('.pdf'):
          return jsonify({'message': 'Formato de arquivo inválido. Apenas .pdf é permitido.'}), 400
 
-    filepath = os.path.join(upload_folder, file.filename)
-    file.save(filepath)
-
-    try:
-        texto_extraido = extrair_texto_de_pdf(filepath)
-        if not texto_extraido:
-            return jsonify({'message': 'Não foi possível extrair texto do contrato.'}), 500
-
-        dados_extraidos_raw = extrair_dados_do_contrato(texto_extraido)
-
-        # Mapeia os dados extraídos para o formato que o formulário de pedido espera
-        # Isso permite que o frontend pré-preencha o formulário de criação de pedido
-        extracted_data_for_pedido = {
-            'clienteNome': dados_extraidos_raw.get('Contratante', {}).get('Nome', 'Cliente Desconhecido'),
-            'clienteRG': dados_extraidos_raw.get('Contratante', {}).get('RG', ''),
-            'clienteCPF': dados_extraidos_raw.get('Contratante', {}).get('CPF', ''),
-            'nomeContratado': dados_extraidos_raw.get('Contratado', {}).get('Nome Empresa', ''),
-            'cnpjContratado': dados_extraidos_raw.get('Contratado', {}).get('CNPJ', ''),
-            'valorTotalPedidoContrato': dados_extraidos_raw.get('Valor Total do Pedido', ''),
-            'dataPagamentoContrato': dados_extraidos_raw.get('Data de Pagamento', ''),
-            'dataEvento': dados_extraidos_raw.get('Data do Evento', '').replace('/', '-'),
-            'localEvento': dados_extraidos_raw.get('Local do Evento', ''),
-            'produtosContratadosJson': json.dumps(dados_extraidos_raw.get('Produtos Contratados', [])),
-            'observacoes': f"Extraído de contrato: {file.filename}. Valor Total: R${dados_extraidos_raw.get('Valor Total do Pedido', 'N/A')}",
-        }
-        
-        # Calcula a quantidade total de produtos e os sabores
-        total_quantidade_produtos = 0
-        sabores_list = []
-        if isinstance(dados_extraidos_raw.get('Produtos Contratados'), list):
-            for produto_item in dados_extraidos_raw['Produtos Contratados']:
-                try:
-                    total_quantidade_produtos += int(produto_item.get('Quantidade', '0'))
-                except (ValueError, TypeError):
-                    pass # Ignora se a quantidade não for um número válido
-                if produto_item.get('Produto'):
-                    sabores_list.append(produto_item['Produto'])
-        
-        extracted_data_for_pedido['quantidade'] = total_quantidade_produtos
-        extracted_data_for_pedido['sabores'] = ', '.join(sabores_list)
-        
-        # A resposta agora envia os dados mapeados para o frontend usar
+    # O PDF é lido direto do stream do upload: nada é gravado em disco, e uploads
+    # simultâneos com o mesmo nome de arquivo não interferem entre si
+    sha256 = hash_do_contrato(file.stream)
+    em_cache = buscar_no_cache(sha256)
+    if em_cache:
+        dados_extraidos_raw, confianca = em_cache
         return jsonify({
             'message': 'Dados extraídos com sucesso! Revise para salvar como pedido.',
-            'extractedData': extracted_data_for_pedido,
+            **resposta_do_contrato(file.filename, dados_extraidos_raw, confianca, sha256, do_cache=True),
         }), 200
 
+    try:
+        dados_extraidos_raw, confianca = extrair_contrato(file.stream)
+    except ContratoIlegivel as e:
+        return jsonify({'message': str(e)}), 500
     except Exception as e:
         print(f"Erro ao processar o arquivo de contrato: {e}")
         return jsonify({'message': f'Erro ao processar o contrato: {str(e)}'}), 500
-    finally:
-        # Garante que o arquivo temporário seja sempre removido
-        if os.path.exists(filepath):
-            os.remove(filepath)
\ No newline at end of file
+    guardar_no_cache(sha256, dados_extraidos_raw, confianca)
+
+    # A resposta agora envia os dados mapeados para o frontend usar
+    return jsonify({
+        'message': 'Dados extraídos com sucesso! Revise para salvar como pedido.',
+        **resposta_do_contrato(file.filename, dados_extraidos_raw, confianca, sha256, do_cache=False),
+    }), 200
+
+@contratos_bp.route('/upload-batch', methods=['POST'])
+@usuario_obrigatorio
+def upload_contracts_batch():
+    """
+    Recebe vários PDFs (e/ou arquivos .zip com PDFs) no campo 'files' e extrai os dados
+    de cada um em paralelo. A resposta é NDJSON: uma linha por arquivo, na ordem em que
+    ficam prontos, e uma última linha com o resumo do lote.
+    """
+    arquivos = [f for f in request.files.getlist('files') + request.files.getlist('file') if f.filename]
+    if not arquivos:
+        return jsonify({'message': 'Nenhum arquivo enviado.'}), 400
+
+    # O Flask fecha os arquivos da requisição quando a view retorna, antes da resposta
+    # ser gerada. O lote assume os streams e os fecha ao terminar (ver arquivos_do_lote).
+    uploads = []
+    for arquivo in arquivos:
+        uploads.append((arquivo.filename, arquivo.stream))
+        arquivo.stream = io.BytesIO()
+
+    config = current_app.config
+
+    def consultar_cache(contratos):
+        """Troca os contratos já extraídos antes pelo resultado em cache."""
+        for nome, conteudo in contratos:
+            if isinstance(conteudo, bytes):
+                sha256 = hash_do_contrato(conteudo)
+                em_cache = buscar_no_cache(sha256)
+                if em_cache:
+                    dados_extraidos_raw, confianca = em_cache
+                    conteudo = {'arquivo': nome, 'status': 'ok', 'dados': dados_extraidos_raw,
+                                'confianca': confianca, 'sha256': sha256, 'cache': True}
+            yield nome, conteudo
+
+    def gerar():
+        inicio = time.perf_counter()
+        total = sucesso = 0
+        contratos = arquivos_do_lote(uploads, config['CONTRATOS_MAX_BYTES'], config['CONTRATOS_MAX_ARQUIVOS_LOTE'])
+        resultados = processar_lote(
+            consultar_cache(contratos),
+            max_processos=config['CONTRATOS_MAX_PROCESSOS'],
+            timeout=config['CONTRATOS_TIMEOUT_SEGUNDOS'],
+            max_paginas=config['CONTRATOS_MAX_PAGINAS'],
+        )
+        for resultado in resultados:
+            total += 1
+            if resultado['status'] == 'ok':
+                sucesso += 1
+                do_cache = resultado.pop('cache', False)
+                if not do_cache:
+                    guardar_no_cache(resultado['sha256'], resultado['dados'], resultado['confianca'])
+                resultado = {
+                    'arquivo': resultado['arquivo'],
+                    'status': 'ok',
+                    **resposta_do_contrato(resultado['arquivo'], resultado['dados'], resultado['confianca'],
+                                           resultado['sha256'], do_cache),
+                    'tempo_ms': resultado.get('tempo_ms', 0),
+                }
+            yield json.dumps(resultado, ensure_ascii=False) + '\n'
+
+        yield json.dumps({'resumo': {
+            'total': total,
+            'sucesso': sucesso,
+            'erros': total - sucesso,
+            'tempo_s': round(time.perf_counter() - inicio, 2),
+        }}, ensure_ascii=False) + '\n'
+
+    return Response(stream_with_context(gerar()), mimetype='application/x-ndjson')
\ No newline at end of file
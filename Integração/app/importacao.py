@@ -0,0 +1,302 @@
+# Arquivo: app/importacao.py
+# Importação do data.json da versão antiga (antes do banco), com: flask importar-legado data.json
+#
+# O arquivo tem {"users": {email: {"password": ...}}, "pedidos": [{...}]}, com IDs em
+# texto ('1754687178.986872'), o dono do pedido em 'userId' (e-mail) e datas em formatos
+# misturados. Ele é lido aos poucos (exportações de outras lojas podem ter milhões de
+# pedidos) e os pedidos são gravados em lotes: COPY no PostgreSQL, executemany nos demais.
+# O ID antigo fica em pedido.idLegado, então rodar a importação de novo não duplica nada.
+
+import re
+import csv
+import io
+import json
+import time
+from functools import lru_cache
+from datetime import datetime, time as dt_time
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import insert, text
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import Pedido, User
+from app.utils import normalizar_data, normalizar_horario
+from app.relatorios.metricas import fotografia, registrar_alteracoes
+from app.pedidos.itens import gravar_itens
+from app.pedidos.eventos import registrar_eventos
+
+# Caracteres lidos do arquivo por vez
+TAMANHO_BLOCO = 1024 * 1024
+
+# Colunas gravadas pela importação, na ordem usada pelo COPY
+COLUNAS_IMPORTADAS = [
+    'idLegado', 'user_id', 'clienteNome', 'dataEvento', 'dataRetirada', 'horarioRetirada',
+    'tipoPedido', 'quantidade', 'sabores', 'tipoEmbalagem', 'observacoes', 'status', 'createdAt', 'updatedAt',
+    'clienteRG', 'clienteCPF', 'nomeContratado', 'cnpjContratado', 'valorTotalPedidoContrato',
+    'dataPagamentoContrato', 'localEvento', 'produtosContratadosJson',
+]
+CAMPOS_TEXTO = [
+    'sabores', 'tipoEmbalagem', 'observacoes', 'clienteRG', 'clienteCPF', 'nomeContratado',
+    'cnpjContratado', 'valorTotalPedidoContrato', 'localEvento',
+]
+
+# As mesmas datas e horários se repetem em milhares de pedidos: cada texto é convertido uma vez
+_data = lru_cache(maxsize=8192)(normalizar_data)
+_horario = lru_cache(maxsize=1024)(normalizar_horario)
+
+# Quantos erros de pedidos individuais são mostrados (o total sempre aparece no resumo)
+MAX_ERROS_EXIBIDOS = 20
+
+_ESPACOS = re.compile(r'[ \t\r\n]*')
+
+class LeitorJson:
+    """
+    Percorre um documento JSON grande sem carregá-lo inteiro: só o valor sendo
+    decodificado (um usuário, um pedido) fica em memória.
+    """
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.fim = False
+
+    def _ler_mais(self):
+        bloco = self.arquivo.read(TAMANHO_BLOCO)
+        if not bloco:
+            self.fim = True
+            return False
+        self.buffer = self.buffer[self.pos:] + bloco
+        self.pos = 0
+        return True
+
+    def proximo_caractere(self):
+        """Pula os espaços e retorna o próximo caractere, sem consumi-lo."""
+        while True:
+            self.pos = _ESPACOS.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._ler_mais():
+                raise ValueError('JSON incompleto.')
+
+    def consumir(self, esperado):
+        encontrado = self.proximo_caractere()
+        if encontrado != esperado:
+            raise ValueError(f"JSON inválido: esperado '{esperado}', encontrado '{encontrado}'.")
+        self.pos += 1
+
+    def valor(self):
+        """Decodifica o próximo valor completo (objeto, lista, texto, número...)."""
+        self.proximo_caractere()
+        while True:
+            try:
+                valor, fim = self.decoder.raw_decode(self.buffer, self.pos)
+                # Um número no fim do bloco pode continuar no próximo
+                if fim < len(self.buffer) or self.fim:
+                    self.pos = fim
+                    return valor
+            except json.JSONDecodeError:
+                if self.fim:
+                    raise
+            self._ler_mais()
+
+    def chaves_do_objeto(self):
+        """Gera as chaves de um objeto; o valor de cada uma deve ser lido antes da próxima."""
+        self.consumir('{')
+        if self.proximo_caractere() == '}':
+            self.pos += 1
+            return
+        while True:
+            chave = self.valor()
+            self.consumir(':')
+            yield chave
+            if self.proximo_caractere() == ',':
+                self.pos += 1
+            else:
+                self.consumir('}')
+                return
+
+    def elementos_da_lista(self):
+        """Gera os elementos de uma lista, um por vez."""
+        self.consumir('[')
+        if self.proximo_caractere() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.valor()
+            if self.proximo_caractere() == ',':
+                self.pos += 1
+            else:
+                self.consumir(']')
+                return
+
+def registros_legados(arquivo):
+    """Gera ('usuario', email, dados) e ('pedido', None, dados) na ordem em que aparecem no arquivo."""
+    leitor = LeitorJson(arquivo)
+    for chave in leitor.chaves_do_objeto():
+        if chave == 'users' and leitor.proximo_caractere() == '{':
+            for email in leitor.chaves_do_objeto():
+                yield 'usuario', email, leitor.valor()
+        elif chave == 'pedidos' and leitor.proximo_caractere() == '[':
+            for pedido in leitor.elementos_da_lista():
+                yield 'pedido', None, pedido
+        else:
+            leitor.valor()  # Chave desconhecida: ignora o valor
+
+def linha_do_pedido(bruto, user_id):
+    """
+    Converte um pedido do data.json para os valores de COLUNAS_IMPORTADAS.
+    Lança ValueError se faltar algo sem o qual o pedido não pode ser gravado.
+    """
+    data_evento = _data(bruto.get('dataEvento'))
+    if data_evento is None:
+        raise ValueError('sem data do evento')
+    try:
+        quantidade = int(float(bruto.get('quantidade') or 0))
+    except (ValueError, TypeError):
+        raise ValueError(f"quantidade inválida: '{bruto.get('quantidade')}'")
+    try:
+        data_pagamento = _data(bruto.get('dataPagamentoContrato'))
+    except ValueError:
+        data_pagamento = None  # Campo opcional, vindo de contrato: não impede a importação
+    criado_em = bruto.get('createdAt')
+
+    linha = {
+        'idLegado': str(bruto['id']),
+        'user_id': user_id,
+        'clienteNome': bruto.get('clienteNome') or 'Cliente Desconhecido',
+        'dataEvento': data_evento,
+        # Mesmo padrão do cadastro a partir de contrato: retirada no dia do evento, ao meio-dia
+        'dataRetirada': _data(bruto.get('dataRetirada')) or data_evento,
+        'horarioRetirada': _horario(bruto.get('horarioRetirada')) or dt_time(12, 0),
+        'tipoPedido': bruto.get('tipoPedido') or '',
+        'quantidade': quantidade,
+        'status': bruto.get('status') or 'pendente',
+        'createdAt': datetime.fromisoformat(criado_em) if criado_em else datetime.utcnow(),
+        'updatedAt': datetime.utcnow(),
+        'dataPagamentoContrato': data_pagamento,
+        'produtosContratadosJson': bruto.get('produtosContratadosJson') or '[]',
+    }
+    for campo in CAMPOS_TEXTO:
+        linha[campo] = str(bruto.get(campo) or '')
+    return linha
+
+def _inserir_com_copy(linhas):
+    """PostgreSQL: COPY para uma tabela temporária e INSERT ... ON CONFLICT a partir dela."""
+    colunas = ', '.join(f'"{coluna}"' for coluna in COLUNAS_IMPORTADAS)
+    conexao = db.session.connection()
+    conexao.execute(text(
+        f'CREATE TEMP TABLE IF NOT EXISTS pedido_importacao ON COMMIT DELETE ROWS '
+        f'AS SELECT {colunas} FROM pedido WITH NO DATA'
+    ))
+
+    # Em CSV, None vira campo vazio (NULL) e '' vira "" (texto vazio)
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for linha in linhas:
+        escritor.writerow([linha[coluna] for coluna in COLUNAS_IMPORTADAS])
+    buffer.seek(0)
+    cursor = conexao.connection.cursor()
+    cursor.copy_expert(f'COPY pedido_importacao ({colunas}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+    # O RETURNING traz só os pedidos realmente inseridos, para os itens, as métricas do painel e a agenda de produção
+    inseridos = conexao.execute(text(
+        f'INSERT INTO pedido ({colunas}) SELECT {colunas} FROM pedido_importacao '
+        f'ON CONFLICT ("idLegado") DO NOTHING '
+        f'RETURNING id, "produtosContratadosJson", "createdAt", "dataRetirada", status, "tipoPedido", "clienteNome", quantidade'
+    )).all()
+    gravar_itens((pedido.id, pedido.produtosContratadosJson) for pedido in inseridos)
+    registrar_alteracoes(depois=[fotografia(pedido) for pedido in inseridos])
+    return len(inseridos)
+
+def _inserir_com_executemany(linhas):
+    """Demais bancos: descarta os pedidos já importados e grava o resto com um único INSERT (executemany)."""
+    ja_importados = set(db.session.scalars(
+        db.select(Pedido.idLegado).where(Pedido.idLegado.in_([linha['idLegado'] for linha in linhas]))
+    ))
+    novas = [linha for linha in linhas if linha['idLegado'] not in ja_importados]
+    if novas:
+        # INSERT do Core: o bulk do ORM quebraria o lote a cada troca de colunas nulas
+        tabela = Pedido.__table__
+        ids = db.session.scalars(insert(tabela).returning(tabela.c.id, sort_by_parameter_order=True), novas).all()
+        gravar_itens(zip(ids, (linha['produtosContratadosJson'] for linha in novas)))
+        registrar_alteracoes(depois=[fotografia(linha) for linha in novas])
+    return len(novas)
+
+@click.command('importar-legado')
+@click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--lote', default=5000, show_default=True, help='Pedidos gravados por lote.')
+@with_appcontext
+def importar_legado_command(arquivo, lote):
+    """Importa usuários e pedidos de um data.json da versão antiga (pode ser executado mais de uma vez)."""
+    inserir_lote = _inserir_com_copy if db.engine.dialect.name == 'postgresql' else _inserir_com_executemany
+    ids_por_email = dict(db.session.execute(db.select(User.email, User.id)).all())
+    usuarios_novos = []
+    vistos = set()
+    linhas = []
+    lidos = inseridos = usuarios_criados = 0
+    erros = []
+
+    def gravar_usuarios():
+        nonlocal usuarios_criados
+        ids = db.session.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), usuarios_novos).all()
+        ids_por_email.update(zip((usuario['email'] for usuario in usuarios_novos), ids))
+        usuarios_criados += len(ids)
+        usuarios_novos.clear()
+        db.session.commit()
+
+    def gravar_pedidos():
+        nonlocal inseridos
+        novos = inserir_lote(linhas)
+        if novos:
+            # Um aviso por lote em vez de um evento por pedido: as telas abertas recarregam a lista
+            registrar_eventos('recarregar', [(None, None, {'pedidos': novos})])
+        inseridos += novos
+        linhas.clear()
+        db.session.commit()
+        decorrido = time.perf_counter() - inicio
+        click.echo(f'  {lidos} pedido(s) lido(s), {inseridos} gravado(s) ({lidos / decorrido:.0f} linhas/s)')
+
+    inicio = time.perf_counter()
+    with open(arquivo, encoding='utf-8-sig') as entrada:
+        for tipo, email, dados in registros_legados(entrada):
+            if tipo == 'usuario':
+                if email not in ids_por_email and isinstance(dados, dict) and dados.get('password'):
+                    ids_por_email[email] = None  # Reservado até o INSERT
+                    usuarios_novos.append({'email': email, 'password_hash': generate_password_hash(dados['password'])})
+                continue
+
+            lidos += 1
+            if usuarios_novos:
+                gravar_usuarios()
+            try:
+                if not isinstance(dados, dict) or not dados.get('id'):
+                    raise ValueError('pedido sem id')
+                user_id = ids_por_email.get(dados.get('userId'))
+                if user_id is None:
+                    raise ValueError(f"usuário '{dados.get('userId')}' não encontrado")
+                linha = linha_do_pedido(dados, user_id)
+            except (ValueError, TypeError) as e:
+                erros.append((dados.get('id') if isinstance(dados, dict) else None, str(e)))
+                continue
+            if linha['idLegado'] in vistos:
+                continue  # Repetido no próprio arquivo
+            vistos.add(linha['idLegado'])
+            linhas.append(linha)
+            if len(linhas) >= lote:
+                gravar_pedidos()
+
+    if usuarios_novos:
+        gravar_usuarios()
+    if linhas:
+        gravar_pedidos()
+
+    decorrido = time.perf_counter() - inicio
+    click.echo(f'{usuarios_criados} usuário(s) criado(s).')
+    click.echo(f'{lidos} pedido(s) lido(s) em {decorrido:.1f}s ({lidos / decorrido:.0f} linhas/s): '
+               f'{inseridos} importado(s), {lidos - inseridos - len(erros)} já existente(s), {len(erros)} com erro.')
+    for id_legado, motivo in erros[:MAX_ERROS_EXIBIDOS]:
+        click.echo(f'  Ignorado pedido {id_legado}: {motivo}', err=True)
+    if len(erros) > MAX_ERROS_EXIBIDOS:
+        click.echo(f'  ... e mais {len(erros) - MAX_ERROS_EXIBIDOS} pedido(s) com erro.', err=True)
\ No newline at end of file
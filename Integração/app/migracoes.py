@@ -0,0 +1,266 @@
+# Arquivo: app/migracoes.py
+# Migrações de esquema do banco, executadas com: flask migrar
+#
+# Cada migração é uma função registrada com @migracao('NNNN_nome'). Elas rodam em
+# ordem, uma única vez, e ficam registradas na tabela 'migracao_aplicada'.
+
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text, bindparam, Date, Time
+from app import db
+from app.utils import normalizar_data, normalizar_horario
+
+MIGRACOES = []
+
+def migracao(nome):
+    """Registra uma função de migração. A ordem de declaração é a ordem de execução."""
+    def decorador(funcao):
+        MIGRACOES.append((nome, funcao))
+        return funcao
+    return decorador
+
+def _garantir_tabela_controle(conexao):
+    conexao.execute(text(
+        "CREATE TABLE IF NOT EXISTS migracao_aplicada ("
+        " nome VARCHAR(100) PRIMARY KEY,"
+        " aplicada_em TIMESTAMP NOT NULL)"
+    ))
+
+def _migracoes_aplicadas(conexao):
+    return {linha[0] for linha in conexao.execute(text("SELECT nome FROM migracao_aplicada"))}
+
+def _tipo_da_coluna(conexao, tabela, coluna):
+    for info in inspect(conexao).get_columns(tabela):
+        if info['name'] == coluna:
+            return str(info['type']).upper()
+    return None
+
+def _criar_indices(conexao, tabela, indices):
+    """
+    Cria os índices que ainda não existirem. 'indices' é uma lista fixa de
+    (nome, colunas, unico) escrita na própria migração: nunca a lista atual do modelo,
+    que ganha índices de colunas criadas só por migrações posteriores.
+    """
+    for nome, colunas, unico in indices:
+        lista = ', '.join(f'"{coluna}"' for coluna in colunas)
+        conexao.execute(text(
+            f'CREATE {"UNIQUE " if unico else ""}INDEX IF NOT EXISTS "{nome}" ON "{tabela}" ({lista})'
+        ))
+
+# ==============================================================================
+# 0001: Datas e horários tipados + índices do Pedido
+# ==============================================================================
+COLUNAS_DATA = {
+    'dataEvento': (Date, normalizar_data, False),
+    'dataRetirada': (Date, normalizar_data, False),
+    'horarioRetirada': (Time, normalizar_horario, False),
+    'dataPagamentoContrato': (Date, normalizar_data, True),
+}
+
+# Índices criados pela 0001 (filtros da listagem e agregados dos relatórios)
+INDICES_0001 = [
+    ('ix_pedido_clienteNome', ['clienteNome'], False),
+    ('ix_pedido_dataEvento', ['dataEvento'], False),
+    ('ix_pedido_user_id', ['user_id'], False),
+    ('ix_pedido_createdAt_id', ['createdAt', 'id'], False),
+    ('ix_pedido_status_createdAt_id', ['status', 'createdAt', 'id'], False),
+    ('ix_pedido_status_dataRetirada', ['status', 'dataRetirada'], False),
+    ('ix_pedido_tipoPedido_quantidade', ['tipoPedido', 'quantidade'], False),
+]
+
+@migracao('0001_pedido_datas_tipadas_e_indices')
+def _pedido_datas_tipadas(conexao):
+    """
+    Converte dataEvento, dataRetirada, horarioRetirada e dataPagamentoContrato de texto
+    (formatos misturados: '02-07-2025', '02/07/2025', '2025-04-11') para Date/Time.
+    """
+    postgres = conexao.dialect.name == 'postgresql'
+
+    for coluna, (tipo, normalizar, aceita_nulo) in COLUNAS_DATA.items():
+        tipo_atual = _tipo_da_coluna(conexao, 'pedido', coluna)
+        if tipo_atual is None or tipo_atual.startswith(('DATE', 'TIME')):
+            continue  # Banco novo (create_all) ou coluna já convertida
+
+        # No PostgreSQL os valores convertidos vão para uma coluna nova, que depois
+        # substitui a antiga. No SQLite (sem tipos rígidos) a coluna é reescrita no lugar.
+        destino = f'{coluna}_novo' if postgres else coluna
+        if postgres:
+            tipo_sql = 'DATE' if tipo is Date else 'TIME'
+            conexao.execute(text(f'ALTER TABLE pedido ADD COLUMN "{destino}" {tipo_sql}'))
+
+        linhas = conexao.execute(text(f'SELECT id, "{coluna}", "createdAt" FROM pedido')).fetchall()
+        valores = []
+        invalidos = []
+        for pedido_id, bruto, criado_em in linhas:
+            try:
+                valor = normalizar(bruto)
+            except ValueError:
+                valor = None
+                invalidos.append(pedido_id)
+            if valor is None and not aceita_nulo:
+                # Campo obrigatório sem valor aproveitável: usa a data de criação do pedido
+                criado_em = criado_em if isinstance(criado_em, datetime) else datetime.fromisoformat(str(criado_em))
+                valor = criado_em.date() if tipo is Date else criado_em.time().replace(microsecond=0)
+            valores.append({'b_id': pedido_id, 'b_valor': valor})
+
+        if valores:
+            # O tipo no bindparam faz o SQLAlchemy gravar no formato nativo de cada banco
+            stmt = text(f'UPDATE pedido SET "{destino}" = :b_valor WHERE id = :b_id').bindparams(
+                bindparam('b_valor', type_=tipo())
+            )
+            conexao.execute(stmt, valores)
+        if invalidos:
+            click.echo(f"  Aviso: '{coluna}' com valor não reconhecido nos pedidos {invalidos}.")
+
+        if postgres:
+            conexao.execute(text(f'ALTER TABLE pedido DROP COLUMN "{coluna}"'))
+            conexao.execute(text(f'ALTER TABLE pedido RENAME COLUMN "{destino}" TO "{coluna}"'))
+            if not aceita_nulo:
+                conexao.execute(text(f'ALTER TABLE pedido ALTER COLUMN "{coluna}" SET NOT NULL'))
+
+    _criar_indices(conexao, 'pedido', INDICES_0001)
+
+# ==============================================================================
+# 0002: Índices de trigramas (pg_trgm) para a busca textual de pedidos
+# ==============================================================================
+@migracao('0002_pedido_indices_trigramas')
+def _pedido_indices_trigramas(conexao):
+    """
+    Cria a extensão pg_trgm e índices GIN nas colunas da busca (app/pedidos/busca.py).
+    Só se aplica ao PostgreSQL; nos demais bancos a busca usa o modo sem índice.
+    """
+    from app.pedidos.busca import COLUNAS_BUSCA
+
+    if conexao.dialect.name != 'postgresql':
+        return
+
+    conexao.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+    for coluna in COLUNAS_BUSCA:
+        conexao.execute(text(
+            f'CREATE INDEX IF NOT EXISTS "ix_pedido_{coluna}_trgm" '
+            f'ON pedido USING gin ("{coluna}" gin_trgm_ops)'
+        ))
+
+# ==============================================================================
+# 0003: Hash do contrato de origem do pedido (detecção de contratos duplicados)
+# ==============================================================================
+@migracao('0003_pedido_contrato_sha256')
+def _pedido_contrato_sha256(conexao):
+    """Adiciona pedido.contratoSha256 e o seu índice. A tabela cache_contrato vem do create_all."""
+    if _tipo_da_coluna(conexao, 'pedido', 'contratoSha256') is None:
+        conexao.execute(text('ALTER TABLE pedido ADD COLUMN "contratoSha256" VARCHAR(64)'))
+    _criar_indices(conexao, 'pedido', [('ix_pedido_contratoSha256', ['contratoSha256'], False)])
+
+# ==============================================================================
+# 0004: ID de origem dos pedidos importados do data.json (importação idempotente)
+# ==============================================================================
+@migracao('0004_pedido_id_legado')
+def _pedido_id_legado(conexao):
+    """Adiciona pedido.idLegado e o seu índice único (ver app/importacao.py)."""
+    if _tipo_da_coluna(conexao, 'pedido', 'idLegado') is None:
+        conexao.execute(text('ALTER TABLE pedido ADD COLUMN "idLegado" VARCHAR(40)'))
+    _criar_indices(conexao, 'pedido', [('ix_pedido_idLegado', ['idLegado'], True)])
+
+# ==============================================================================
+# 0005: Métricas diárias do painel de relatórios
+# ==============================================================================
+@migracao('0005_metrica_diaria')
+def _metrica_diaria(conexao):
+    """Preenche a tabela metrica_diaria (criada pelo create_all) com os pedidos existentes."""
+    from app.relatorios.metricas import reconstruir_metricas
+
+    reconstruir_metricas(conexao)
+
+# ==============================================================================
+# 0006: Itens dos pedidos (produtos com quantidades e valores numéricos)
+# ==============================================================================
+@migracao('0006_pedido_item')
+def _pedido_item(conexao):
+    """Preenche a pedido_item (criada pelo create_all) a partir do produtosContratadosJson e cria o índice por retirada."""
+    from app.pedidos.itens import reconstruir_itens
+
+    # Ganha a coluna updatedAt na 0008
+    _criar_indices(conexao, 'pedido', [('ix_pedido_dataRetirada_id', ['dataRetirada', 'id'], False)])
+    reconstruir_itens(conexao)
+
+# ==============================================================================
+# 0007: Índice da agenda de produção (substitui o ix_pedido_status_dataRetirada)
+# ==============================================================================
+@migracao('0007_indice_producao')
+def _indice_producao(conexao):
+    """Troca o índice (status, dataRetirada) pelo ix_pedido_producao, que começa pelas mesmas colunas."""
+    conexao.execute(text('DROP INDEX IF EXISTS "ix_pedido_status_dataRetirada"'))
+    _criar_indices(conexao, 'pedido', [
+        ('ix_pedido_producao', ['status', 'dataRetirada', 'horarioRetirada', 'tipoPedido', 'quantidade'], False),
+    ])
+
+# ==============================================================================
+# 0008: Versão e horário da última alteração dos pedidos (ETags)
+# ==============================================================================
+@migracao('0008_pedido_versao')
+def _pedido_versao(conexao):
+    """Adiciona pedido.versao e pedido.updatedAt (preenchido com o createdAt) e os índices usados pelas ETags."""
+    if _tipo_da_coluna(conexao, 'pedido', 'versao') is None:
+        conexao.execute(text('ALTER TABLE pedido ADD COLUMN versao INTEGER NOT NULL DEFAULT 1'))
+    if _tipo_da_coluna(conexao, 'pedido', 'updatedAt') is None:
+        conexao.execute(text('ALTER TABLE pedido ADD COLUMN "updatedAt" TIMESTAMP'))
+        conexao.execute(text('UPDATE pedido SET "updatedAt" = "createdAt"'))
+        if conexao.dialect.name == 'postgresql':
+            conexao.execute(text('ALTER TABLE pedido ALTER COLUMN "updatedAt" SET NOT NULL'))
+    # O ix_pedido_dataRetirada_id da 0006 ganhou a coluna updatedAt
+    conexao.execute(text('DROP INDEX IF EXISTS "ix_pedido_dataRetirada_id"'))
+    _criar_indices(conexao, 'pedido', [
+        ('ix_pedido_dataRetirada_id', ['dataRetirada', 'id', 'updatedAt'], False),
+        ('ix_pedido_updatedAt', ['updatedAt'], False),
+        ('ix_pedido_status_updatedAt', ['status', 'updatedAt'], False),
+    ])
+
+# ==============================================================================
+# 0009: Início e sinal de vida das tarefas em segundo plano
+# ==============================================================================
+@migracao('0009_tarefa_sinal_de_vida')
+def _tarefa_sinal_de_vida(conexao):
+    """Adiciona tarefa.iniciadaEm e tarefa.sinalEm (usados por limpar_expiradas)."""
+    for coluna in ('iniciadaEm', 'sinalEm'):
+        if _tipo_da_coluna(conexao, 'tarefa', coluna) is None:
+            conexao.execute(text(f'ALTER TABLE tarefa ADD COLUMN "{coluna}" TIMESTAMP'))
+
+# ==============================================================================
+# 0010: Agenda de produção pelos itens dos pedidos (ix_pedido_producao com o id)
+# ==============================================================================
+@migracao('0010_indice_producao_itens')
+def _indice_producao_itens(conexao):
+    """Recria o ix_pedido_producao da 0007 com o id, usado no join com pedido_item."""
+    conexao.execute(text('DROP INDEX IF EXISTS "ix_pedido_producao"'))
+    _criar_indices(conexao, 'pedido', [
+        ('ix_pedido_producao', ['status', 'dataRetirada', 'horarioRetirada', 'id', 'tipoPedido', 'quantidade'], False),
+    ])
+
+# ==============================================================================
+# Comando de linha de comando
+# ==============================================================================
+@click.command('migrar')
+@with_appcontext
+def migrar_command():
+    """Cria as tabelas que faltam e aplica as migrações pendentes."""
+    db.create_all()
+    with db.engine.begin() as conexao:
+        _garantir_tabela_controle(conexao)
+        aplicadas = _migracoes_aplicadas(conexao)
+
+    pendentes = [(nome, funcao) for nome, funcao in MIGRACOES if nome not in aplicadas]
+    if not pendentes:
+        click.echo('Nenhuma migração pendente.')
+        return
+
+    for nome, funcao in pendentes:
+        click.echo(f'Aplicando {nome}...')
+        # Cada migração roda na sua própria transação
+        with db.engine.begin() as conexao:
+            funcao(conexao)
+            conexao.execute(
+                text("INSERT INTO migracao_aplicada (nome, aplicada_em) VALUES (:nome, :agora)"),
+                {'nome': nome, 'agora': datetime.utcnow()}
+            )
+    click.echo(f'{len(pendentes)} migração(ões) aplicada(s).')
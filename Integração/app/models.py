@@ -20,10 +20,10 @@ class User(db.Model):
 class Pedido(db.Model):
     """Modelo para a tabela de Pedidos."""
     id = db.Column(db.Integer, primary_key=True)
-    clienteNome = db.Column(db.String(150), nullable=False)
-    dataEvento = db.Column(db.String(10), nullable=False) # Armazenado como YYYY-MM-DD
-    dataRetirada = db.Column(db.String(10), nullable=False)
-    horarioRetirada = db.Column(db.String(5), nullable=False)
+    clienteNome = db.Column(db.String(150), nullable=False, index=True)
+    dataEvento = db.Column(db.Date, nullable=False, index=True)
+    dataRetirada = db.Column(db.Date, nullable=False)
+    horarioRetirada = db.Column(db.Time, nullable=False)
     tipoPedido = db.Column(db.String(100), nullable=False)
     quantidade = db.Column(db.Integer, nullable=False)
     sabores = db.Column(db.Text, nullable=True)
@@ -31,6 +31,9 @@ class Pedido(db.Model):
     observacoes = db.Column(db.Text, nullable=True)
     status = db.Column(db.String(50), nullable=False, default='pendente')
     createdAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Versão e horário da última alteração: ETags e cache dos comprovantes (app/pedidos/versoes.py)
+    versao = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updatedAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # --- CAMPOS VINDOS DO CONTRATO ---
     clienteRG = db.Column(db.String(20), nullable=True)
@@ -38,13 +41,129 @@ class Pedido(db.Model):
     nomeContratado = db.Column(db.String(150), nullable=True)
     cnpjContratado = db.Column(db.String(20), nullable=True)
     valorTotalPedidoContrato = db.Column(db.String(50), nullable=True)
-    dataPagamentoContrato = db.Column(db.String(10), nullable=True)
+    dataPagamentoContrato = db.Column(db.Date, nullable=True)
     localEvento = db.Column(db.String(200), nullable=True)
     produtosContratadosJson = db.Column(db.Text, nullable=True) # Armazena a lista de produtos como JSON
+    contratoSha256 = db.Column(db.String(64), nullable=True, index=True) # Hash do PDF de origem (detecta contrato duplicado)
+    idLegado = db.Column(db.String(40), nullable=True, unique=True, index=True) # ID do pedido no data.json antigo (flask importar-legado)
 
     # --- Chave Estrangeira ---
     # Liga este pedido a um usuário específico. 'user.id' refere-se à tabela 'user' e coluna 'id'.
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+
+    # Produtos do pedido com quantidades e valores numéricos (espelham produtosContratadosJson)
+    itens = db.relationship('PedidoItem', backref='pedido', lazy=True, cascade='all, delete-orphan')
+
+    # --- Índices compostos ---
+    # Acompanham os filtros de GET /api/pedidos e os agregados de GET /api/reports.
+    __table_args__ = (
+        # Listagem paginada por (createdAt, id), com ou sem filtro de status
+        db.Index('ix_pedido_createdAt_id', 'createdAt', 'id'),
+        db.Index('ix_pedido_status_createdAt_id', 'status', 'createdAt', 'id'),
+        # Filtros por período de retirada (exportação) e agenda de produção: entrega, na
+        # ordem do GROUP BY, o id para o join com pedido_item e o tipoPedido/quantidade
+        # usados pelos pedidos sem itens
+        db.Index('ix_pedido_producao', 'status', 'dataRetirada', 'horarioRetirada', 'id', 'tipoPedido', 'quantidade'),
+        # Totais por produto de um período de retirada, sem filtro de status (join com pedido_item);
+        # com o updatedAt, também cobre a ETag da lista filtrada por período
+        db.Index('ix_pedido_dataRetirada_id', 'dataRetirada', 'id', 'updatedAt'),
+        # ETag da lista filtrada por status (COUNT e MAX(updatedAt) só pelo índice)
+        db.Index('ix_pedido_status_updatedAt', 'status', 'updatedAt'),
+        # Agregado "produtos mais pedidos" (GROUP BY tipoPedido, SUM quantidade)
+        db.Index('ix_pedido_tipoPedido_quantidade', 'tipoPedido', 'quantidade'),
+    )
+
+    # O ORM incrementa a versao a cada UPDATE (e recusa gravar sobre uma versão mais nova);
+    # os UPDATEs em massa a incrementam explicitamente
+    __mapper_args__ = {'version_id_col': versao}
+
+    def __repr__(self):
+        return f"Pedido(ID: {self.id}, Cliente: '{self.clienteNome}', Status: '{self.status}')"
+
+class PedidoItem(db.Model):
+    """Um produto de um pedido (linha de 'PRODUTOS CONTRATADOS'), com valores numéricos (app/pedidos/itens.py)."""
+    __tablename__ = 'pedido_item'
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedido.id', ondelete='CASCADE'), nullable=False)
+    produto = db.Column(db.String(200), nullable=False, index=True) # Totais por produto (GROUP BY produto)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    valorUnitario = db.Column(db.Numeric(12, 2), nullable=True)
+    valorTotal = db.Column(db.Numeric(12, 2), nullable=True)
+
+    __table_args__ = (
+        # Itens de um pedido e totais por produto de um conjunto de pedidos (cobre a soma, sem ler a tabela)
+        db.Index('ix_pedido_item_pedido_id_produto', 'pedido_id', 'produto', 'quantidade', 'valorTotal'),
+    )
+
+    def __repr__(self):
+        return f"PedidoItem(Pedido: {self.pedido_id}, {self.quantidade}x '{self.produto}')"
+
+class Tarefa(db.Model):
+    """Tarefa em segundo plano (exportações, comprovantes) executada pelo pool de processos."""
+    id = db.Column(db.String(32), primary_key=True) # uuid4 em hexadecimal
+    tipo = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pendente', index=True) # pendente, executando, concluida, erro
+    parametrosJson = db.Column(db.Text, nullable=False, default='{}')
+    nomeArquivo = db.Column(db.String(255), nullable=True) # Nome sugerido para o download do resultado
+    mimetype = db.Column(db.String(100), nullable=True)
+    mensagemErro = db.Column(db.Text, nullable=True)
+    createdAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    concluidaEm = db.Column(db.DateTime, nullable=True)
+    iniciadaEm = db.Column(db.DateTime, nullable=True) # Quando um processo do pool começou a executá-la
+    sinalEm = db.Column(db.DateTime, nullable=True) # Último sinal de vida do processo que a executa (ver executor.py)
+    expiraEm = db.Column(db.DateTime, nullable=False, index=True) # Depois disso, a tarefa finalizada e o arquivo são apagados (renovado ao terminar)
+
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user = db.relationship('User')
+
+    def __repr__(self):
+        return f"Tarefa(ID: {self.id}, Tipo: '{self.tipo}', Status: '{self.status}')"
+
+class CacheContrato(db.Model):
+    """Dados extraídos de um contrato, pela SHA-256 do PDF (evita reprocessar o mesmo arquivo)."""
+    __tablename__ = 'cache_contrato'
+    sha256 = db.Column(db.String(64), primary_key=True)
+    versaoRegras = db.Column(db.Integer, nullable=False) # VERSAO_REGRAS_CONTRATO usada na extração
+    dadosJson = db.Column(db.Text, nullable=False)
+    confiancaJson = db.Column(db.Text, nullable=True)
+    createdAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    ultimoAcesso = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True) # Para o descarte LRU
+
+    def __repr__(self):
+        return f"CacheContrato(SHA-256: {self.sha256[:12]}..., Versão: {self.versaoRegras})"
+
+class MetricaDiaria(db.Model):
+    """
+    Totais diários de pedidos (pela data de criação) por status, produto (tipoPedido) e cliente.
+    Mantida pelas rotas que criam, alteram e excluem pedidos (app/relatorios/metricas.py).
+    """
+    __tablename__ = 'metrica_diaria'
+    dia = db.Column(db.Date, primary_key=True)
+    dimensao = db.Column(db.String(20), primary_key=True) # status, produto ou cliente
+    chave = db.Column(db.String(150), primary_key=True) # Valor da dimensão (ex: 'confirmado', 'Bem-casados')
+    pedidos = db.Column(db.Integer, nullable=False, default=0)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Rankings por dimensão em um período
+        db.Index('ix_metrica_diaria_dimensao_dia', 'dimensao', 'dia'),
+    )
+
+    def __repr__(self):
+        return f"MetricaDiaria({self.dia}, {self.dimensao}='{self.chave}': {self.pedidos} pedidos)"
+
+class EventoPedido(db.Model):
+    """Alteração de um pedido, entregue pelo feed GET /api/pedidos/stream (app/pedidos/eventos.py)."""
+    __tablename__ = 'evento_pedido'
+    id = db.Column(db.Integer, primary_key=True) # 'id:' do server-sent event (Last-Event-ID)
+    tipo = db.Column(db.String(20), nullable=False) # criado, alterado, excluido ou recarregar
+    pedido_id = db.Column(db.Integer, nullable=True) # Sem chave estrangeira: o pedido pode ter sido excluído
+    versao = db.Column(db.Integer, nullable=True) # Pedido.versao depois da alteração
+    dados = db.Column(db.Text, nullable=True) # JSON com os campos criados ou alterados
+    criadoEm = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True) # Para a limpeza por idade
+
+    # Ids nunca reaproveitados no SQLite, mesmo depois da limpeza (o cliente retoma pelo id)
+    __table_args__ = {'sqlite_autoincrement': True}
 
     def __repr__(self):
-        return f"Pedido(ID: {self.id}, Cliente: '{self.clienteNome}', Status: '{self.status}')"
\ No newline at end of file
+        return f"EventoPedido({self.id}: {self.tipo} pedido {self.pedido_id})"
\ No newline at end of file
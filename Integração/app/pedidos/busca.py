@@ -0,0 +1,77 @@
+# Arquivo: app/pedidos/busca.py
+# Busca textual de pedidos (parâmetro ?busca= de GET /api/pedidos).
+#
+# No PostgreSQL usa a extensão pg_trgm: os índices GIN criados pela migração
+# 0002 atendem o ILIKE '%termo%' e o operador de similaridade, e o resultado é
+# ordenado por word_similarity. Em outros bancos (ex: SQLite nos testes locais)
+# filtra com LIKE e ordena a similaridade em Python.
+
+from difflib import SequenceMatcher
+from sqlalchemy import func, or_, text
+from app import db
+from app.models import Pedido
+
+# Colunas cobertas pela busca (cada uma tem um índice GIN no PostgreSQL)
+COLUNAS_BUSCA = ('clienteNome', 'sabores', 'localEvento', 'observacoes')
+
+# No modo sem pg_trgm, quantos candidatos (em múltiplos do limite) são ranqueados em Python
+FATOR_CANDIDATOS = 5
+
+# Cache por engine: a extensão pg_trgm está instalada?
+_trgm_por_engine = {}
+
+def trgm_disponivel():
+    """Indica se o banco atual é PostgreSQL com a extensão pg_trgm instalada."""
+    engine = db.session.get_bind()
+    if engine not in _trgm_por_engine:
+        disponivel = False
+        if engine.dialect.name == 'postgresql':
+            disponivel = db.session.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).scalar() is not None
+        _trgm_por_engine[engine] = disponivel
+    return _trgm_por_engine[engine]
+
+def _similaridade(termo, valor):
+    """Similaridade (0 a 1) entre o termo e o trecho mais parecido de 'valor'."""
+    if not valor:
+        return 0.0
+    termo = termo.lower()
+    valor = valor.lower()
+    if termo in valor:
+        # Ocorrência exata: quanto maior a parte do campo coberta pelo termo, mais relevante
+        return 0.5 + 0.5 * len(termo) / len(valor)
+    return SequenceMatcher(None, termo, valor).ratio() * 0.5
+
+def _escapar_like(termo):
+    """Escapa os curingas do LIKE ('%' e '_') e a própria barra, para o termo ser buscado literalmente."""
+    return termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def buscar_pedidos(consulta, termo, limite):
+    """
+    Aplica a busca por 'termo' ao select() (já filtrado) e retorna até 'limite'
+    linhas, da mais parecida para a menos parecida.
+    """
+    colunas = [getattr(Pedido, nome) for nome in COLUNAS_BUSCA]
+    padrao = f'%{_escapar_like(termo)}%'
+    filtro_texto = or_(*[coluna.ilike(padrao, escape='\\') for coluna in colunas])
+
+    if trgm_disponivel():
+        # 'clienteNome %> termo' tolera erros de digitação no nome do cliente
+        relevancia = func.greatest(*[func.word_similarity(termo, coluna) for coluna in colunas])
+        return db.session.execute(
+            consulta.where(or_(filtro_texto, Pedido.clienteNome.op('%>')(termo)))
+            .order_by(relevancia.desc(), Pedido.createdAt.desc(), Pedido.id.desc())
+            .limit(limite)
+        ).all()
+
+    candidatos = db.session.execute(
+        consulta.where(filtro_texto)
+        .order_by(Pedido.createdAt.desc(), Pedido.id.desc())
+        .limit(limite * FATOR_CANDIDATOS)
+    ).all()
+    candidatos.sort(
+        key=lambda p: max(_similaridade(termo, getattr(p, nome)) for nome in COLUNAS_BUSCA),
+        reverse=True
+    )
+    return candidatos[:limite]
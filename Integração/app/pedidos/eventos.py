@@ -0,0 +1,254 @@
+# Arquivo: app/pedidos/eventos.py
+# Feed de alterações dos pedidos (GET /api/pedidos/stream, server-sent events).
+#
+# Cada gravação de pedido registra, na mesma transação, um evento na tabela
+# evento_pedido ('criado', 'alterado' ou 'excluido', com os campos que mudaram).
+# Os eventos são inseridos no before_commit, como últimas instruções da transação:
+# no PostgreSQL a inserção fica atrás de um advisory lock (os ids precisam ser
+# confirmados em ordem), que assim só é mantido durante o commit e não serializa o
+# resto das gravações de pedidos.
+# O id do evento é o 'id:' do SSE, então o cliente retoma de onde parou enviando
+# o Last-Event-ID. Depois do commit os streams abertos são acordados:
+#   - PostgreSQL: NOTIFY na própria transação; uma thread por worker faz LISTEN e
+#     acorda os streams daquele worker (assim todos os workers ficam sabendo);
+#   - demais bancos: aviso dentro do processo após o commit. Para os outros
+#     workers, cada stream também consulta a tabela a cada EVENTOS_KEEPALIVE_SEGUNDOS.
+# Os eventos são apagados depois de EVENTOS_RETENCAO_HORAS, numa transação própria
+# depois do commit; quem tentar retomar de um evento já apagado recebe 'recarregar'
+# e deve buscar a lista de novo.
+# Cada stream ocupa uma thread do worker enquanto está aberto: no máximo
+# EVENTOS_MAX_STREAMS_POR_WORKER por worker (os seguintes recebem 503 com Retry-After),
+# para sempre sobrarem threads às demais requisições (ver gunicorn.conf.py).
+
+import json
+import time
+import select as select_io
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, select, text
+from sqlalchemy.orm import Session
+from app import db
+from app.models import EventoPedido
+
+CANAL_POSTGRES = 'pedidos_eventos'
+# Chave do advisory lock que serializa a gravação de eventos no PostgreSQL
+TRAVA_EVENTOS = 7301
+
+# Eventos lidos por consulta ao alimentar um stream
+LOTE_EVENTOS = 500
+# Intervalo mínimo entre duas limpezas de eventos antigos (por worker)
+INTERVALO_LIMPEZA_SEGUNDOS = 600
+
+# ==============================================================================
+# Gravação
+# ==============================================================================
+_ultima_limpeza = 0.0
+
+def registrar_eventos(tipo, eventos):
+    """
+    Registra eventos de um mesmo tipo para a transação atual (gravados no commit dela).
+    'eventos' é uma sequência de (pedido_id, versao, dados), sendo 'dados' os campos
+    do pedido (ou None).
+    """
+    agora = datetime.utcnow()
+    linhas = [
+        {'tipo': tipo, 'pedido_id': pedido_id, 'versao': versao, 'criadoEm': agora,
+         'dados': json.dumps(dados, ensure_ascii=False, default=str) if dados is not None else None}
+        for pedido_id, versao, dados in eventos
+    ]
+    if linhas:
+        db.session.info.setdefault('eventos_pendentes', []).extend(linhas)
+
+@event.listens_for(Session, 'before_commit')
+def _gravar_antes_do_commit(session):
+    linhas = session.info.pop('eventos_pendentes', None)
+    if not linhas:
+        return
+    # Grava antes as alterações pendentes dos pedidos, para a trava ser a última coisa pedida
+    session.flush()
+    postgres = session.connection().dialect.name == 'postgresql'
+    if postgres:
+        # Os ids saem de uma sequência: sem a trava, uma transação que pegou um id menor
+        # poderia confirmar depois de um stream já ter entregue um id maior
+        session.execute(text('SELECT pg_advisory_xact_lock(:chave)'), {'chave': TRAVA_EVENTOS})
+    session.execute(insert(EventoPedido.__table__), linhas)
+    if postgres:
+        tipos = ','.join(sorted({linha['tipo'] for linha in linhas}))
+        session.execute(text('SELECT pg_notify(:canal, :tipos)'), {'canal': CANAL_POSTGRES, 'tipos': tipos})
+    session.info['avisar_streams'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _avisar_apos_commit(session):
+    if session.info.pop('avisar_streams', False):
+        aviso.avisar()
+        _limpar_antigos()
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_aviso(session):
+    session.info.pop('eventos_pendentes', None)
+    session.info.pop('avisar_streams', None)
+
+def _limpar_antigos():
+    """Apaga os eventos além da retenção, em uma transação própria (no máximo uma vez por INTERVALO_LIMPEZA_SEGUNDOS)."""
+    global _ultima_limpeza
+    if time.monotonic() - _ultima_limpeza < INTERVALO_LIMPEZA_SEGUNDOS:
+        return
+    _ultima_limpeza = time.monotonic()
+    limite = datetime.utcnow() - timedelta(hours=current_app.config['EVENTOS_RETENCAO_HORAS'])
+    try:
+        with db.engine.begin() as conexao:
+            conexao.execute(delete(EventoPedido).where(EventoPedido.criadoEm < limite))
+    except Exception as e:
+        # A alteração do pedido já foi confirmada; a limpeza fica para a próxima vez
+        current_app.logger.warning(f'Falha ao apagar eventos antigos: {e}')
+
+# ==============================================================================
+# Aviso aos streams abertos neste worker
+# ==============================================================================
+class Aviso:
+    """Acorda todas as threads que aguardam um novo evento (broadcast dentro do processo)."""
+
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._geracao = 0
+
+    @property
+    def geracao(self):
+        return self._geracao
+
+    def avisar(self):
+        with self._condicao:
+            self._geracao += 1
+            self._condicao.notify_all()
+
+    def aguardar(self, geracao_vista, timeout):
+        """Espera até haver um aviso depois de 'geracao_vista' (ou o timeout). Retorna a geração atual."""
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._geracao != geracao_vista, timeout)
+            return self._geracao
+
+aviso = Aviso()
+
+class LimiteDeStreams:
+    """Conta os streams abertos neste worker (cada um ocupa uma thread enquanto está aberto)."""
+
+    def __init__(self):
+        self._abertos = 0
+        self._lock = threading.Lock()
+
+    @property
+    def abertos(self):
+        return self._abertos
+
+    def reservar(self, maximo):
+        """Reserva uma vaga para um stream. False se o worker já tem 'maximo' streams abertos."""
+        with self._lock:
+            if self._abertos >= maximo:
+                return False
+            self._abertos += 1
+            return True
+
+    def liberar(self):
+        with self._lock:
+            self._abertos -= 1
+
+streams = LimiteDeStreams()
+
+_ouvinte = None
+_ouvinte_lock = threading.Lock()
+
+def _ouvir_postgres(engine):
+    """Thread do worker: LISTEN no canal dos eventos e aviso aos streams a cada NOTIFY."""
+    while True:
+        try:
+            conexao = engine.raw_connection()
+            try:
+                pg = conexao.driver_connection
+                pg.autocommit = True
+                pg.cursor().execute(f'LISTEN {CANAL_POSTGRES}')
+                while True:
+                    if select_io.select([pg], [], [], 60) == ([], [], []):
+                        continue
+                    pg.poll()
+                    if pg.notifies:
+                        pg.notifies.clear()
+                        aviso.avisar()
+            finally:
+                conexao.invalidate()
+        except Exception:
+            # Conexão perdida: os streams seguem pela consulta periódica até reconectar
+            time.sleep(5)
+
+def iniciar_ouvinte():
+    """Inicia (uma vez por processo) a thread de LISTEN, se o banco for PostgreSQL."""
+    global _ouvinte
+    if db.engine.dialect.name != 'postgresql':
+        return
+    with _ouvinte_lock:
+        if _ouvinte is None or not _ouvinte.is_alive():
+            _ouvinte = threading.Thread(target=_ouvir_postgres, args=(db.engine,), name='ouvinte-eventos', daemon=True)
+            _ouvinte.start()
+
+# ==============================================================================
+# Leitura e stream
+# ==============================================================================
+def ultimo_evento_id():
+    return db.session.scalar(select(func.max(EventoPedido.id))) or 0
+
+def eventos_desde(ultimo_id, limite=LOTE_EVENTOS):
+    return db.session.scalars(
+        select(EventoPedido).where(EventoPedido.id > ultimo_id).order_by(EventoPedido.id).limit(limite)
+    ).all()
+
+def retomada_possivel(ultimo_id):
+    """False se eventos posteriores a 'ultimo_id' já foram apagados pela retenção (ou se o id não existe)."""
+    primeiro, ultimo = db.session.execute(select(func.min(EventoPedido.id), func.max(EventoPedido.id))).one()
+    if ultimo is None:
+        return ultimo_id == 0
+    return primeiro <= ultimo_id + 1 and ultimo_id <= ultimo
+
+def mensagem_sse(evento_id, dados):
+    return f"id: {evento_id}\nevent: pedido\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+def dados_do_evento(evento):
+    dados = {'tipo': evento.tipo, 'id': evento.pedido_id, 'versao': evento.versao}
+    if evento.dados:
+        dados['pedido'] = json.loads(evento.dados)
+    return dados
+
+def fluxo_de_eventos(ultimo_id):
+    """
+    Gerador do corpo do SSE: entrega os eventos posteriores a 'ultimo_id' e espera por
+    novos, com um comentário de keepalive a cada EVENTOS_KEEPALIVE_SEGUNDOS. Encerra
+    depois de EVENTOS_DURACAO_MAXIMA_SEGUNDOS (o cliente reconecta com o Last-Event-ID),
+    para não prender uma thread do worker indefinidamente.
+    """
+    config = current_app.config
+    keepalive = config['EVENTOS_KEEPALIVE_SEGUNDOS']
+    encerrar_em = time.monotonic() + config['EVENTOS_DURACAO_MAXIMA_SEGUNDOS']
+    iniciar_ouvinte()
+
+    yield f"retry: {config['EVENTOS_RECONEXAO_MS']}\n\n"
+    if not retomada_possivel(ultimo_id):
+        ultimo_id = ultimo_evento_id()
+        yield mensagem_sse(ultimo_id, {'tipo': 'recarregar'})
+
+    geracao = aviso.geracao
+    try:
+        while time.monotonic() < encerrar_em:
+            mensagens = [(evento.id, dados_do_evento(evento)) for evento in eventos_desde(ultimo_id)]
+            # Devolve a conexão ao pool enquanto o stream espera
+            db.session.remove()
+            for evento_id, dados in mensagens:
+                ultimo_id = evento_id
+                yield mensagem_sse(evento_id, dados)
+            if len(mensagens) == LOTE_EVENTOS:
+                continue
+
+            nova_geracao = aviso.aguardar(geracao, timeout=keepalive)
+            if nova_geracao == geracao:
+                yield ': keepalive\n\n'
+            geracao = nova_geracao
+    finally:
+        db.session.remove()
\ No newline at end of file
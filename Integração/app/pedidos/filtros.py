@@ -0,0 +1,34 @@
+# Arquivo: app/pedidos/filtros.py
+# Filtros de pedidos compartilhados pela listagem (GET /api/pedidos)
+# e pela exportação por filtros (POST /api/reports/export-pedidos).
+
+from app.models import Pedido
+from app.utils import normalizar_data
+
+def aplicar_filtros(query, args):
+    """
+    Aplica à query (Query do ORM ou select() do Core) os filtros aceitos pela listagem de pedidos:
+    cliente, status (um ou vários separados por vírgula), dataEvento,
+    dataInicio/dataFim (período de retirada) e tipoProduto.
+    'args' pode ser o request.args ou um dicionário vindo de um corpo JSON.
+    Lança ValueError se alguma data for inválida.
+    """
+    if args.get('cliente'):
+        query = query.filter(Pedido.clienteNome.ilike(f"%{args['cliente']}%"))
+    if args.get('dataEvento'):
+        query = query.filter(Pedido.dataEvento == normalizar_data(args['dataEvento']))
+    if args.get('dataInicio'):
+        query = query.filter(Pedido.dataRetirada >= normalizar_data(args['dataInicio']))
+    if args.get('dataFim'):
+        query = query.filter(Pedido.dataRetirada <= normalizar_data(args['dataFim']))
+    if args.get('tipoProduto'):
+        query = query.filter(Pedido.tipoPedido == args['tipoProduto'])
+    if args.get('status'):
+        status_filter = args['status']
+        if isinstance(status_filter, str):
+            status_filter = status_filter.split(',')
+        if len(status_filter) > 1:
+            query = query.filter(Pedido.status.in_(status_filter))
+        else:
+            query = query.filter(Pedido.status == status_filter[0])
+    return query
@@ -0,0 +1,124 @@
+# Arquivo: app/pedidos/itens.py
+# Itens (produtos) dos pedidos, na tabela pedido_item.
+#
+# Os produtos de um contrato chegam como JSON em Pedido.produtosContratadosJson, com
+# quantidades e valores em texto no formato brasileiro ('25', '2,49', '1.250,00').
+# Aqui eles viram linhas de pedido_item com números, para que os totais por produto
+# sejam uma agregação SQL. O JSON continua sendo gravado, pois é o que o formulário
+# e os comprovantes usam.
+
+import re
+import json
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import delete, func, insert, select
+from app import db
+from app.models import Pedido, PedidoItem
+from app.utils import normalizar_data
+
+# Pedidos lidos por vez ao refazer os itens de toda a tabela
+LOTE_RECONSTRUCAO = 1000
+
+_MILHARES_COM_PONTO = re.compile(r'\d{1,3}(\.\d{3})+')
+
+def numero_brasileiro(valor):
+    """
+    Converte '373,50', '1.250,00', '1.000' ou '62.25' em Decimal.
+    Retorna None para valores vazios ou que não sejam números.
+    """
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float, Decimal)):
+        return Decimal(str(valor))
+    texto = str(valor).strip().replace('R$', '').replace(' ', '')
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    elif _MILHARES_COM_PONTO.fullmatch(texto):
+        texto = texto.replace('.', '')
+    try:
+        return Decimal(texto)
+    except InvalidOperation:
+        return None
+
+def itens_do_json(produtos_json):
+    """Itens (produto, quantidade, valores) de um produtosContratadosJson. JSON inválido resulta em lista vazia."""
+    try:
+        produtos = json.loads(produtos_json or '[]')
+    except (ValueError, TypeError):
+        return []
+    if not isinstance(produtos, list):
+        return []
+
+    itens = []
+    for produto in produtos:
+        if not isinstance(produto, dict) or not str(produto.get('Produto') or '').strip():
+            continue
+        quantidade = numero_brasileiro(produto.get('Quantidade'))
+        itens.append({
+            'produto': str(produto['Produto']).strip()[:200],
+            'quantidade': int(quantidade) if quantidade is not None else 0,
+            'valorUnitario': numero_brasileiro(produto.get('Valor Unitário')),
+            'valorTotal': numero_brasileiro(produto.get('Valor Total Item')),
+        })
+    return itens
+
+def gravar_itens(pedidos, conexao=None):
+    """
+    Grava os itens de vários pedidos com um único INSERT (executemany).
+    'pedidos' é uma sequência de (pedido_id, produtosContratadosJson).
+    """
+    linhas = [
+        {'pedido_id': pedido_id, **item}
+        for pedido_id, produtos_json in pedidos
+        for item in itens_do_json(produtos_json)
+    ]
+    if linhas:
+        (conexao or db.session).execute(insert(PedidoItem.__table__), linhas)
+    return len(linhas)
+
+def substituir_itens(pedido_ids, produtos_json):
+    """Troca os itens dos pedidos pelos de 'produtos_json' (depois de uma edição da lista de produtos)."""
+    db.session.execute(delete(PedidoItem).where(PedidoItem.pedido_id.in_(pedido_ids)))
+    gravar_itens([(pedido_id, produtos_json) for pedido_id in pedido_ids])
+
+def reconstruir_itens(conexao):
+    """Refaz a pedido_item a partir do produtosContratadosJson de todos os pedidos, em lotes."""
+    conexao.execute(delete(PedidoItem.__table__))
+    ultimo_id = 0
+    while True:
+        lote = conexao.execute(
+            select(Pedido.id, Pedido.produtosContratadosJson)
+            .where(Pedido.id > ultimo_id, Pedido.produtosContratadosJson.notin_(['', '[]']))
+            .order_by(Pedido.id)
+            .limit(LOTE_RECONSTRUCAO)
+        ).all()
+        if not lote:
+            return
+        gravar_itens(lote, conexao)
+        ultimo_id = lote[-1][0]
+
+def totais_por_produto(inicio=None, fim=None, status=None):
+    """
+    Quantidade e valor total de cada produto nos pedidos com retirada entre 'inicio' e
+    'fim' (inclusive), em uma única agregação. Lança ValueError se uma data for inválida.
+    """
+    inicio, fim = normalizar_data(inicio), normalizar_data(fim)
+    quantidade = func.sum(PedidoItem.quantidade)
+    consulta = (
+        select(
+            PedidoItem.produto,
+            quantidade.label('quantidade'),
+            func.sum(PedidoItem.valorTotal).label('valorTotal'),
+            func.count(func.distinct(PedidoItem.pedido_id)).label('pedidos'),
+        )
+        .group_by(PedidoItem.produto)
+        .order_by(quantidade.desc(), PedidoItem.produto)
+    )
+    if inicio or fim or status:
+        consulta = consulta.join(Pedido, Pedido.id == PedidoItem.pedido_id)
+    if inicio:
+        consulta = consulta.where(Pedido.dataRetirada >= inicio)
+    if fim:
+        consulta = consulta.where(Pedido.dataRetirada <= fim)
+    if status:
+        consulta = consulta.where(Pedido.status == status)
+    return db.session.execute(consulta).all()
\ No newline at end of file
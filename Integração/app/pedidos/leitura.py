@@ -0,0 +1,80 @@
+# Arquivo: app/pedidos/leitura.py
+# Caminho de leitura da listagem de pedidos (GET /api/pedidos).
+#
+# A listagem só lê: em vez de montar um objeto Pedido por linha (com identity map e
+# controle de alterações), consulta as colunas pedidas com um select() do Core e
+# converte cada linha (uma tupla) em dicionário com um serializador montado uma vez
+# por combinação de campos.
+
+from datetime import date, datetime
+from functools import lru_cache
+from sqlalchemy import select
+from app.models import Pedido
+
+# Campos aceitos em ?fields= (nome na API -> atributo do modelo)
+CAMPOS_PEDIDO = {
+    'id': 'id',
+    'clienteNome': 'clienteNome',
+    'dataEvento': 'dataEvento',
+    'dataRetirada': 'dataRetirada',
+    'horarioRetirada': 'horarioRetirada',
+    'tipoPedido': 'tipoPedido',
+    'quantidade': 'quantidade',
+    'sabores': 'sabores',
+    'tipoEmbalagem': 'tipoEmbalagem',
+    'observacoes': 'observacoes',
+    'status': 'status',
+    'createdAt': 'createdAt',
+    'updatedAt': 'updatedAt',
+    'versao': 'versao',
+    'userId': 'user_id',
+    'clienteRG': 'clienteRG',
+    'clienteCPF': 'clienteCPF',
+    'nomeContratado': 'nomeContratado',
+    'cnpjContratado': 'cnpjContratado',
+    'valorTotalPedidoContrato': 'valorTotalPedidoContrato',
+    'dataPagamentoContrato': 'dataPagamentoContrato',
+    'localEvento': 'localEvento',
+    'produtosContratadosJson': 'produtosContratadosJson',
+    'contratoSha256': 'contratoSha256',
+}
+
+def _horario_iso(valor):
+    return valor.strftime('%H:%M')
+
+# Conversão dos campos de data/horário para o formato da API (o mesmo de data_para_iso)
+CONVERSORES = {
+    'dataEvento': date.isoformat,
+    'dataRetirada': date.isoformat,
+    'dataPagamentoContrato': date.isoformat,
+    'horarioRetirada': _horario_iso,
+    'createdAt': datetime.isoformat,
+    'updatedAt': datetime.isoformat,
+}
+
+def consulta_da_listagem(campos, extras=()):
+    """
+    select() com as colunas dos 'campos' (nomes da API), nessa ordem, seguidas dos
+    atributos em 'extras' que ainda não estiverem entre elas (ex: createdAt para o cursor).
+    """
+    atributos = [CAMPOS_PEDIDO[campo] for campo in campos]
+    atributos += [atributo for atributo in dict.fromkeys(extras) if atributo not in atributos]
+    return select(*[getattr(Pedido, atributo) for atributo in atributos])
+
+@lru_cache(maxsize=64)
+def serializador(campos):
+    """
+    Função que converte uma linha de consulta_da_listagem(campos) em dicionário.
+    'campos' é uma tupla; as colunas extras no fim da linha são ignoradas.
+    """
+    conversoes = tuple((campo, CONVERSORES[campo]) for campo in campos if campo in CONVERSORES)
+
+    def serializar(linha):
+        dados = dict(zip(campos, linha))
+        for campo, converter in conversoes:
+            valor = dados[campo]
+            if valor is not None:
+                dados[campo] = converter(valor)
+        return dados
+
+    return serializar
\ No newline at end of file
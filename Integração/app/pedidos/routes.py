@@ -1,9 +1,23 @@
 # Arquivo: app/pedidos/routes.py
 
-from flask import Blueprint, request, jsonify
+import base64
+import json
+from types import SimpleNamespace
+from flask import Blueprint, Response, request, jsonify, current_app, g, stream_with_context
 from datetime import datetime
+from sqlalchemy import tuple_, insert, update, select
 from app import db
-from app.models import Pedido, User
+from app.models import Pedido, PedidoItem
+from app.auth.sessao import usuario_obrigatorio
+from app.replica import leitura_na_replica
+from app.relatorios.metricas import fotografia, registrar_alteracoes
+from app.pedidos.itens import itens_do_json, gravar_itens, substituir_itens
+from app.utils import normalizar_data, normalizar_horario, data_para_iso
+from app.pedidos.busca import buscar_pedidos, trgm_disponivel, COLUNAS_BUSCA
+from app.pedidos.filtros import aplicar_filtros
+from app.pedidos.leitura import CAMPOS_PEDIDO, consulta_da_listagem, serializador
+from app.pedidos.versoes import etag_do_pedido, etag_da_lista, nao_modificado, com_etag, resposta_304
+from app.pedidos.eventos import registrar_eventos, ultimo_evento_id, fluxo_de_eventos, streams
 
 # A variável é definida aqui, no topo do arquivo
 pedidos_bp = Blueprint('pedidos', __name__, url_prefix='/api/pedidos')
@@ -13,9 +27,9 @@ def pedido_to_dict(pedido):
     return {
         'id': pedido.id,
         'clienteNome': pedido.clienteNome,
-        'dataEvento': pedido.dataEvento,
-        'dataRetirada': pedido.dataRetirada,
-        'horarioRetirada': pedido.horarioRetirada,
+        'dataEvento': data_para_iso(pedido.dataEvento),
+        'dataRetirada': data_para_iso(pedido.dataRetirada),
+        'horarioRetirada': data_para_iso(pedido.horarioRetirada),
         'tipoPedido': pedido.tipoPedido,
         'quantidade': pedido.quantidade,
         'sabores': pedido.sabores,
@@ -23,124 +37,467 @@ def pedido_to_dict(pedido):
         'observacoes': pedido.observacoes,
         'status': pedido.status,
         'createdAt': pedido.createdAt.isoformat(),
+        'updatedAt': data_para_iso(pedido.updatedAt),
+        'versao': pedido.versao,
         'userId': pedido.user_id,
         'clienteRG': pedido.clienteRG,
         'clienteCPF': pedido.clienteCPF,
         'nomeContratado': pedido.nomeContratado,
         'cnpjContratado': pedido.cnpjContratado,
         'valorTotalPedidoContrato': pedido.valorTotalPedidoContrato,
-        'dataPagamentoContrato': pedido.dataPagamentoContrato,
+        'dataPagamentoContrato': data_para_iso(pedido.dataPagamentoContrato),
         'localEvento': pedido.localEvento,
         'produtosContratadosJson': pedido.produtosContratadosJson,
+        'contratoSha256': pedido.contratoSha256,
     }
 
-@pedidos_bp.route('', methods=['POST'])
-def create_pedido():
-    data = request.json
-    user_email = request.headers.get('X-User-Id')
+# Campos de data/horário: chegam como texto em formatos variados e são gravados tipados
+CAMPOS_DATA = {
+    'dataEvento': normalizar_data,
+    'dataRetirada': normalizar_data,
+    'horarioRetirada': normalizar_horario,
+    'dataPagamentoContrato': normalizar_data,
+}
 
-    if not user_email:
-        return jsonify({'message': 'Usuário não autenticado.'}), 401
-    
-    user = User.query.filter_by(email=user_email).first()
-    if not user:
-        return jsonify({'message': 'Usuário inválido.'}), 401
+def pedido_to_partial_dict(pedido, campos):
+    """Serializa apenas os campos informados."""
+    dados = {}
+    for campo in campos:
+        valor = getattr(pedido, CAMPOS_PEDIDO[campo])
+        if campo in ('createdAt', 'updatedAt') or campo in CAMPOS_DATA:
+            valor = data_para_iso(valor)
+        dados[campo] = valor
+    return dados
+
+def normalizar_campos_data(data):
+    """
+    Converte os campos de data/horário presentes em 'data' para date/time.
+    Lança ValueError com uma mensagem amigável se algum valor for inválido.
+    """
+    normalizados = {}
+    for campo, normalizar in CAMPOS_DATA.items():
+        if campo in data:
+            normalizados[campo] = normalizar(data[campo])
+    return normalizados
+
+def encode_cursor(pedido):
+    """Gera o cursor opaco (createdAt, id) do último pedido de uma página."""
+    bruto = json.dumps([pedido.createdAt.isoformat(), pedido.id])
+    return base64.urlsafe_b64encode(bruto.encode()).decode()
+
+def decode_cursor(cursor):
+    """Converte o cursor de volta em (createdAt, id). Lança ValueError se for inválido."""
+    try:
+        created_at, pedido_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(pedido_id)
+    except Exception as e:
+        raise ValueError('Cursor inválido.') from e
+
+def parse_fields(valor):
+    """Lê o parâmetro ?fields=. Retorna None (todos os campos) ou a lista pedida."""
+    if not valor:
+        return None
+    campos = [c.strip() for c in valor.split(',') if c.strip()]
+    invalidos = [c for c in campos if c not in CAMPOS_PEDIDO]
+    if invalidos:
+        raise ValueError(f"Campos inválidos: {', '.join(invalidos)}.")
+    # O 'id' sempre acompanha a resposta, pois o frontend monta links com ele
+    if 'id' not in campos:
+        campos.insert(0, 'id')
+    return campos
+
+def parse_limit(valor):
+    """Lê o parâmetro ?limit=, aplicando o padrão e o teto configurados."""
+    padrao = current_app.config['PEDIDOS_LIMITE_PADRAO']
+    maximo = current_app.config['PEDIDOS_LIMITE_MAXIMO']
+    if not valor:
+        return padrao
+    try:
+        limite = int(valor)
+    except ValueError:
+        raise ValueError('Parâmetro limit deve ser um número inteiro.')
+    if limite < 1:
+        raise ValueError('Parâmetro limit deve ser maior que zero.')
+    return min(limite, maximo)
+
+def pagina_por_keyset(consulta, cursor, limite):
+    """Retorna (linhas da página, existe_proxima_pagina), ordenando por (createdAt, id) decrescente."""
+    # Paginação por keyset: continua a partir do último (createdAt, id) entregue
+    if cursor:
+        consulta = consulta.where(tuple_(Pedido.createdAt, Pedido.id) < tuple_(*cursor))
+
+    # Busca um item a mais para saber se existe uma próxima página
+    pedidos = db.session.execute(
+        consulta.order_by(Pedido.createdAt.desc(), Pedido.id.desc()).limit(limite + 1)
+    ).all()
+    tem_proxima = len(pedidos) > limite
+    return pedidos[:limite], tem_proxima
+
+# Campos que o usuário pode alterar (PUT /<id> e PATCH /bulk). Os demais
+# (id, userId, createdAt, updatedAt, versao, contratoSha256) são definidos pelo sistema.
+CAMPOS_EDITAVEIS = {
+    campo: atributo for campo, atributo in CAMPOS_PEDIDO.items()
+    if campo not in ('id', 'userId', 'createdAt', 'updatedAt', 'versao', 'contratoSha256')
+}
+CAMPOS_OBRIGATORIOS = ['clienteNome', 'dataEvento', 'quantidade', 'tipoPedido', 'dataRetirada', 'horarioRetirada']
 
-    required_fields = ['clienteNome', 'dataEvento', 'quantidade', 'tipoPedido', 'dataRetirada', 'horarioRetirada']
-    if not all(field in data and data[field] for field in required_fields):
-        return jsonify({'message': 'Campos obrigatórios faltando.'}), 400
+# Máximo de pedidos por requisição nos endpoints /bulk
+LIMITE_BULK = 1000
 
-    new_pedido = Pedido(
+def dados_do_novo_pedido(data, user_id):
+    """
+    Valida os dados de um novo pedido e retorna os valores das colunas.
+    Lança ValueError com uma mensagem amigável se algo estiver inválido.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Pedido inválido.')
+    agora = datetime.utcnow()
+    if not all(field in data and data[field] for field in CAMPOS_OBRIGATORIOS):
+        raise ValueError('Campos obrigatórios faltando.')
+    datas = normalizar_campos_data(data)
+    try:
+        quantidade = int(data['quantidade'])
+    except (ValueError, TypeError):
+        raise ValueError('Quantidade deve ser um número inteiro.')
+
+    return dict(
         clienteNome=data['clienteNome'],
-        dataEvento=data['dataEvento'],
-        dataRetirada=data['dataRetirada'],
-        horarioRetirada=data['horarioRetirada'],
+        dataEvento=datas['dataEvento'],
+        dataRetirada=datas['dataRetirada'],
+        horarioRetirada=datas['horarioRetirada'],
         tipoPedido=data['tipoPedido'],
-        quantidade=int(data['quantidade']),
+        quantidade=quantidade,
         sabores=data.get('sabores', ''),
         tipoEmbalagem=data.get('tipoEmbalagem', ''),
         observacoes=data.get('observacoes', ''),
         status='pendente',
-        user_id=user.id,
+        user_id=user_id,
         clienteRG=data.get('clienteRG', ''),
         clienteCPF=data.get('clienteCPF', ''),
         nomeContratado=data.get('nomeContratado', ''),
         cnpjContratado=data.get('cnpjContratado', ''),
         valorTotalPedidoContrato=data.get('valorTotalPedidoContrato', ''),
-        dataPagamentoContrato=data.get('dataPagamentoContrato', ''),
+        dataPagamentoContrato=datas.get('dataPagamentoContrato'),
         localEvento=data.get('localEvento', ''),
-        produtosContratadosJson=data.get('produtosContratadosJson', '[]')
+        produtosContratadosJson=data.get('produtosContratadosJson', '[]'),
+        contratoSha256=data.get('contratoSha256') or None,
+        createdAt=agora,
+        updatedAt=agora,
     )
 
+def valores_editados(data):
+    """
+    Converte os campos editáveis presentes em 'data' para {atributo: valor}; os demais
+    são ignorados. Lança ValueError se algum valor for inválido.
+    """
+    datas = normalizar_campos_data(data)
+    if any(datas.get(campo, True) is None for campo in ['dataEvento', 'dataRetirada', 'horarioRetirada']):
+        raise ValueError('Campos obrigatórios faltando.')
+    valores = {}
+    for campo, valor in data.items():
+        if campo not in CAMPOS_EDITAVEIS:
+            continue
+        if campo in datas:
+            valor = datas[campo]
+        elif campo == 'quantidade':
+            try:
+                valor = int(valor)
+            except (ValueError, TypeError):
+                raise ValueError('Quantidade deve ser um número inteiro.')
+        elif campo in CAMPOS_OBRIGATORIOS and not valor:
+            raise ValueError('Campos obrigatórios faltando.')
+        valores[CAMPOS_EDITAVEIS[campo]] = valor
+    return valores
+
+@pedidos_bp.route('', methods=['POST'])
+@usuario_obrigatorio
+def create_pedido():
+    data = request.json
+    try:
+        valores = dados_do_novo_pedido(data, g.usuario_id)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    # Pedido vindo de um contrato já usado: só cria se o usuário confirmar
+    contrato_sha256 = valores['contratoSha256']
+    if contrato_sha256 and not data.get('permitirContratoDuplicado'):
+        existente = db.session.query(Pedido.id).filter(Pedido.contratoSha256 == contrato_sha256).first()
+        if existente:
+            return jsonify({
+                'message': f'Este contrato já foi usado no pedido #{existente.id}.',
+                'pedidoExistente': existente.id,
+            }), 409
+
+    new_pedido = Pedido(**valores)
+    new_pedido.itens = [PedidoItem(**item) for item in itens_do_json(valores['produtosContratadosJson'])]
+
     db.session.add(new_pedido)
+    db.session.flush()
+    registrar_alteracoes(depois=[fotografia(valores)])
+    registrar_eventos('criado', [(new_pedido.id, new_pedido.versao, pedido_to_dict(new_pedido))])
     db.session.commit()
     
-    return jsonify({'message': 'Pedido salvo com sucesso!', 'pedido': pedido_to_dict(new_pedido)}), 201
+    resposta = jsonify({'message': 'Pedido salvo com sucesso!', 'pedido': pedido_to_dict(new_pedido)})
+    return com_etag(resposta, etag_do_pedido(new_pedido.id, new_pedido.versao)), 201
+
+@pedidos_bp.route('/bulk', methods=['POST'])
+@usuario_obrigatorio
+def create_pedidos_bulk():
+    """
+    Cria vários pedidos de uma vez: {"pedidos": [{...}, ...]}.
+    Todos são validados antes; se algum for inválido nada é criado e a resposta (400)
+    lista os erros por item ({'indice', 'message'}). Os válidos são inseridos com um
+    único INSERT (executemany) em uma transação.
+    """
+    data = request.get_json(silent=True) or {}
+    itens = data.get('pedidos') if isinstance(data, dict) else None
+    if not isinstance(itens, list) or not itens:
+        return jsonify({'message': 'Envie a lista de pedidos em "pedidos".'}), 400
+    if len(itens) > LIMITE_BULK:
+        return jsonify({'message': f'Máximo de {LIMITE_BULK} pedidos por requisição.'}), 400
+
+    linhas = {}
+    erros = []
+    for indice, item in enumerate(itens):
+        try:
+            linhas[indice] = dados_do_novo_pedido(item, g.usuario_id)
+        except ValueError as e:
+            erros.append({'indice': indice, 'message': str(e)})
+
+    # Contratos já usados (no banco ou repetidos no próprio lote), salvo confirmação por item
+    hashes = {linha['contratoSha256'] for linha in linhas.values() if linha['contratoSha256']}
+    if hashes:
+        usados = dict(db.session.query(Pedido.contratoSha256, Pedido.id).filter(Pedido.contratoSha256.in_(hashes)))
+        vistos = {}
+        for indice, linha in linhas.items():
+            item = itens[indice]
+            sha256 = linha['contratoSha256']
+            if not sha256 or item.get('permitirContratoDuplicado'):
+                continue
+            if sha256 in usados:
+                erros.append({'indice': indice, 'message': f'Este contrato já foi usado no pedido #{usados[sha256]}.'})
+            elif sha256 in vistos:
+                erros.append({'indice': indice, 'message': f'Contrato repetido no lote (item {vistos[sha256]}).'})
+            vistos.setdefault(sha256, indice)
+
+    if erros:
+        erros.sort(key=lambda erro: erro['indice'])
+        return jsonify({'message': 'Nenhum pedido foi criado: corrija os itens com erro.', 'erros': erros}), 400
+
+    ids = db.session.scalars(
+        insert(Pedido).returning(Pedido.id, sort_by_parameter_order=True), list(linhas.values())
+    ).all()
+    gravar_itens(zip(ids, (linha['produtosContratadosJson'] for linha in linhas.values())))
+    registrar_alteracoes(depois=[fotografia(linha) for linha in linhas.values()])
+    registrar_eventos('criado', [
+        (pedido_id, 1, pedido_to_dict(SimpleNamespace(id=pedido_id, versao=1, **linha)))
+        for pedido_id, linha in zip(ids, linhas.values())
+    ])
+    db.session.commit()
+    return jsonify({'message': f'{len(ids)} pedido(s) salvo(s) com sucesso!', 'ids': ids}), 201
+
+@pedidos_bp.route('/bulk', methods=['PATCH'])
+@usuario_obrigatorio
+def update_pedidos_bulk():
+    """
+    Altera os mesmos campos em vários pedidos: {"pedido_ids": [...], "campos": {...}}
+    (ou {"pedido_ids": [...], "status": "confirmado"}). Só os campos de CAMPOS_EDITAVEIS
+    são aceitos. Tudo roda em um único UPDATE ... WHERE id IN (...); se algum ID não
+    existir, nada é alterado e a resposta (404) lista os IDs com erro.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'message': 'O corpo da requisição deve ser um objeto JSON.'}), 400
+    campos = data.get('campos') or ({'status': data['status']} if data.get('status') else None)
+    recebidos = data.get('pedido_ids') or []
+    if not isinstance(recebidos, list):
+        return jsonify({'message': '"pedido_ids" deve ser uma lista de IDs.'}), 400
+    pedido_ids = []
+    erros = []
+    for indice, pedido_id in enumerate(recebidos):
+        # bool é subclasse de int e 1.9 viraria 1: só inteiros ou texto com um inteiro
+        try:
+            if isinstance(pedido_id, bool) or not isinstance(pedido_id, (int, str)):
+                raise ValueError
+            pedido_ids.append(int(pedido_id))
+        except ValueError:
+            erros.append({'indice': indice, 'message': f'ID de pedido inválido: {pedido_id!r}.'})
+    if erros:
+        return jsonify({'message': 'Nenhum pedido foi alterado: há IDs inválidos.', 'erros': erros}), 400
+    if not pedido_ids or not isinstance(campos, dict) or not campos:
+        return jsonify({'message': 'Envie "pedido_ids" e os "campos" a alterar.'}), 400
+    if len(pedido_ids) > LIMITE_BULK:
+        return jsonify({'message': f'Máximo de {LIMITE_BULK} pedidos por requisição.'}), 400
+
+    nao_editaveis = sorted(set(campos) - set(CAMPOS_EDITAVEIS))
+    if nao_editaveis:
+        return jsonify({'message': f"Campos não editáveis: {', '.join(nao_editaveis)}."}), 400
+    try:
+        valores = valores_editados(campos)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    pedido_ids = list(dict.fromkeys(pedido_ids))
+    # Estado atual dos campos que entram nas métricas do painel (ver app/relatorios/metricas.py)
+    atuais = db.session.execute(
+        select(
+            Pedido.id, Pedido.createdAt, Pedido.dataRetirada, Pedido.status,
+            Pedido.tipoPedido, Pedido.clienteNome, Pedido.quantidade,
+        )
+        .where(Pedido.id.in_(pedido_ids))
+    ).all()
+    existentes = {pedido.id for pedido in atuais}
+    erros = [{'id': pedido_id, 'message': 'Pedido não encontrado.'} for pedido_id in pedido_ids if pedido_id not in existentes]
+    if erros:
+        return jsonify({'message': 'Nenhum pedido foi alterado: há pedidos inexistentes.', 'erros': erros}), 404
+
+    versoes = db.session.execute(
+        update(Pedido).where(Pedido.id.in_(pedido_ids)).values(**valores, versao=Pedido.versao + 1)
+        .returning(Pedido.id, Pedido.versao),
+        execution_options={'synchronize_session': False},
+    ).all()
+    if 'produtosContratadosJson' in valores:
+        substituir_itens(pedido_ids, valores['produtosContratadosJson'])
+    registrar_alteracoes(
+        antes=[fotografia(pedido) for pedido in atuais],
+        depois=[fotografia({**pedido._asdict(), **valores}) for pedido in atuais],
+    )
+    alterados = pedido_to_partial_dict(SimpleNamespace(**valores), list(valores))
+    registrar_eventos('alterado', [(pedido_id, versao, alterados) for pedido_id, versao in versoes])
+    db.session.commit()
+    return jsonify({'message': f'{len(versoes)} pedido(s) atualizado(s) com sucesso!', 'ids': pedido_ids}), 200
 
 @pedidos_bp.route('', methods=['GET'])
+@usuario_obrigatorio
+@leitura_na_replica
 def get_pedidos():
-    user_email = request.headers.get('X-User-Id')
-    if not user_email:
-        return jsonify({'message': 'Usuário não autenticado.'}), 401
-    
-    query = Pedido.query
-
-    if 'cliente' in request.args and request.args['cliente']:
-        query = query.filter(Pedido.clienteNome.ilike(f"%{request.args['cliente']}%"))
-    if 'dataEvento' in request.args and request.args['dataEvento']:
-        query = query.filter_by(dataEvento=request.args['dataEvento'])
-    if 'status' in request.args and request.args['status']:
-        status_filter = request.args['status']
-        if ',' in status_filter:
-            query = query.filter(Pedido.status.in_(status_filter.split(',')))
-        else:
-            query = query.filter_by(status=status_filter)
-    
-    pedidos = query.order_by(Pedido.createdAt.desc()).all()
-    pedidos_list = [pedido_to_dict(p) for p in pedidos]
-    
-    return jsonify(pedidos_list), 200
+    try:
+        campos = parse_fields(request.args.get('fields'))
+        limite = parse_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    termo_busca = request.args.get('busca', '').strip()
+    campos = tuple(campos or CAMPOS_PEDIDO)
+
+    # Leitura pelo Core (sem montar objetos Pedido); createdAt e id são sempre
+    # necessários para o cursor
+    extras = ['id', 'createdAt']
+    if termo_busca and not trgm_disponivel():
+        # Sem pg_trgm a relevância é calculada em Python sobre as colunas da busca
+        extras += COLUNAS_BUSCA
+    consulta = consulta_da_listagem(campos, extras)
+
+    try:
+        consulta = aplicar_filtros(consulta, request.args)
+        # A ETag cobre todos os pedidos dos filtros (não só a página), então muda sempre
+        # que algum deles muda; com ela igual, nada é consultado nem serializado
+        etag = etag_da_lista(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    if nao_modificado(etag, weak=True):
+        return resposta_304(etag, weak=True)
+
+    tem_proxima = False
+    if termo_busca:
+        # Modo busca: resultados ordenados por relevância, sem cursor (apenas os 'limit' melhores)
+        pedidos = buscar_pedidos(consulta, termo_busca, limite)
+    else:
+        pedidos, tem_proxima = pagina_por_keyset(consulta, cursor, limite)
+
+    serializar = serializador(campos)
+    pedidos_list = [serializar(p) for p in pedidos]
+
+    response = jsonify(pedidos_list)
+    if tem_proxima:
+        response.headers['X-Next-Cursor'] = encode_cursor(pedidos[-1])
+    return com_etag(response, etag, weak=True), 200
 
 @pedidos_bp.route('/<int:pedido_id>', methods=['GET'])
+@usuario_obrigatorio
 def get_pedido_details(pedido_id):
-    user_email = request.headers.get('X-User-Id')
-    if not user_email:
-        return jsonify({'message': 'Usuário não autenticado.'}), 401
+    # Só a versão é lida antes de decidir entre 304 e o pedido completo
+    versao = db.session.scalar(select(Pedido.versao).where(Pedido.id == pedido_id))
+    if versao is None:
+        return jsonify({'message': 'Pedido não encontrado.'}), 404
+    if nao_modificado(etag_do_pedido(pedido_id, versao)):
+        return resposta_304(etag_do_pedido(pedido_id, versao))
 
     pedido = Pedido.query.get(pedido_id)
-    
     if pedido:
-        return jsonify(pedido_to_dict(pedido)), 200
+        return com_etag(jsonify(pedido_to_dict(pedido)), etag_do_pedido(pedido.id, pedido.versao)), 200
     return jsonify({'message': 'Pedido não encontrado.'}), 404
 
 @pedidos_bp.route('/<int:pedido_id>', methods=['PUT'])
+@usuario_obrigatorio
 def update_pedido(pedido_id):
-    user_email = request.headers.get('X-User-Id')
-    if not user_email:
-        return jsonify({'message': 'Usuário não autenticado.'}), 401
-
     pedido = Pedido.query.get(pedido_id)
     if not pedido:
         return jsonify({'message': 'Pedido não encontrado.'}), 404
 
     data = request.json
-    for key, value in data.items():
-        if hasattr(pedido, key) and key not in ['id', 'user_id', 'createdAt']:
-            setattr(pedido, key, value)
+    try:
+        valores = valores_editados(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    # Só os campos editáveis são aplicados; os demais (id, userId, createdAt...) são ignorados
+    antes = fotografia(pedido)
+    for atributo, valor in valores.items():
+        setattr(pedido, atributo, valor)
+    if 'produtosContratadosJson' in valores:
+        pedido.itens = [PedidoItem(**item) for item in itens_do_json(pedido.produtosContratadosJson)]
+    registrar_alteracoes(antes=[antes], depois=[fotografia(pedido)])
+    db.session.flush()
+    registrar_eventos('alterado', [(pedido.id, pedido.versao, pedido_to_partial_dict(pedido, list(valores)))])
             
     db.session.commit()
-    return jsonify({'message': 'Pedido atualizado com sucesso!', 'pedido': pedido_to_dict(pedido)}), 200
+    resposta = jsonify({'message': 'Pedido atualizado com sucesso!', 'pedido': pedido_to_dict(pedido)})
+    return com_etag(resposta, etag_do_pedido(pedido.id, pedido.versao)), 200
 
 @pedidos_bp.route('/<int:pedido_id>', methods=['DELETE'])
+@usuario_obrigatorio
 def delete_pedido(pedido_id):
-    user_email = request.headers.get('X-User-Id')
-    if not user_email:
-        return jsonify({'message': 'Usuário não autenticado.'}), 401
-
     pedido = Pedido.query.get(pedido_id)
     if not pedido:
         return jsonify({'message': 'Pedido não encontrado.'}), 404
 
+    registrar_alteracoes(antes=[fotografia(pedido)])
+    registrar_eventos('excluido', [(pedido.id, None, None)])
     db.session.delete(pedido)
     db.session.commit()
-    return jsonify({'message': 'Pedido excluído com sucesso!'}), 200
\ No newline at end of file
+    return jsonify({'message': 'Pedido excluído com sucesso!'}), 200
+
+@pedidos_bp.route('/stream', methods=['GET'])
+@usuario_obrigatorio
+def stream_pedidos():
+    """
+    Server-sent events com os pedidos criados, alterados e excluídos (ver app/pedidos/eventos.py).
+    Sem Last-Event-ID (ou ?ultimoEvento=), começa pelos eventos gravados a partir de agora.
+    Com EVENTOS_MAX_STREAMS_POR_WORKER streams já abertos no worker, responde 503 com
+    Retry-After (o cliente tenta de novo mais tarde).
+    """
+    ultimo = request.headers.get('Last-Event-ID') or request.args.get('ultimoEvento')
+    try:
+        ultimo_id = int(ultimo) if ultimo else ultimo_evento_id()
+    except ValueError:
+        return jsonify({'message': 'Last-Event-ID inválido.'}), 400
+
+    if not streams.reservar(current_app.config['EVENTOS_MAX_STREAMS_POR_WORKER']):
+        resposta = jsonify({'message': 'Muitas conexões de atualização abertas. Tente novamente em instantes.'})
+        resposta.headers['Retry-After'] = str(current_app.config['EVENTOS_ESPERA_LOTADO_SEGUNDOS'])
+        return resposta, 503
+    try:
+        resposta = Response(
+            stream_with_context(fluxo_de_eventos(ultimo_id)),
+            mimetype='text/event-stream',
+            # Sem cache e sem buffer em proxies (nginx), para cada evento chegar na hora
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+    except Exception:
+        streams.liberar()
+        raise
+    # Libera a vaga quando o servidor fecha a resposta (fim do stream ou cliente desconectado)
+    resposta.call_on_close(streams.liberar)
+    return resposta
\ No newline at end of file
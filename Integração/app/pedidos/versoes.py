@@ -0,0 +1,45 @@
+# Arquivo: app/pedidos/versoes.py
+# ETags dos pedidos e respostas condicionais (If-None-Match -> 304).
+#
+# Cada pedido tem uma versão (Pedido.versao, incrementada a cada alteração) e o
+# horário da última alteração (Pedido.updatedAt). Um pedido tem ETag forte
+# "<id>-<versao>"; uma lista tem ETag fraca com o total, a soma dos ids, a soma
+# das versões e o maior updatedAt dos pedidos que atendem aos filtros. Toda
+# alteração incrementa uma versão e toda inclusão ou exclusão muda o total ou a
+# soma dos ids, mesmo quando os commits terminam fora da ordem do updatedAt (que
+# sozinho poderia não mudar). As respostas vão com 'Cache-Control: no-cache', então o navegador
+# guarda o corpo e revalida a cada requisição, recebendo 304 quando nada mudou.
+
+from flask import current_app, request
+from sqlalchemy import func
+from app import db
+from app.models import Pedido
+from app.pedidos.filtros import aplicar_filtros
+
+def etag_do_pedido(pedido_id, versao):
+    return f'{pedido_id}-{versao}'
+
+def etag_da_lista(filtros):
+    """ETag dos pedidos que atendem aos filtros de GET /api/pedidos. Lança ValueError se algum filtro for inválido."""
+    consulta = aplicar_filtros(db.session.query(
+        func.count(Pedido.id), func.coalesce(func.sum(Pedido.id), 0),
+        func.coalesce(func.sum(Pedido.versao), 0), func.max(Pedido.updatedAt),
+    ), filtros)
+    total, soma_ids, soma_versoes, ultima_alteracao = consulta.one()
+    alteracao = ultima_alteracao.strftime('%Y%m%d%H%M%S%f') if ultima_alteracao else 0
+    return f'{total}-{soma_ids}-{soma_versoes}-{alteracao}'
+
+def nao_modificado(etag, weak=False):
+    """True se o cliente já tem a representação com esta ETag (If-None-Match)."""
+    if weak:
+        return request.if_none_match.contains_weak(etag)
+    return request.if_none_match.contains(etag)
+
+def com_etag(resposta, etag, weak=False):
+    """Coloca a ETag na resposta e pede ao navegador que revalide antes de reusar o corpo."""
+    resposta.set_etag(etag, weak=weak)
+    resposta.headers['Cache-Control'] = 'private, no-cache'
+    return resposta
+
+def resposta_304(etag, weak=False):
+    return com_etag(current_app.response_class(status=304), etag, weak)
\ No newline at end of file
@@ -0,0 +1,114 @@
+# Arquivo: app/relatorios/comprovantes.py
+# Dados do comprovante de retirada (relatório de entrega) de um pedido,
+# e geração de comprovantes em lote (ZIP ou DOCX único), sempre em memória.
+# O .docx de cada pedido fica em um cache LRU por worker, pela versão do pedido e
+# pela data de emissão impressa no comprovante: só é gerado de novo se um dos dois mudar.
+
+import json
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from datetime import date, datetime
+from flask import current_app
+from app.models import Pedido
+from app.Extractor import gerar_relatorio_entrega, gerar_relatorios_entrega_unificado
+from app.utils import normalizar_data, validar_ids
+
+MIMETYPE_DOCX = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+MIMETYPE_ZIP = 'application/zip'
+
+# Formatos do lote de comprovantes (ver gerar_lote_comprovantes)
+FORMATOS_LOTE = ('zip', 'docx')
+
+# Buffer em memória do lote antes de ir para um arquivo temporário
+LIMITE_BUFFER_MEMORIA = 16 * 1024 * 1024
+
+def dados_do_comprovante(pedido):
+    """Monta, a partir de um Pedido, o dicionário no formato esperado por gerar_relatorio_entrega."""
+    return {
+        'Contratante': {'Nome': pedido.clienteNome, 'RG': pedido.clienteRG, 'CPF': pedido.clienteCPF},
+        'Contratado': {'Nome Empresa': pedido.nomeContratado, 'CNPJ': pedido.cnpjContratado},
+        'Data do Evento': pedido.dataEvento.strftime('%d/%m/%Y') if pedido.dataEvento else 'Não informada',
+        'Local do Evento': pedido.localEvento,
+        'Valor Total do Pedido': pedido.valorTotalPedidoContrato,
+        'Data de Pagamento': pedido.dataPagamentoContrato.strftime('%d/%m/%Y') if pedido.dataPagamentoContrato else '',
+        'Produtos Contratados': json.loads(pedido.produtosContratadosJson or '[]'),
+        'Observacoes': pedido.observacoes
+    }
+
+_cache = OrderedDict()  # (id, versao, data de emissão) -> bytes do .docx
+_cache_lock = threading.Lock()
+
+def chave_do_comprovante(pedido_id, versao):
+    """Identifica o conteúdo do comprovante: muda com a versão do pedido e com o dia (data de emissão)."""
+    return pedido_id, versao, date.today()
+
+def etag_do_comprovante(pedido_id, versao):
+    return '-'.join(str(parte) for parte in chave_do_comprovante(pedido_id, versao))
+
+def comprovante_do_pedido(pedido):
+    """Bytes do .docx do comprovante de retirada do pedido, gerado só quando não estiver no cache."""
+    chave = chave_do_comprovante(pedido.id, pedido.versao)
+    with _cache_lock:
+        conteudo = _cache.get(chave)
+        if conteudo is not None:
+            _cache.move_to_end(chave)
+            return conteudo
+
+    conteudo = gerar_relatorio_entrega(dados_do_comprovante(pedido))
+    with _cache_lock:
+        _cache[chave] = conteudo
+        while len(_cache) > current_app.config['COMPROVANTES_CACHE_MAX_ENTRADAS']:
+            _cache.popitem(last=False)
+    return conteudo
+
+def nome_do_comprovante(pedido_id):
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"comprovante_retirada_{pedido_id}_{timestamp}.docx"
+
+def consulta_comprovantes(pedido_ids=None, data_retirada=None):
+    """
+    Pedidos de um lote de comprovantes: por lista de IDs ou por data de retirada,
+    na ordem de retirada. Lança ValueError se nenhum critério for informado ou se
+    algum for inválido.
+    """
+    query = Pedido.query
+    if pedido_ids:
+        query = query.filter(Pedido.id.in_(validar_ids(pedido_ids, 'pedido_ids')))
+    elif data_retirada:
+        query = query.filter(Pedido.dataRetirada == normalizar_data(data_retirada))
+    else:
+        raise ValueError('Informe pedido_ids ou dataRetirada.')
+    return query.order_by(Pedido.dataRetirada, Pedido.horarioRetirada, Pedido.id)
+
+def gerar_lote_comprovantes(pedidos, formato='zip'):
+    """
+    Gera os comprovantes de todos os pedidos de uma vez, sem passar pela pasta de uploads.
+    formato='zip': um .docx por pedido dentro de um ZIP; formato='docx': um único
+    documento com um comprovante por página.
+    Retorna (buffer posicionado no início, quantidade de comprovantes, nome do arquivo, mimetype).
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    buffer = tempfile.SpooledTemporaryFile(max_size=LIMITE_BUFFER_MEMORIA)
+
+    if formato == 'docx':
+        lista_dados = [dados_do_comprovante(pedido) for pedido in pedidos]
+        if lista_dados:
+            gerar_relatorios_entrega_unificado(lista_dados, destino=buffer)
+        total = len(lista_dados)
+        nome_arquivo, mimetype = f"comprovantes_retirada_{timestamp}.docx", MIMETYPE_DOCX
+    elif formato == 'zip':
+        total = 0
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as arquivo_zip:
+            for pedido in pedidos:
+                conteudo = comprovante_do_pedido(pedido)
+                arquivo_zip.writestr(f"comprovante_retirada_{pedido.id}.docx", conteudo)
+                total += 1
+        nome_arquivo, mimetype = f"comprovantes_retirada_{timestamp}.zip", MIMETYPE_ZIP
+    else:
+        buffer.close()
+        raise ValueError("Formato inválido. Use 'zip' ou 'docx'.")
+
+    buffer.seek(0)
+    return buffer, total, nome_arquivo, mimetype
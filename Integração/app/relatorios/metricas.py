@@ -0,0 +1,248 @@
+# Arquivo: app/relatorios/metricas.py
+# Métricas do painel de relatórios (GET /api/reports).
+#
+# Em vez de agregar a tabela de pedidos inteira a cada carregamento, o painel lê a
+# tabela metrica_diaria: totais por dia de criação e por status, produto (tipoPedido)
+# e cliente. As rotas que gravam pedidos chamam registrar_alteracoes() na mesma
+# transação, com a "fotografia" dos pedidos antes e depois da mudança; a tabela inteira
+# pode ser refeita com reconstruir_metricas() (migração 0005 e flask recalcular-metricas).
+# As mesmas fotografias descartam as agendas de produção em cache das datas de retirada
+# afetadas (app/relatorios/producao.py).
+# O resultado do painel fica em um cache curto (METRICAS_CACHE_TTL_SEGUNDOS) por worker.
+# Os caches só são descartados depois do commit (_invalidar_apos_commit): antes dele,
+# outra thread ainda leria o estado anterior e o guardaria em cache.
+
+import time
+import threading
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, event, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from app import db
+from app.models import MetricaDiaria, Pedido
+from app.relatorios import producao
+
+# Dimensão da métrica -> coluna do pedido
+DIMENSOES = {
+    'status': 'status',
+    'produto': 'tipoPedido',
+    'cliente': 'clienteNome',
+}
+
+MESES = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+# Quantos períodos a série de evolução mostra
+PERIODOS_EVOLUCAO = {'semana': 8, 'mes': 6}
+
+Fotografia = namedtuple('Fotografia', ['dia', 'status', 'produto', 'cliente', 'quantidade', 'retirada'])
+
+def fotografia(pedido):
+    """Os campos do pedido que entram nas métricas e na agenda de produção (aceita o modelo, uma linha de consulta ou um dict)."""
+    valor = pedido.get if isinstance(pedido, dict) else lambda campo: getattr(pedido, campo)
+    criado_em = valor('createdAt') or datetime.utcnow()
+    return Fotografia(
+        criado_em.date() if isinstance(criado_em, datetime) else criado_em,
+        valor('status'), valor('tipoPedido'), valor('clienteNome'), int(valor('quantidade') or 0),
+        valor('dataRetirada'),
+    )
+
+# ==============================================================================
+# Manutenção incremental
+# ==============================================================================
+def registrar_alteracoes(antes=(), depois=()):
+    """
+    Aplica à metrica_diaria a diferença entre as fotografias 'antes' (pedidos removidos ou
+    no estado anterior) e 'depois' (pedidos novos ou no estado atual). Deve ser chamada
+    antes do commit da alteração dos pedidos, para que as duas fiquem na mesma transação.
+    Depois do commit, descarta o painel e as agendas de produção em cache das datas de
+    retirada envolvidas.
+    """
+    db.session.info.setdefault('datas_producao', set()).update(
+        foto.retirada for fotografias in (antes, depois) for foto in fotografias
+    )
+    deltas = defaultdict(lambda: [0, 0])
+    for sinal, fotografias in ((-1, antes), (1, depois)):
+        for foto in fotografias:
+            for dimensao in DIMENSOES:
+                delta = deltas[(foto.dia, dimensao, getattr(foto, dimensao))]
+                delta[0] += sinal
+                delta[1] += sinal * foto.quantidade
+
+    linhas = [
+        {'dia': dia, 'dimensao': dimensao, 'chave': chave, 'pedidos': pedidos, 'quantidade': quantidade}
+        for (dia, dimensao, chave), (pedidos, quantidade) in deltas.items()
+        if pedidos or quantidade
+    ]
+    if linhas:
+        _somar(linhas)
+        db.session.info['invalidar_painel'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    datas = session.info.pop('datas_producao', None)
+    if datas:
+        producao.invalidar_cache(datas)
+    if session.info.pop('invalidar_painel', False):
+        invalidar_cache()
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_invalidacoes(session):
+    session.info.pop('datas_producao', None)
+    session.info.pop('invalidar_painel', None)
+
+def _somar(linhas):
+    """Soma os deltas às linhas existentes (upsert do PostgreSQL/SQLite; nos demais, UPDATE e depois INSERT)."""
+    tabela = MetricaDiaria.__table__
+    dialeto = db.session.connection().dialect.name
+    if dialeto in ('postgresql', 'sqlite'):
+        if dialeto == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as insert_do_dialeto
+        else:
+            from sqlalchemy.dialects.sqlite import insert as insert_do_dialeto
+        stmt = insert_do_dialeto(tabela)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['dia', 'dimensao', 'chave'],
+            set_={
+                'pedidos': tabela.c.pedidos + stmt.excluded.pedidos,
+                'quantidade': tabela.c.quantidade + stmt.excluded.quantidade,
+            },
+        )
+        db.session.execute(stmt, linhas)
+        return
+
+    for linha in linhas:
+        resultado = db.session.execute(
+            update(tabela)
+            .where(tabela.c.dia == linha['dia'], tabela.c.dimensao == linha['dimensao'], tabela.c.chave == linha['chave'])
+            .values(pedidos=tabela.c.pedidos + linha['pedidos'], quantidade=tabela.c.quantidade + linha['quantidade'])
+        )
+        if not resultado.rowcount:
+            db.session.execute(insert(tabela), linha)
+
+def reconstruir_metricas(conexao):
+    """Refaz a metrica_diaria a partir da tabela de pedidos (um GROUP BY por dimensão)."""
+    tabela = MetricaDiaria.__table__
+    conexao.execute(delete(tabela))
+    dia = func.date(Pedido.createdAt)
+    for dimensao, coluna in DIMENSOES.items():
+        chave = getattr(Pedido, coluna)
+        consulta = (
+            select(dia, literal(dimensao), chave, func.count(Pedido.id), func.coalesce(func.sum(Pedido.quantidade), 0))
+            .group_by(dia, chave)
+        )
+        conexao.execute(insert(tabela).from_select(['dia', 'dimensao', 'chave', 'pedidos', 'quantidade'], consulta))
+
+@click.command('recalcular-metricas')
+@with_appcontext
+def recalcular_metricas_command():
+    """Refaz as métricas do painel de relatórios a partir dos pedidos."""
+    with db.engine.begin() as conexao:
+        reconstruir_metricas(conexao)
+    invalidar_cache()
+    click.echo('Métricas recalculadas.')
+
+# ==============================================================================
+# Consultas por período
+# ==============================================================================
+def total_de_pedidos(inicio, fim):
+    """Pedidos criados em [inicio, fim)."""
+    return db.session.scalar(
+        select(func.coalesce(func.sum(MetricaDiaria.pedidos), 0))
+        .where(MetricaDiaria.dimensao == 'status', MetricaDiaria.dia >= inicio, MetricaDiaria.dia < fim)
+    )
+
+def mais_pedidos(dimensao, medida='pedidos', inicio=None, fim=None):
+    """(chave, total) com o maior total de 'medida' ('pedidos' ou 'quantidade') na dimensão, ou None."""
+    total = func.sum(getattr(MetricaDiaria, medida))
+    consulta = select(MetricaDiaria.chave, total).where(MetricaDiaria.dimensao == dimensao)
+    if inicio:
+        consulta = consulta.where(MetricaDiaria.dia >= inicio)
+    if fim:
+        consulta = consulta.where(MetricaDiaria.dia < fim)
+    consulta = consulta.group_by(MetricaDiaria.chave).having(func.sum(MetricaDiaria.pedidos) > 0)
+    return db.session.execute(consulta.order_by(total.desc()).limit(1)).first()
+
+def _inicio_do_periodo(dia, periodo):
+    if periodo == 'semana':
+        return dia - timedelta(days=dia.weekday())
+    return dia.replace(day=1)
+
+def _periodo_anterior(inicio, periodo):
+    if periodo == 'semana':
+        return inicio - timedelta(days=7)
+    return (inicio - timedelta(days=1)).replace(day=1)
+
+def evolucao(periodo='mes', quantidade=None, hoje=None):
+    """
+    Pedidos criados em cada um dos últimos 'quantidade' períodos ('semana' ou 'mes'),
+    do mais antigo ao atual. Retorna (rótulos, valores).
+    """
+    quantidade = quantidade or PERIODOS_EVOLUCAO[periodo]
+    inicios = [_inicio_do_periodo(hoje or date.today(), periodo)]
+    for _ in range(quantidade - 1):
+        inicios.insert(0, _periodo_anterior(inicios[0], periodo))
+
+    por_dia = db.session.execute(
+        select(MetricaDiaria.dia, func.sum(MetricaDiaria.pedidos))
+        .where(MetricaDiaria.dimensao == 'status', MetricaDiaria.dia >= inicios[0])
+        .group_by(MetricaDiaria.dia)
+    ).all()
+    totais = dict.fromkeys(inicios, 0)
+    for dia, pedidos in por_dia:
+        inicio = _inicio_do_periodo(dia, periodo)
+        if inicio in totais:
+            totais[inicio] += pedidos
+
+    if periodo == 'semana':
+        rotulos = [inicio.strftime('%d/%m') for inicio in inicios]
+    else:
+        rotulos = [f'{MESES[inicio.month - 1]}/{inicio.strftime("%y")}' for inicio in inicios]
+    return rotulos, [totais[inicio] for inicio in inicios]
+
+# ==============================================================================
+# Painel (com cache)
+# ==============================================================================
+_cache = {}
+_cache_lock = threading.Lock()
+# Incrementada a cada invalidação: um painel calculado durante uma invalidação não é guardado
+_geracao = 0
+
+def invalidar_cache():
+    """Descarta o painel em cache deste worker (os demais expiram em METRICAS_CACHE_TTL_SEGUNDOS)."""
+    global _geracao
+    with _cache_lock:
+        _geracao += 1
+        _cache.clear()
+
+def painel(periodo='mes'):
+    """Dados do GET /api/reports, calculados a partir da metrica_diaria e guardados por alguns segundos."""
+    agora = time.monotonic()
+    with _cache_lock:
+        em_cache = _cache.get(periodo)
+        if em_cache and em_cache[0] > agora:
+            return em_cache[1]
+        geracao = _geracao
+
+    hoje = date.today()
+    inicio_mes = hoje.replace(day=1)
+    inicio_proximo_mes = (inicio_mes + timedelta(days=32)).replace(day=1)
+
+    produto = mais_pedidos('produto', medida='quantidade')
+    cliente = mais_pedidos('cliente', medida='pedidos')
+    rotulos, valores = evolucao(periodo, hoje=hoje)
+    dados = {
+        'totalPedidosMes': total_de_pedidos(inicio_mes, inicio_proximo_mes),
+        'produtosMaisPedidos': f"{produto[0]} ({produto[1]})" if produto else 'N/A',
+        'clientesMaisPedidos': f"{cliente[0]} ({cliente[1]} pedidos)" if cliente else 'N/A',
+        'evolucaoSemanalMensal': valores,
+        'evolucaoRotulos': rotulos,
+        'evolucaoPeriodo': periodo,
+    }
+
+    with _cache_lock:
+        if geracao == _geracao:
+            _cache[periodo] = (agora + current_app.config['METRICAS_CACHE_TTL_SEGUNDOS'], dados)
+    return dados
\ No newline at end of file
@@ -0,0 +1,123 @@
+# Arquivo: app/relatorios/planilhas.py
+# Geração de planilhas XLSX com uso de memória constante.
+#
+# O workbook é aberto em modo write_only (as linhas não ficam em memória), gravado
+# em um buffer temporário que só vai para o disco se passar de LIMITE_BUFFER_MEMORIA,
+# e devolvido ao cliente em blocos (resposta chunked).
+
+import tempfile
+from sqlalchemy.orm import load_only
+from app.models import Pedido
+from app.pedidos.filtros import aplicar_filtros
+from app.utils import validar_ids
+
+MIMETYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Tamanho do buffer mantido em memória antes de ir para um arquivo temporário
+LIMITE_BUFFER_MEMORIA = 8 * 1024 * 1024
+# Tamanho de cada bloco enviado na resposta
+TAMANHO_BLOCO = 64 * 1024
+# Quantos pedidos são lidos do banco por vez durante uma exportação
+LOTE_EXPORTACAO = 500
+
+# Colunas da planilha de pedidos: (cabeçalho, função que extrai o valor do pedido)
+COLUNAS_PEDIDOS = [
+    ('ID do Pedido', lambda p: p.id),
+    ('Nome do Cliente', lambda p: p.clienteNome),
+    ('Produto', lambda p: p.tipoPedido),
+    ('Quantidade', lambda p: p.quantidade),
+    ('Sabor', lambda p: p.sabores),
+    ('Tipo Embalagem', lambda p: p.tipoEmbalagem),
+    ('Data Evento', lambda p: p.dataEvento),
+    ('Data de Retirada', lambda p: p.dataRetirada),
+    ('Horário Retirada', lambda p: p.horarioRetirada),
+    ('Status', lambda p: p.status),
+    ('Criado Em', lambda p: p.createdAt.strftime('%Y-%m-%d %H:%M:%S')),
+    ('Observações', lambda p: p.observacoes),
+]
+
+# Colunas do modelo Pedido lidas pela planilha (para o load_only da consulta)
+ATRIBUTOS_PEDIDOS = (
+    'id', 'clienteNome', 'tipoPedido', 'quantidade', 'sabores', 'tipoEmbalagem',
+    'dataEvento', 'dataRetirada', 'horarioRetirada', 'status', 'createdAt', 'observacoes',
+)
+
+# Filtros da exportação por filtros (os mesmos de GET /api/pedidos, ver aplicar_filtros)
+FILTROS_EXPORTACAO = ('cliente', 'status', 'dataEvento', 'dataInicio', 'dataFim', 'tipoProduto')
+
+def validar_exportacao_por_filtros(filtros, excluir_ids):
+    """
+    Confere os tipos de 'filtros' e 'excluir_ids' vindos de um corpo JSON. Retorna os
+    IDs de exclusão como inteiros. Lança ValueError se algum deles for inválido.
+    """
+    if not isinstance(filtros, dict):
+        raise ValueError("'filtros' deve ser um objeto.")
+    for chave in FILTROS_EXPORTACAO:
+        valor = filtros.get(chave)
+        if valor is None or isinstance(valor, str):
+            continue
+        # Só o status aceita uma lista (vários status)
+        if chave == 'status' and isinstance(valor, list) and all(isinstance(item, str) for item in valor):
+            continue
+        raise ValueError(f"Filtro '{chave}' inválido.")
+    return validar_ids(excluir_ids, 'excluir_ids')
+
+def consulta_exportacao(pedido_ids=None, filtros=None, excluir_ids=None):
+    """
+    Monta a consulta dos pedidos a exportar, por lista de IDs ou por filtros
+    (os mesmos de GET /api/pedidos) menos 'excluir_ids'. Os pedidos são lidos em
+    lotes (cursor do lado do servidor no PostgreSQL), só com as colunas da planilha.
+    Lança ValueError se algum filtro ou ID de exclusão for inválido.
+    """
+    query = Pedido.query.options(
+        load_only(*[getattr(Pedido, atributo) for atributo in ATRIBUTOS_PEDIDOS])
+    )
+    if pedido_ids is not None:
+        query = query.filter(Pedido.id.in_(validar_ids(pedido_ids, 'pedido_ids'))).order_by(Pedido.id)
+    else:
+        excluir_ids = validar_exportacao_por_filtros(
+            {} if filtros is None else filtros, [] if excluir_ids is None else excluir_ids
+        )
+        query = aplicar_filtros(query, filtros or {})
+        if excluir_ids:
+            query = query.filter(Pedido.id.notin_(excluir_ids))
+        query = query.order_by(Pedido.dataRetirada, Pedido.id)
+    return query.yield_per(LOTE_EXPORTACAO)
+
+def escrever_planilha(titulo, cabecalho, linhas):
+    """
+    Escreve o cabeçalho e as linhas (qualquer iterável de sequências) em uma planilha
+    write_only. Retorna (buffer posicionado no início, quantidade de linhas escritas).
+    """
+    import openpyxl  # Importado só na primeira planilha (demora a carregar e atrasaria o boot)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=titulo)
+    sheet.append(cabecalho)
+
+    total = 0
+    for linha in linhas:
+        sheet.append(linha)
+        total += 1
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=LIMITE_BUFFER_MEMORIA)
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer, total
+
+def planilha_de_pedidos(titulo, pedidos):
+    """Gera a planilha de pedidos a partir de um iterável de objetos Pedido."""
+    cabecalho = [nome for nome, _ in COLUNAS_PEDIDOS]
+    linhas = ([extrair(p) for _, extrair in COLUNAS_PEDIDOS] for p in pedidos)
+    return escrever_planilha(titulo, cabecalho, linhas)
+
+def ler_em_blocos(buffer):
+    """Gerador que entrega o conteúdo do buffer em blocos e o fecha ao final."""
+    try:
+        while True:
+            bloco = buffer.read(TAMANHO_BLOCO)
+            if not bloco:
+                break
+            yield bloco
+    finally:
+        buffer.close()
@@ -0,0 +1,127 @@
+# Arquivo: app/relatorios/producao.py
+# Agenda de produção (GET /api/reports/producao).
+#
+# Para a cozinha: os pedidos de um status (por padrão 'confirmado') com retirada em um
+# período, agrupados por data e horário de retirada, com a quantidade somada de cada
+# produto contratado (tabela pedido_item; pedidos sem itens entram pelo tipoPedido e a
+# quantidade do pedido). O agrupamento é feito em uma única consulta: os pedidos saem
+# do índice ix_pedido_producao e os itens do ix_pedido_item_pedido_id_produto.
+# O resultado fica em cache por worker até que um pedido com retirada no período seja
+# alterado (registrar_alteracoes, em app/relatorios/metricas.py, avisa este módulo);
+# nos demais workers, vale no máximo PRODUCAO_CACHE_TTL_SEGUNDOS.
+
+import time
+import threading
+from flask import current_app
+from sqlalchemy import func, select
+from app import db
+from app.models import Pedido, PedidoItem
+from app.utils import normalizar_data
+from app.relatorios.planilhas import escrever_planilha
+
+STATUS_PADRAO = 'confirmado'
+
+# Maior período aceito em uma consulta
+MAX_DIAS_PRODUCAO = 366
+
+CABECALHO_PLANILHA = ['Data de Retirada', 'Horário Retirada', 'Produto', 'Quantidade', 'Pedidos com o Produto']
+
+def periodo_da_agenda(inicio, fim):
+    """Valida o período (datas em qualquer formato conhecido). Retorna (inicio, fim) ou lança ValueError."""
+    inicio, fim = normalizar_data(inicio), normalizar_data(fim)
+    if not inicio or not fim:
+        raise ValueError("Informe o período: 'inicio' e 'fim'.")
+    if fim < inicio:
+        raise ValueError("A data 'fim' deve ser igual ou posterior a 'inicio'.")
+    if (fim - inicio).days >= MAX_DIAS_PRODUCAO:
+        raise ValueError(f'O período deve ter no máximo {MAX_DIAS_PRODUCAO} dias.')
+    return inicio, fim
+
+def linhas_da_agenda(inicio, fim, status=STATUS_PADRAO):
+    """
+    (data, horário, produto, quantidade, pedidos) em ordem de data, horário e produto.
+    O produto e a quantidade vêm dos itens do pedido; sem itens, do tipoPedido e da quantidade do pedido.
+    """
+    produto = func.coalesce(PedidoItem.produto, Pedido.tipoPedido)
+    return db.session.execute(
+        select(
+            Pedido.dataRetirada, Pedido.horarioRetirada, produto,
+            func.sum(func.coalesce(PedidoItem.quantidade, Pedido.quantidade)), func.count(Pedido.id.distinct()),
+        )
+        .outerjoin(PedidoItem, PedidoItem.pedido_id == Pedido.id)
+        .where(Pedido.status == status, Pedido.dataRetirada >= inicio, Pedido.dataRetirada <= fim)
+        .group_by(Pedido.dataRetirada, Pedido.horarioRetirada, produto)
+        .order_by(Pedido.dataRetirada, Pedido.horarioRetirada, produto)
+    ).all()
+
+def _montar_agenda(linhas):
+    """Organiza as linhas por dia e horário, com os totais de cada produto no dia."""
+    dias = []
+    for data, horario, produto, quantidade, pedidos in linhas:
+        if not dias or dias[-1]['data'] != data.isoformat():
+            dias.append({'data': data.isoformat(), 'horarios': [], 'totais': {}})
+        dia = dias[-1]
+        horario = horario.strftime('%H:%M')
+        if not dia['horarios'] or dia['horarios'][-1]['horario'] != horario:
+            dia['horarios'].append({'horario': horario, 'produtos': []})
+        quantidade = int(quantidade or 0)
+        dia['horarios'][-1]['produtos'].append({'produto': produto, 'quantidade': quantidade, 'pedidos': pedidos})
+        dia['totais'][produto] = dia['totais'].get(produto, 0) + quantidade
+    return dias
+
+# ==============================================================================
+# Cache
+# ==============================================================================
+_cache = {}  # (inicio, fim, status) -> (expira_em, agenda)
+_cache_lock = threading.Lock()
+# Incrementada a cada invalidação: uma agenda calculada durante uma invalidação (que pode
+# ter lido o estado anterior ao commit) não é guardada
+_geracao = 0
+
+def invalidar_cache(datas=None):
+    """
+    Descarta as agendas em cache cujo período contém alguma das datas de retirada
+    (todas, se 'datas' for None ou tiver uma data desconhecida). Chamada depois do
+    commit da alteração (ver registrar_alteracoes em app/relatorios/metricas.py).
+    """
+    global _geracao
+    datas = None if datas is None else set(datas)
+    with _cache_lock:
+        _geracao += 1
+        if datas is None or None in datas:
+            _cache.clear()
+            return
+        for chave in [chave for chave in _cache if any(chave[0] <= data <= chave[1] for data in datas)]:
+            del _cache[chave]
+
+def agenda_de_producao(inicio, fim, status=STATUS_PADRAO):
+    """Agenda do período em cache (ver o cabeçalho do módulo). Lança ValueError se o período for inválido."""
+    inicio, fim = periodo_da_agenda(inicio, fim)
+    chave = (inicio, fim, status)
+    agora = time.monotonic()
+    with _cache_lock:
+        em_cache = _cache.get(chave)
+        if em_cache and em_cache[0] > agora:
+            return em_cache[1]
+        geracao = _geracao
+
+    agenda = {
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'status': status,
+        'dias': _montar_agenda(linhas_da_agenda(inicio, fim, status)),
+    }
+    with _cache_lock:
+        if geracao == _geracao:
+            _cache[chave] = (agora + current_app.config['PRODUCAO_CACHE_TTL_SEGUNDOS'], agenda)
+    return agenda
+
+def planilha_de_producao(agenda):
+    """Planilha da agenda (uma linha por data, horário e produto). Retorna (buffer, linhas)."""
+    linhas = (
+        [dia['data'], horario['horario'], produto['produto'], produto['quantidade'], produto['pedidos']]
+        for dia in agenda['dias']
+        for horario in dia['horarios']
+        for produto in horario['produtos']
+    )
+    return escrever_planilha('Produção', CABECALHO_PLANILHA, linhas)
\ No newline at end of file
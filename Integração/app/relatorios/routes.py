@@ -1,165 +1,208 @@
 # Arquivo: app/relatorios/routes.py
 
-import os
-import openpyxl
-import json
-from flask import Blueprint, request, jsonify, send_file, current_app, after_this_request
+import io
+from flask import Blueprint, Response, request, jsonify, send_file
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import select
 from app import db
-from app.models import Pedido, User
-from app.Extractor import gerar_relatorio_entrega
+from app.models import Pedido
+from app.pedidos.versoes import nao_modificado, com_etag, resposta_304
+from app.auth.sessao import usuario_obrigatorio
+from app.replica import leitura_na_replica
+from app.relatorios.comprovantes import (
+    etag_do_comprovante, comprovante_do_pedido, nome_do_comprovante, consulta_comprovantes,
+    gerar_lote_comprovantes, MIMETYPE_DOCX
+)
+from app.relatorios.metricas import painel, PERIODOS_EVOLUCAO
+from app.pedidos.itens import totais_por_produto
+from app.relatorios.producao import agenda_de_producao, planilha_de_producao, STATUS_PADRAO
+from app.relatorios.planilhas import consulta_exportacao, planilha_de_pedidos, ler_em_blocos, MIMETYPE_XLSX
 
 # ESTA É A LINHA QUE ESTAVA FALTANDO
 relatorios_bp = Blueprint('relatorios', __name__, url_prefix='/api/reports')
 
+def resposta_em_blocos(buffer, nome_arquivo, mimetype):
+    """Envia o buffer como anexo em blocos (Transfer-Encoding: chunked), sem passar pelo disco."""
+    return Response(
+        ler_em_blocos(buffer),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{nome_arquivo}"'}
+    )
+
 @relatorios_bp.route('/export-selected-pedidos', methods=['POST'])
+@usuario_obrigatorio
+@leitura_na_replica
 def export_selected_pedidos():
-    user_email = request.headers.get('X-User-Id')
-    if not user_email:
-        return jsonify({'message': 'Usuário não autenticado.'}), 401
-
     data = request.json
     selected_pedido_ids = data.get('pedido_ids', [])
 
     if not selected_pedido_ids:
         return jsonify({'message': 'Nenhum ID de pedido selecionado para exportação.'}), 400
 
-    pedidos_para_exportar = Pedido.query.filter(
-        Pedido.id.in_(selected_pedido_ids)
-    ).all()
+    try:
+        pedidos_para_exportar = consulta_exportacao(pedido_ids=selected_pedido_ids)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
 
-    if not pedidos_para_exportar:
-        return jsonify({'message': 'Nenhum pedido encontrado com os IDs fornecidos.'}), 404
+    try:
+        buffer, total = planilha_de_pedidos("Pedidos Selecionados", pedidos_para_exportar)
+    except Exception as e:
+        return jsonify({'message': f"Erro ao gerar a planilha: {e}"}), 500
 
-    excel_data_list = []
-    for p in pedidos_para_exportar:
-        excel_data_list.append({
-            'ID do Pedido': p.id,
-            'Nome do Cliente': p.clienteNome,
-            'Produto': p.tipoPedido,
-            'Quantidade': p.quantidade,
-            'Sabor': p.sabores,
-            'Tipo Embalagem': p.tipoEmbalagem,
-            'Data Evento': p.dataEvento,
-            'Data de Retirada': p.dataRetirada,
-            'Horário Retirada': p.horarioRetirada,
-            'Status': p.status,
-            'Criado Em': p.createdAt.strftime('%Y-%m-%d %H:%M:%S'),
-            'Observações': p.observacoes
-        })
-
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = "Pedidos Selecionados"
-    
-    if not excel_data_list:
-        return jsonify({'message': 'Nenhum dado para exportar.'}), 404
-
-    headers = list(excel_data_list[0].keys())
-    sheet.append(headers)
-
-    for item in excel_data_list:
-        sheet.append(list(item.values()))
+    if not total:
+        buffer.close()
+        return jsonify({'message': 'Nenhum pedido encontrado com os IDs fornecidos.'}), 404
 
     export_date = datetime.now().strftime('%Y%m%d_%H%M%S')
     excel_filename = f"pedidos_selecionados_{export_date}.xlsx"
-    temp_filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], excel_filename)
+    return resposta_em_blocos(buffer, excel_filename, MIMETYPE_XLSX)
+
+@relatorios_bp.route('/export-pedidos', methods=['POST'])
+@usuario_obrigatorio
+@leitura_na_replica
+def export_pedidos_por_filtro():
+    """
+    Exporta todos os pedidos que atendem aos filtros (os mesmos de GET /api/pedidos),
+    menos os IDs em 'excluir_ids'. Evita que o cliente envie a lista completa de IDs.
+    """
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'message': 'O corpo da requisição deve ser um objeto JSON.'}), 400
 
     try:
-        workbook.save(filename=temp_filepath)
-        @after_this_request
-        def remove_file(response):
-            try:
-                os.remove(temp_filepath)
-            except Exception as e:
-                print(f"Erro ao remover arquivo temporário: {e}")
-            return response
-
-        return send_file(
-            temp_filepath,
-            as_attachment=True,
-            download_name=excel_filename,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        # Valida os tipos de 'filtros' e 'excluir_ids' (ValueError -> 400)
+        pedidos_para_exportar = consulta_exportacao(
+            filtros=data.get('filtros', {}), excluir_ids=data.get('excluir_ids', [])
         )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    try:
+        buffer, total = planilha_de_pedidos("Pedidos", pedidos_para_exportar)
     except Exception as e:
         return jsonify({'message': f"Erro ao gerar a planilha: {e}"}), 500
 
+    if not total:
+        buffer.close()
+        return jsonify({'message': 'Nenhum pedido encontrado para os filtros.'}), 404
+
+    export_date = datetime.now().strftime('%Y%m%d_%H%M%S')
+    excel_filename = f"pedidos_{export_date}.xlsx"
+    return resposta_em_blocos(buffer, excel_filename, MIMETYPE_XLSX)
+
 @relatorios_bp.route('', methods=['GET'])
+@usuario_obrigatorio
+@leitura_na_replica
 def get_relatorios():
-    user_email = request.headers.get('X-User-Id')
-    if not user_email:
-        return jsonify({'message': 'Usuário não autenticado.'}), 401
-
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    
-    pedidos_mes = db.session.query(func.count(Pedido.id)).filter(
-        func.extract('month', Pedido.createdAt) == current_month,
-        func.extract('year', Pedido.createdAt) == current_year
-    ).scalar()
-
-    produtos_query = db.session.query(
-        Pedido.tipoPedido, func.sum(Pedido.quantidade)
-    ).group_by(Pedido.tipoPedido).order_by(
-        func.sum(Pedido.quantidade).desc()
-    ).first()
-    produtos_mais_pedidos = f"{produtos_query[0]} ({produtos_query[1]})" if produtos_query else 'N/A'
-
-    clientes_query = db.session.query(
-        Pedido.clienteNome, func.count(Pedido.id)
-    ).group_by(Pedido.clienteNome).order_by(
-        func.count(Pedido.id).desc()
-    ).first()
-    clientes_mais_pedidos = f"{clientes_query[0]} ({clientes_query[1]} pedidos)" if clientes_query else 'N/A'
-
-    return jsonify({
-        'totalPedidosMes': pedidos_mes or 0,
-        'produtosMaisPedidos': produtos_mais_pedidos,
-        'clientesMaisPedidos': clientes_mais_pedidos,
-        'evolucaoSemanalMensal': [60, 80, 40, 90, 70]
-    }), 200
+    """Indicadores do painel, lidos da tabela de métricas diárias. ?periodo=semana|mes (padrão: mes)."""
+    periodo = request.args.get('periodo', 'mes')
+    if periodo not in PERIODOS_EVOLUCAO:
+        return jsonify({'message': "Período inválido. Use 'semana' ou 'mes'."}), 400
+    return jsonify(painel(periodo)), 200
+
+@relatorios_bp.route('/produtos', methods=['GET'])
+@usuario_obrigatorio
+@leitura_na_replica
+def get_totais_por_produto():
+    """
+    Quantidade, valor e número de pedidos de cada produto contratado, somados no banco
+    a partir da tabela pedido_item. Filtros: ?inicio=&fim= (data de retirada) e ?status=.
+    """
+    try:
+        totais = totais_por_produto(request.args.get('inicio'), request.args.get('fim'), request.args.get('status'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify([{
+        'produto': total.produto,
+        'quantidade': int(total.quantidade or 0),
+        'valorTotal': float(total.valorTotal or 0),
+        'pedidos': total.pedidos,
+    } for total in totais]), 200
+
+@relatorios_bp.route('/producao', methods=['GET'])
+@usuario_obrigatorio
+@leitura_na_replica
+def get_agenda_de_producao():
+    """
+    Agenda de produção: pedidos com retirada entre ?inicio= e ?fim=, por data e horário,
+    com a quantidade de cada produto. ?status= (padrão: confirmado); ?formato=xlsx baixa a planilha.
+    """
+    formato = request.args.get('formato', 'json')
+    if formato not in ('json', 'xlsx'):
+        return jsonify({'message': "Formato inválido. Use 'json' ou 'xlsx'."}), 400
+    try:
+        agenda = agenda_de_producao(
+            request.args.get('inicio'), request.args.get('fim'), request.args.get('status', STATUS_PADRAO)
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    if formato == 'json':
+        return jsonify(agenda), 200
+
+    try:
+        buffer, _ = planilha_de_producao(agenda)
+    except Exception as e:
+        return jsonify({'message': f"Erro ao gerar a planilha: {e}"}), 500
+    return resposta_em_blocos(buffer, f"producao_{agenda['inicio']}_{agenda['fim']}.xlsx", MIMETYPE_XLSX)
 
 @relatorios_bp.route('/generate-delivery-report/<int:pedido_id>', methods=['GET'])
+@usuario_obrigatorio
+@leitura_na_replica
 def generate_delivery_report(pedido_id):
-    user_email = request.headers.get('X-User-Id')
-    if not user_email:
-        return jsonify({'message': 'Usuário não autenticado.'}), 401
+    # ETag pela versão do pedido e data de emissão: com ela igual, o comprovante nem é lido do cache
+    versao = db.session.scalar(select(Pedido.versao).where(Pedido.id == pedido_id))
+    if versao is None:
+        return jsonify({'message': 'Pedido não encontrado.'}), 404
+    etag = etag_do_comprovante(pedido_id, versao)
+    if nao_modificado(etag):
+        return resposta_304(etag)
 
     pedido = Pedido.query.get(pedido_id)
     if not pedido:
         return jsonify({'message': 'Pedido não encontrado.'}), 404
+    report_filename = nome_do_comprovante(pedido_id)
 
-    dados_para_relatorio = {
-        'Contratante': {'Nome': pedido.clienteNome, 'RG': pedido.clienteRG, 'CPF': pedido.clienteCPF},
-        'Contratado': {'Nome Empresa': pedido.nomeContratado, 'CNPJ': pedido.cnpjContratado},
-        'Data do Evento': pedido.dataEvento,
-        'Local do Evento': pedido.localEvento,
-        'Valor Total do Pedido': pedido.valorTotalPedidoContrato,
-        'Data de Pagamento': pedido.dataPagamentoContrato,
-        'Produtos Contratados': json.loads(pedido.produtosContratadosJson or '[]'),
-        'Observacoes': pedido.observacoes
-    }
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    report_filename = f"comprovante_retirada_{pedido_id}_{timestamp}.docx"
-    temp_filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], report_filename)
+    try:
+        conteudo = comprovante_do_pedido(pedido)
+    except Exception as e:
+        return jsonify({'message': f"Erro ao gerar o comprovante: {str(e)}"}), 500
+
+    resposta = send_file(
+        io.BytesIO(conteudo),
+        as_attachment=True,
+        download_name=report_filename,
+        mimetype=MIMETYPE_DOCX
+    )
+    return com_etag(resposta, etag_do_comprovante(pedido.id, pedido.versao))
+
+@relatorios_bp.route('/delivery-reports', methods=['POST'])
+@usuario_obrigatorio
+@leitura_na_replica
+def generate_delivery_reports_batch():
+    """
+    Gera os comprovantes de retirada de vários pedidos em uma única requisição.
+    Corpo: {'pedido_ids': [...]} ou {'dataRetirada': 'YYYY-MM-DD'}, e
+    'formato': 'zip' (um .docx por pedido, padrão) ou 'docx' (um documento único).
+    """
+    data = request.json or {}
+    try:
+        pedidos = consulta_comprovantes(
+            pedido_ids=data.get('pedido_ids'),
+            data_retirada=data.get('dataRetirada')
+        ).all()
+    except (ValueError, TypeError) as e:
+        return jsonify({'message': str(e)}), 400
+
+    if not pedidos:
+        return jsonify({'message': 'Nenhum pedido encontrado para gerar comprovantes.'}), 404
 
     try:
-        gerar_relatorio_entrega(dados_para_relatorio, nome_arquivo=temp_filepath)
-        @after_this_request
-        def remove_file(response):
-            try:
-                os.remove(temp_filepath)
-            except Exception as e:
-                print(f"Erro ao remover arquivo temporário: {e}")
-            return response
-        
-        return send_file(
-            temp_filepath,
-            as_attachment=True,
-            download_name=report_filename,
-            mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
+        buffer, _, nome_arquivo, mimetype = gerar_lote_comprovantes(pedidos, data.get('formato', 'zip'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
-        return jsonify({'message': f"Erro ao gerar o comprovante: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({'message': f"Erro ao gerar os comprovantes: {str(e)}"}), 500
+
+    return resposta_em_blocos(buffer, nome_arquivo, mimetype)
\ No newline at end of file
@@ -0,0 +1,53 @@
+# Arquivo: app/replica.py
+# Réplica somente leitura do banco (bind 'leitura', configurado por DATABASE_REPLICA_URL).
+#
+# Relatórios, exportações e a listagem de pedidos só leem, e as agregações pesadas
+# (principalmente no fechamento do mês) disputavam as conexões do primário com o
+# cadastro de pedidos. Nas rotas marcadas com leitura_na_replica (e nas tarefas de
+# exportação), os SELECTs da sessão vão para a réplica; o flush do ORM, os
+# INSERT/UPDATE/DELETE e os comandos em texto continuam no primário. Sem
+# DATABASE_REPLICA_URL configurada, tudo vai para o primário.
+# A réplica pode ficar alguns instantes atrás do primário, então os detalhes de um
+# pedido, as gravações e o stream de alterações continuam lendo do primário.
+
+from contextlib import contextmanager
+from functools import wraps
+from flask_sqlalchemy.session import Session
+
+BIND_LEITURA = 'leitura'
+
+_CHAVE = 'consultas_na_replica'
+
+class SessaoComReplica(Session):
+    """Sessão do Flask-SQLAlchemy que envia os SELECTs para a réplica quando a sessão está marcada."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(_CHAVE) and not self._flushing and getattr(clause, 'is_select', False):
+            replica = self._db.engines.get(BIND_LEITURA)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def usar_replica(ativa=True):
+    """Liga (ou desliga) o envio dos SELECTs da sessão atual para a réplica."""
+    from app import db
+    db.session.info[_CHAVE] = ativa
+
+@contextmanager
+def consultas_na_replica():
+    """Bloco em que os SELECTs da sessão atual vão para a réplica (ex: tarefas em segundo plano)."""
+    from app import db
+    anterior = db.session.info.get(_CHAVE, False)
+    usar_replica()
+    try:
+        yield
+    finally:
+        usar_replica(anterior)
+
+def leitura_na_replica(view):
+    """Decorador de rota: as consultas da requisição vão para a réplica."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with consultas_na_replica():
+            return view(*args, **kwargs)
+    return wrapper
\ No newline at end of file
@@ -0,0 +1,48 @@
+# Arquivo: app/serializacao.py
+# JSON das respostas da API (jsonify) e dos corpos recebidos (request.get_json).
+#
+# Com o orjson instalado (e JSON_RAPIDO ligado), o Flask passa a usar o
+# OrjsonProvider, que codifica direto para bytes e é bem mais rápido que o módulo
+# json da biblioteca padrão nas listagens grandes. Sem ele, continua o provider
+# padrão do Flask. Datas, Decimal e demais tipos que o orjson não trata do mesmo
+# jeito passam pelo 'default' do provider padrão, então o conteúdo das respostas
+# não muda; só as chaves deixam de sair em ordem alfabética.
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from flask.json.provider import DefaultJSONProvider
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Provider de JSON do Flask baseado no orjson."""
+
+    sort_keys = False
+
+    def _opcoes(self, indentar=False):
+        opcoes = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indentar:
+            opcoes |= orjson.OPT_INDENT_2
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        return opcoes
+
+    def _codificar(self, obj, indentar=False):
+        return orjson.dumps(obj, default=self.default, option=self._opcoes(indentar))
+
+    def dumps(self, obj, **kwargs):
+        return self._codificar(obj, indentar=bool(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indentar = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._codificar(obj, indentar) + b'\n', mimetype=self.mimetype)
+
+def configurar_json(app):
+    """Usa o OrjsonProvider na aplicação, se o orjson estiver instalado e JSON_RAPIDO ligado."""
+    if orjson is not None and app.config['JSON_RAPIDO']:
+        app.json = OrjsonProvider(app)
\ No newline at end of file
@@ -7,7 +7,15 @@ document.addEventListener('DOMContentLoaded', function() {
         const noPedidosExportMessage = document.getElementById('no-pedidos-export-message');
         const selectAllCheckbox = document.getElementById('select-all-pedidos');
         const generateSelectedPlanilhaBtn = document.getElementById('generate-selected-planilha-btn');
+        const generateProducaoPlanilhaBtn = document.getElementById('generate-producao-planilha-btn');
         const exportMessage = document.getElementById('export-message');
+        const loadMoreExportBtn = document.getElementById('load-more-export-btn');
+
+        // Campos usados pela tabela de exportação e filtros da última busca (para a paginação)
+        const CAMPOS_EXPORTACAO = 'id,clienteNome,dataRetirada,tipoPedido,quantidade,status';
+        let currentFilters = {};
+        // Filtros efetivamente enviados à API (com o status padrão aplicado), usados na exportação por filtro
+        let appliedFilters = {};
 
         // --- Funções Auxiliares ---
 
@@ -25,10 +33,15 @@ document.addEventListener('DOMContentLoaded', function() {
         }
 
         // Função para carregar e exibir os pedidos na tabela de exportação
-        async function loadPedidosForExport(filters = {}) {
-            pedidosExportTableBody.innerHTML = ''; // Limpa a tabela
+        // Com cursor, acrescenta a próxima página mantendo os filtros atuais.
+        async function loadPedidosForExport(filters = {}, cursor = null) {
+            if (!cursor) {
+                pedidosExportTableBody.innerHTML = ''; // Limpa a tabela
+                selectAllCheckbox.checked = false; // Desmarca o "selecionar todos"
+                currentFilters = { ...filters };
+            }
             noPedidosExportMessage.classList.add('hidden'); // Esconde a mensagem
-            selectAllCheckbox.checked = false; // Desmarca o "selecionar todos"
+            loadMoreExportBtn.classList.add('hidden');
 
             const userId = localStorage.getItem('userId');
             if (!userId) {
@@ -55,39 +68,48 @@ document.addEventListener('DOMContentLoaded', function() {
                 }
 
 
-                const queryParams = new URLSearchParams(mergedFilters).toString();
-                const response = await fetch(`/api/pedidos?${queryParams}`, { // Usa a API de listagem de pedidos
+                appliedFilters = { ...mergedFilters };
+                const queryParams = new URLSearchParams({ ...mergedFilters, fields: CAMPOS_EXPORTACAO });
+                if (cursor) {
+                    queryParams.set('cursor', cursor);
+                }
+                const response = await fetch(`/api/pedidos?${queryParams.toString()}`, { // Usa a API de listagem de pedidos
                     method: 'GET',
-                    headers: { 'X-User-Id': userId }
+                    headers: authHeaders()
                 });
 
                 const pedidos = await response.json();
 
+                // O cursor da próxima página vem no cabeçalho da resposta
+                const nextCursor = response.headers.get('X-Next-Cursor');
+                if (nextCursor) {
+                    loadMoreExportBtn.dataset.cursor = nextCursor;
+                    loadMoreExportBtn.classList.remove('hidden');
+                }
+
                 if (pedidos.length > 0) {
                     pedidos.forEach(pedido => {
                         const row = document.createElement('tr');
                         row.className = 'table-row';
-                        
-                        let statusClass = '';
-                        if (pedido.status === 'confirmado') statusClass = 'status-confirmado';
-                        else if (pedido.status === 'pendente') statusClass = 'status-pendente';
-                        else if (pedido.status === 'producao') statusClass = 'status-producao'; // Manter se você adicionar este status
+                        row.dataset.pedidoId = pedido.id;
+
+                        const statusClass = classeDoStatus(pedido.status);
 
                         row.innerHTML = `
                             <td class="px-6 py-4 whitespace-nowrap">
-                                <input type="checkbox" class="pedido-checkbox form-checkbox h-4 w-4 text-blue-600 transition duration-150 ease-in-out" data-pedido-id="${pedido.id}">
+                                <input type="checkbox" class="pedido-checkbox form-checkbox h-4 w-4 text-blue-600 transition duration-150 ease-in-out" data-pedido-id="${pedido.id}" ${selectAllCheckbox.checked ? 'checked' : ''}>
                             </td>
-                            <td class="px-6 py-4 whitespace-nowrap">${pedido.clienteNome}</td>
-                            <td class="px-6 py-4 whitespace-nowrap">${pedido.dataRetirada}</td>
-                            <td class="px-6 py-4 whitespace-nowrap">${pedido.tipoPedido}</td>
-                            <td class="px-6 py-4 whitespace-nowrap">${pedido.quantidade}</td>
+                            <td class="px-6 py-4 whitespace-nowrap" data-campo="clienteNome">${pedido.clienteNome}</td>
+                            <td class="px-6 py-4 whitespace-nowrap" data-campo="dataRetirada">${pedido.dataRetirada}</td>
+                            <td class="px-6 py-4 whitespace-nowrap" data-campo="tipoPedido">${pedido.tipoPedido}</td>
+                            <td class="px-6 py-4 whitespace-nowrap" data-campo="quantidade">${pedido.quantidade}</td>
                             <td class="px-6 py-4 whitespace-nowrap">
-                                <span class="${statusClass}">${pedido.status}</span>
+                                <span class="${statusClass}" data-campo="status">${pedido.status}</span>
                             </td>
                         `;
                         pedidosExportTableBody.appendChild(row);
                     });
-                } else {
+                } else if (!cursor) {
                     noPedidosExportMessage.innerText = 'Nenhum pedido encontrado para os filtros.';
                     noPedidosExportMessage.classList.remove('hidden');
                 }
@@ -99,12 +121,72 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         }
 
+        // Dispara o download de um arquivo recebido como blob
+        function downloadBlob(blob, filename) {
+            const url = window.URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.style.display = 'none';
+            a.href = url;
+            a.download = filename;
+            document.body.appendChild(a);
+            a.click();
+            window.URL.revokeObjectURL(url);
+        }
+
+        // Enfileira a exportação em /api/jobs, acompanha o status e baixa o resultado ao concluir
+        async function exportViaJob(parametros, userId) {
+            const submitResponse = await fetch('/api/jobs', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    ...authHeaders()
+                },
+                body: JSON.stringify({ tipo: 'exportacao_pedidos', parametros })
+            });
+            const submitData = await submitResponse.json();
+            if (!submitResponse.ok) {
+                showExportMessage(submitData.message || 'Erro ao enfileirar a exportação.', false);
+                return;
+            }
+
+            showExportMessage('Exportação enfileirada. Você pode continuar usando o sistema; o download começa quando a planilha estiver pronta.', true);
+            const tarefaId = submitData.tarefa.id;
+
+            while (true) {
+                await new Promise(resolve => setTimeout(resolve, 1500));
+                const statusResponse = await fetch(`/api/jobs/${tarefaId}`, { headers: authHeaders() });
+                const tarefa = await statusResponse.json();
+                if (!statusResponse.ok || tarefa.status === 'erro') {
+                    showExportMessage(tarefa.mensagemErro || tarefa.message || 'Erro ao gerar a planilha.', false);
+                    return;
+                }
+                if (tarefa.status === 'concluida') {
+                    const downloadResponse = await fetch(`/api/jobs/${tarefaId}/download`, { headers: authHeaders() });
+                    if (!downloadResponse.ok) {
+                        showExportMessage('Não foi possível baixar a planilha gerada.', false);
+                        return;
+                    }
+                    downloadBlob(await downloadResponse.blob(), tarefa.nomeArquivo);
+                    showExportMessage('Planilha gerada com sucesso! O download deve ter sido iniciado.', true);
+                    return;
+                }
+            }
+        }
+
         // --- Event Listeners ---
 
         // Carrega pedidos ao carregar a página (sem filtros iniciais)
         window.addEventListener('load', () => {
             if (window.location.pathname === '/exportar') {
                 loadPedidosForExport(); // Carrega todos os pedidos inicialmente
+
+                // Alterações feitas enquanto a página está aberta: atualiza ou remove a linha
+                // sem recarregar a tabela, para não perder os pedidos selecionados
+                assinarEventosPedidos(evento => {
+                    if (evento.tipo === 'alterado' || evento.tipo === 'excluido') {
+                        aplicarEventoNaTabela(pedidosExportTableBody, evento);
+                    }
+                });
             }
         });
 
@@ -116,6 +198,11 @@ document.addEventListener('DOMContentLoaded', function() {
             loadPedidosForExport(filters);
         });
 
+        // Carrega a próxima página com os mesmos filtros
+        loadMoreExportBtn.addEventListener('click', function() {
+            loadPedidosForExport({ ...currentFilters }, loadMoreExportBtn.dataset.cursor);
+        });
+
         // Lógica do checkbox "Selecionar Todos"
         selectAllCheckbox.addEventListener('change', function() {
             const checkboxes = document.querySelectorAll('.pedido-checkbox');
@@ -124,14 +211,48 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         });
 
+        // Agenda de produção do período de retirada (pedidos confirmados somados por dia, horário e produto, no servidor)
+        generateProducaoPlanilhaBtn.addEventListener('click', async function() {
+            const inicio = document.getElementById('filter-data-inicio').value;
+            const fim = document.getElementById('filter-data-fim').value;
+            if (!inicio || !fim) {
+                showExportMessage('Informe a data de retirada de início e de fim para gerar a agenda de produção.', false);
+                return;
+            }
+
+            try {
+                const queryParams = new URLSearchParams({ inicio, fim, formato: 'xlsx' });
+                const response = await fetch(`/api/reports/producao?${queryParams.toString()}`, { headers: authHeaders() });
+                if (response.ok) {
+                    downloadBlob(await response.blob(), `producao_${inicio}_${fim}.xlsx`);
+                    showExportMessage('Agenda de produção gerada com sucesso! O download deve ter sido iniciado.', true);
+                } else {
+                    const errorData = await response.json();
+                    showExportMessage(errorData.message || 'Erro ao gerar a agenda de produção.', false);
+                }
+            } catch (error) {
+                console.error('Erro de conexão ao gerar a agenda de produção:', error);
+                showExportMessage('Erro de conexão com o servidor. Tente novamente.', false);
+            }
+        });
+
         // Lógica para o botão "Gerar Planilha dos Selecionados"
         generateSelectedPlanilhaBtn.addEventListener('click', async function() {
             const selectedPedidoIds = [];
-            document.querySelectorAll('.pedido-checkbox:checked').forEach(checkbox => {
-                selectedPedidoIds.push(checkbox.dataset.pedidoId);
+            const unselectedPedidoIds = [];
+            document.querySelectorAll('.pedido-checkbox').forEach(checkbox => {
+                if (checkbox.checked) {
+                    selectedPedidoIds.push(checkbox.dataset.pedidoId);
+                } else {
+                    unselectedPedidoIds.push(checkbox.dataset.pedidoId);
+                }
             });
 
-            if (selectedPedidoIds.length === 0) {
+            // Com "Selecionar Todos" marcado, exporta tudo o que atende aos filtros
+            // (inclusive páginas ainda não carregadas), enviando só os IDs desmarcados.
+            const exportByFilter = selectAllCheckbox.checked;
+
+            if (!exportByFilter && selectedPedidoIds.length === 0) {
                 showExportMessage('Por favor, selecione pelo menos um pedido para exportar.', false);
                 return;
             }
@@ -143,26 +264,24 @@ document.addEventListener('DOMContentLoaded', function() {
             }
 
             try {
-                const response = await fetch('/api/reports/export-selected-pedidos', { // Nova rota POST
+                if (exportByFilter) {
+                    // Exportações grandes vão para a fila de tarefas; a página continua livre enquanto isso
+                    await exportViaJob({ filtros: appliedFilters, excluir_ids: unselectedPedidoIds }, userId);
+                    return;
+                }
+
+                const response = await fetch('/api/reports/export-selected-pedidos', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
-                        'X-User-Id': userId
+                        ...authHeaders()
                     },
                     body: JSON.stringify({ pedido_ids: selectedPedidoIds })
                 });
 
                 if (response.ok) {
                     const blob = await response.blob();
-                    const url = window.URL.createObjectURL(blob);
-                    const a = document.createElement('a');
-                    a.style.display = 'none';
-                    a.href = url;
-                    a.download = `planilha_producao_selecionados_${new Date().toISOString().slice(0,10)}.xlsx`;
-                    document.body.appendChild(a);
-                    a.click();
-                    window.URL.revokeObjectURL(url);
-                    
+                    downloadBlob(blob, `planilha_producao_selecionados_${new Date().toISOString().slice(0,10)}.xlsx`);
                     showExportMessage('Planilha gerada com sucesso! O download deve ter sido iniciado.', true);
                 } else {
                     const errorData = await response.json();
@@ -17,6 +17,139 @@ function closeModal() {
     messageModal.style.display = 'none';
 }
 
+// --- Sessão ---
+// Cabeçalhos que identificam o usuário nas chamadas à API: o token emitido no login
+// ou, para sessões abertas antes do token existir, o e-mail no X-User-Id.
+function authHeaders() {
+    const token = localStorage.getItem('authToken');
+    if (token) {
+        return { 'Authorization': `Bearer ${token}` };
+    }
+    return { 'X-User-Id': localStorage.getItem('userId') };
+}
+
+function encerrarSessao() {
+    localStorage.removeItem('userId');
+    localStorage.removeItem('authToken');
+}
+
+// --- Alterações de pedidos em tempo real ---
+// Assina GET /api/pedidos/stream (server-sent events) e chama aoReceber(evento) para cada
+// alteração: { tipo: 'criado' | 'alterado' | 'excluido' | 'recarregar', id, versao, pedido }.
+// O EventSource do navegador não envia o cabeçalho Authorization, então o stream é lido
+// com fetch. Quando a conexão cai (ou o servidor a encerra), reconecta enviando o
+// Last-Event-ID, e o servidor reenvia o que foi perdido nesse intervalo. Se o servidor
+// está com muitos streams abertos (503/429), espera o Retry-After e dobra a espera a
+// cada nova recusa (até ESPERA_MAXIMA_STREAM_MS), com um acréscimo aleatório para as
+// abas não voltarem todas juntas.
+const ESPERA_MAXIMA_STREAM_MS = 5 * 60 * 1000;
+
+function assinarEventosPedidos(aoReceber) {
+    let ultimoId = null;
+    let esperaMs = 3000;
+    let recusas = 0;
+
+    function processarMensagem(bloco) {
+        let dados = '';
+        bloco.split('\n').forEach(linha => {
+            if (linha.startsWith('id:')) {
+                ultimoId = linha.slice(3).trim();
+            } else if (linha.startsWith('data:')) {
+                dados += linha.slice(5).trim();
+            } else if (linha.startsWith('retry:')) {
+                esperaMs = parseInt(linha.slice(6), 10) || esperaMs;
+            }
+        });
+        if (dados) {
+            aoReceber(JSON.parse(dados));
+        }
+    }
+
+    async function conectar() {
+        if (!localStorage.getItem('userId')) {
+            return;
+        }
+        try {
+            const headers = { ...authHeaders() };
+            if (ultimoId !== null) {
+                headers['Last-Event-ID'] = ultimoId;
+            }
+            const response = await fetch('/api/pedidos/stream', { headers });
+            if (response.status === 401) {
+                return; // Sessão expirada: não insiste
+            }
+            if (response.status === 503 || response.status === 429) {
+                const retryAfterMs = (parseInt(response.headers.get('Retry-After'), 10) || 30) * 1000;
+                const espera = Math.min(retryAfterMs * 2 ** recusas, ESPERA_MAXIMA_STREAM_MS);
+                recusas += 1;
+                setTimeout(conectar, espera + Math.random() * espera / 2);
+                return;
+            }
+            if (response.ok) {
+                recusas = 0;
+                const leitor = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const { value, done } = await leitor.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let fim;
+                    while ((fim = buffer.indexOf('\n\n')) !== -1) {
+                        processarMensagem(buffer.slice(0, fim));
+                        buffer = buffer.slice(fim + 2);
+                    }
+                }
+            }
+        } catch (error) {
+            console.error('Conexão com o stream de pedidos interrompida:', error);
+        }
+        setTimeout(conectar, esperaMs);
+    }
+
+    conectar();
+}
+
+// Agrupa chamadas próximas em uma só (ex.: várias alterações seguidas -> uma recarga)
+function agruparChamadas(funcao, esperaMs = 500) {
+    let timeout = null;
+    return () => {
+        clearTimeout(timeout);
+        timeout = setTimeout(funcao, esperaMs);
+    };
+}
+
+// Classe de cor do status usada nas tabelas de pedidos
+function classeDoStatus(status) {
+    if (status === 'confirmado') return 'status-confirmado';
+    if (status === 'pendente') return 'status-pendente';
+    if (status === 'producao') return 'status-producao';
+    return '';
+}
+
+// Aplica um evento 'alterado' ou 'excluido' à linha do pedido em uma tabela
+// (as células marcadas com data-campo recebem os novos valores). Retorna false se
+// o pedido não está na tabela.
+function aplicarEventoNaTabela(tableBody, evento) {
+    const row = tableBody.querySelector(`tr[data-pedido-id="${evento.id}"]`);
+    if (!row) return false;
+    if (evento.tipo === 'excluido') {
+        row.remove();
+        return true;
+    }
+    const pedido = evento.pedido || {};
+    row.querySelectorAll('[data-campo]').forEach(celula => {
+        const campo = celula.dataset.campo;
+        if (campo in pedido) {
+            celula.innerText = pedido[campo] ?? '';
+            if (campo === 'status') {
+                celula.className = classeDoStatus(pedido.status);
+            }
+        }
+    });
+    return true;
+}
+
 if (modalCloseButton) {
     modalCloseButton.addEventListener('click', closeModal);
 }
@@ -87,6 +220,7 @@ if (loginForm) { // O código só roda se o formulário existir na página atual
                 console.log('Login bem-sucedido!', data.message);
                 loginError.classList.add('hidden');
                 localStorage.setItem('userId', data.userId);
+                localStorage.setItem('authToken', data.token);
                 // Redireciona para a página principal de pedidos após o login
                 window.location.href = '/pedidos';
             } else {
@@ -117,15 +251,37 @@ if (loginForm) { // O código só roda se o formulário existir na página atual
 const logoutButton = document.getElementById('logout-button');
 if (logoutButton) {
     logoutButton.addEventListener('click', function() {
-        localStorage.removeItem('userId'); // Remove o ID do usuário do armazenamento local
+        encerrarSessao(); // Remove o ID do usuário e o token do armazenamento local
         showModal('Você foi desconectado.');
         window.location.href = '/login'; // Redireciona para a página de login
     });
 }
 
+// Renova o token da sessão (sem pedir a senha de novo); se ele expirou, volta para o login
+async function renovarSessao() {
+    if (!localStorage.getItem('authToken')) {
+        return;
+    }
+    try {
+        const response = await fetch('/api/auth/renovar', { method: 'POST', headers: authHeaders() });
+        if (response.ok) {
+            const data = await response.json();
+            localStorage.setItem('authToken', data.token);
+        } else if (response.status === 401) {
+            encerrarSessao();
+            window.location.href = '/login';
+        }
+    } catch (error) {
+        console.error('Erro ao renovar a sessão:', error);
+    }
+}
+
 // Lógica de verificação de autenticação ao carregar qualquer página
 window.addEventListener('load', () => {
     const userId = localStorage.getItem('userId');
+    if (userId && window.location.pathname !== '/login') {
+        renovarSessao();
+    }
     const navbar = document.getElementById('navbar');
     if (navbar) {
         if (userId) {
@@ -173,7 +329,7 @@ if (pedidoForm) {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
-                    'X-User-Id': userId // Adiciona o ID do usuário ao cabeçalho da requisição
+                    ...authHeaders() // Identifica o usuário (token da sessão)
                 },
                 body: JSON.stringify(pedidoData)
             });
@@ -214,15 +370,39 @@ if (pedidoForm) {
 // Função para buscar e exibir os pedidos
 // --- Funções para a Listagem de Pedidos ---
 
+// Campos usados pela tabela de listagem (a API devolve só o que for pedido)
+const CAMPOS_LISTA_PEDIDOS = 'id,clienteNome,dataEvento,tipoPedido,quantidade,status';
+
+// Lê os filtros da barra de filtros da listagem (apenas os preenchidos)
+function getFiltrosListaPedidos() {
+    const filtros = {};
+    const busca = document.getElementById('filtro-cliente');
+    const data = document.getElementById('filtro-data');
+    const status = document.getElementById('filtro-status');
+    if (busca && busca.value.trim()) filtros.busca = busca.value.trim();
+    if (data && data.value) filtros.dataEvento = data.value;
+    if (status && status.value) filtros.status = status.value;
+    return filtros;
+}
+
 // Função para buscar e exibir os pedidos
-async function loadPedidos() {
+// Sem cursor, recarrega a tabela do início; com cursor, acrescenta a próxima página.
+async function loadPedidos(cursor = null) {
     const tableBody = document.getElementById('pedidos-table-body');
     const noPedidosMessage = document.getElementById('no-pedidos-message');
+    const loadMoreBtn = document.getElementById('load-more-pedidos-btn');
     const userId = localStorage.getItem('userId');
 
     // Limpa a tabela e esconde a mensagem de "nenhum pedido" antes de carregar
-    tableBody.innerHTML = '';
+    if (!cursor) {
+        tableBody.innerHTML = '';
+        const selectAll = document.getElementById('select-all-pedidos');
+        if (selectAll) selectAll.checked = false;
+    }
     noPedidosMessage.classList.add('hidden');
+    if (loadMoreBtn) {
+        loadMoreBtn.classList.add('hidden');
+    }
 
     if (!userId) {
         // Se o usuário não estiver logado, não busca nada e exibe uma mensagem
@@ -232,38 +412,46 @@ async function loadPedidos() {
     }
 
     try {
-        const response = await fetch('/api/pedidos', {
+        const params = new URLSearchParams({ ...getFiltrosListaPedidos(), fields: CAMPOS_LISTA_PEDIDOS });
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        const response = await fetch(`/api/pedidos?${params.toString()}`, {
             method: 'GET',
             headers: {
-                'X-User-Id': userId // Envia o ID do usuário para o backend
+                ...authHeaders() // Identifica o usuário (token da sessão)
             }
         });
 
         const pedidos = await response.json();
 
+        // A API pagina os resultados; o cursor da próxima página vem no cabeçalho
+        const nextCursor = response.headers.get('X-Next-Cursor');
+        if (loadMoreBtn && nextCursor) {
+            loadMoreBtn.dataset.cursor = nextCursor;
+            loadMoreBtn.classList.remove('hidden');
+        }
+
         if (pedidos.length > 0) {
             // Se houver pedidos, itera sobre eles e cria uma linha na tabela para cada um
             pedidos.forEach(pedido => {
                 const row = document.createElement('tr');
                 row.className = 'table-row';
-                
+                row.dataset.pedidoId = pedido.id;
+
                 // Define a classe do status com base no valor retornado pelo backend
-                let statusClass = '';
-                if (pedido.status === 'confirmado') {
-                    statusClass = 'status-confirmado';
-                } else if (pedido.status === 'pendente') {
-                    statusClass = 'status-pendente';
-                } else if (pedido.status === 'producao') {
-                    statusClass = 'status-producao';
-                }
+                const statusClass = classeDoStatus(pedido.status);
 
                 row.innerHTML = `
-                    <td class="px-6 py-4 whitespace-nowrap">${pedido.clienteNome}</td>
-                    <td class="px-6 py-4 whitespace-nowrap">${pedido.dataEvento}</td>
-                    <td class="px-6 py-4 whitespace-nowrap">${pedido.tipoPedido}</td>
-                    <td class="px-6 py-4 whitespace-nowrap">${pedido.quantidade}</td>
                     <td class="px-6 py-4 whitespace-nowrap">
-                        <span class="${statusClass}">${pedido.status}</span>
+                        <input type="checkbox" class="pedido-checkbox form-checkbox h-4 w-4 text-blue-600 transition duration-150 ease-in-out" data-pedido-id="${pedido.id}">
+                    </td>
+                    <td class="px-6 py-4 whitespace-nowrap" data-campo="clienteNome">${pedido.clienteNome}</td>
+                    <td class="px-6 py-4 whitespace-nowrap" data-campo="dataEvento">${pedido.dataEvento}</td>
+                    <td class="px-6 py-4 whitespace-nowrap" data-campo="tipoPedido">${pedido.tipoPedido}</td>
+                    <td class="px-6 py-4 whitespace-nowrap" data-campo="quantidade">${pedido.quantidade}</td>
+                    <td class="px-6 py-4 whitespace-nowrap">
+                        <span class="${statusClass}" data-campo="status">${pedido.status}</span>
                     </td>
                     <td class="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
                         <a href="/pedidos/${pedido.id}" class="text-blue-600 hover:text-blue-900 mr-2">Ver Detalhes</a>
@@ -273,7 +461,7 @@ async function loadPedidos() {
                 `;
                 tableBody.appendChild(row);
             });
-        } else {
+        } else if (!cursor) {
             // Se não houver pedidos, exibe a mensagem de "nenhum pedido"
             noPedidosMessage.innerText = 'Nenhum pedido encontrado. Crie um novo pedido.';
             noPedidosMessage.classList.remove('hidden');
@@ -293,6 +481,52 @@ window.addEventListener('load', () => {
     // NOVO: Chama a função loadPedidos() se a página atual for a de listagem
     if (window.location.pathname === '/pedidos') {
         loadPedidos();
+
+        const loadMoreBtn = document.getElementById('load-more-pedidos-btn');
+        if (loadMoreBtn) {
+            loadMoreBtn.addEventListener('click', () => loadPedidos(loadMoreBtn.dataset.cursor));
+        }
+
+        const applyFiltersBtn = document.getElementById('apply-filters-btn');
+        if (applyFiltersBtn) {
+            applyFiltersBtn.addEventListener('click', () => loadPedidos());
+        }
+
+        const selectAll = document.getElementById('select-all-pedidos');
+        if (selectAll) {
+            selectAll.addEventListener('change', () => {
+                document.querySelectorAll('.pedido-checkbox').forEach(checkbox => {
+                    checkbox.checked = selectAll.checked;
+                });
+            });
+        }
+
+        const confirmSelectedBtn = document.getElementById('confirm-selected-pedidos-btn');
+        if (confirmSelectedBtn) {
+            confirmSelectedBtn.addEventListener('click', confirmarPedidosSelecionados);
+        }
+
+        // Busca enquanto o usuário digita, com um pequeno atraso para não disparar uma requisição por tecla
+        const filtroCliente = document.getElementById('filtro-cliente');
+        if (filtroCliente) {
+            let buscaTimeout = null;
+            filtroCliente.addEventListener('input', () => {
+                clearTimeout(buscaTimeout);
+                buscaTimeout = setTimeout(() => loadPedidos(), 300);
+            });
+        }
+
+        // Alterações feitas por outros usuários: atualiza a linha na tabela; pedidos novos
+        // (que podem ou não atender aos filtros) recarregam a lista
+        const tableBody = document.getElementById('pedidos-table-body');
+        const recarregar = agruparChamadas(() => loadPedidos());
+        assinarEventosPedidos(evento => {
+            if (evento.tipo === 'alterado' || evento.tipo === 'excluido') {
+                aplicarEventoNaTabela(tableBody, evento);
+            } else {
+                recarregar();
+            }
+        });
     }
 });
 
@@ -315,7 +549,7 @@ async function loadPedidoDetails(pedidoId) {
     try {
         const response = await fetch(`/api/pedidos/${pedidoId}`, {
             method: 'GET',
-            headers: { 'X-User-Id': userId }
+            headers: authHeaders()
         });
 
         if (response.ok) {
@@ -434,7 +668,7 @@ async function handlePedidoAction(action, pedidoId) {
             method: method,
             headers: {
                 'Content-Type': 'application/json',
-                'X-User-Id': userId
+                ...authHeaders()
             },
             body: body
         });
@@ -455,6 +689,46 @@ async function handlePedidoAction(action, pedidoId) {
     }
 }
 
+// Confirma de uma vez (uma requisição, um único UPDATE) os pedidos marcados na lista
+async function confirmarPedidosSelecionados() {
+    const userId = localStorage.getItem('userId');
+    if (!userId) {
+        window.location.href = '/login';
+        return;
+    }
+
+    const pedidoIds = Array.from(document.querySelectorAll('.pedido-checkbox:checked'))
+        .map(checkbox => Number(checkbox.dataset.pedidoId));
+    if (pedidoIds.length === 0) {
+        showModal('Selecione ao menos um pedido.');
+        return;
+    }
+    if (!confirm(`Tem certeza que deseja confirmar ${pedidoIds.length} pedido(s)?`)) {
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/pedidos/bulk', {
+            method: 'PATCH',
+            headers: {
+                'Content-Type': 'application/json',
+                ...authHeaders()
+            },
+            body: JSON.stringify({ pedido_ids: pedidoIds, status: 'confirmado' })
+        });
+        const result = await response.json();
+        if (!response.ok) {
+            const detalhes = (result.erros || []).map(erro => `#${erro.id}: ${erro.message}`).join('\n');
+            showModal(`Erro ao confirmar pedidos: ${result.message}${detalhes ? '\n' + detalhes : ''}`);
+            return;
+        }
+        loadPedidos();
+    } catch (error) {
+        console.error("Erro de conexão ao confirmar pedidos:", error);
+        showModal("Erro de conexão com o servidor. Tente novamente.");
+    }
+}
+
 // Adiciona os event listeners aos botões de ação
 document.addEventListener('click', function(event) {
     const target = event.target;
@@ -526,7 +800,7 @@ if (uploadForm) {
             const response = await fetch('/api/contracts/upload', {
                 method: 'POST',
                 headers: {
-                    'X-User-Id': userId,
+                    ...authHeaders(),
                 },
                 body: formData
             });
@@ -536,6 +810,12 @@ if (uploadForm) {
                 uploadSuccess.innerText = result.message;
                 uploadSuccess.classList.remove('hidden');
 
+                // Contrato já usado em outro pedido (mesmo arquivo PDF)
+                if (result.contratoDuplicado) {
+                    uploadError.innerText = `Atenção: este contrato já foi usado no(s) pedido(s) #${result.pedidosDoContrato.join(', #')}.`;
+                    uploadError.classList.remove('hidden');
+                }
+
                 // Exibe os dados extraídos
                 extractedDataDisplay.innerHTML = `
                     <p><strong>Cliente:</strong> ${result.extractedData.clienteNome || 'N/A'}</p>
@@ -595,7 +875,7 @@ if (uploadForm) {
 //                     method: 'POST',
 //                     headers: {
 //                         'Content-Type': 'application/json',
-//                         'X-User-Id': userId,
+//                         ...authHeaders(),
 //                     },
 //                     body: JSON.stringify(pedidoData)
 //                 });
@@ -645,15 +925,29 @@ if (saveAsPedidoForm) {
         pedidoData.status = 'pendente';
         
         try {
-            const response = await fetch('/api/pedidos', {
+            let response = await fetch('/api/pedidos', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
-                    'X-User-Id': userId,
+                    ...authHeaders(),
                 },
                 body: JSON.stringify(pedidoData)
             });
-            const result = await response.json();
+            let result = await response.json();
+
+            // 409: o contrato já gerou outro pedido; só cria um segundo se o usuário confirmar
+            if (response.status === 409 && confirm(`${result.message} Deseja criar outro pedido mesmo assim?`)) {
+                pedidoData.permitirContratoDuplicado = true;
+                response = await fetch('/api/pedidos', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        ...authHeaders(),
+                    },
+                    body: JSON.stringify(pedidoData)
+                });
+                result = await response.json();
+            }
             if (response.ok) {
                 showModal('Pedido salvo com sucesso a partir do contrato! Redirecionando...');
                 setTimeout(() => {
@@ -744,7 +1038,7 @@ function fillEditFields(pedido) {
         // Faz uma requisição para buscar os dados do pedido
         fetch(`/api/pedidos/${pedidoId}`, {
             method: 'GET',
-            headers: { 'X-User-Id': userId }
+            headers: authHeaders()
         }).then(response => response.json())
         .then(pedido => {
             fillEditFields(pedido); // Preenche os campos de edição
@@ -780,7 +1074,7 @@ function fillEditFields(pedido) {
                 method: 'PUT', // Requisição PUT para atualizar
                 headers: {
                     'Content-Type': 'application/json',
-                    'X-User-Id': userId
+                    ...authHeaders()
                 },
                 body: JSON.stringify(updatedData)
             });
@@ -823,7 +1117,7 @@ if (btnGerarComprovante) {
             const response = await fetch(`/api/reports/generate-delivery-report/${pedidoId}`, {
                 method: 'GET',
                 headers: {
-                    'X-User-Id': userId
+                    ...authHeaders()
                 }
             });
 
@@ -883,7 +1177,7 @@ async function loadRelatorios() {
         const response = await fetch('/api/reports', { // Rota da API de relatórios
             method: 'GET',
             headers: {
-                'X-User-Id': userId
+                ...authHeaders()
             }
         });
 
@@ -904,16 +1198,15 @@ async function loadRelatorios() {
                     window.myEvolutionChart.destroy();
                 }
 
-                // Rótulos para os períodos (ex: meses ou semanas)
-                // Você pode ajustar estes rótulos para refletir seus dados reais, se quiser.
-                const labels = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']; 
-                const dataValues = relatoriosData.evolucaoSemanalMensal || []; // Pega os valores do backend
+                // Rótulos dos períodos (meses ou semanas) e valores, ambos calculados pelo backend
+                const labels = relatoriosData.evolucaoRotulos || [];
+                const dataValues = relatoriosData.evolucaoSemanalMensal || [];
 
                 // Cria uma nova instância do gráfico
                 window.myEvolutionChart = new Chart(evolucaoChartCanvas, {
                     type: 'line', // Tipo de gráfico: linha
                     data: {
-                        labels: labels.slice(0, dataValues.length), // Usa apenas os rótulos correspondentes aos dados
+                        labels: labels,
                         datasets: [{
                             label: 'Evolução de Pedidos',
                             data: dataValues,
@@ -978,5 +1271,8 @@ window.addEventListener('load', () => {
     // NOVO: Chama a função loadRelatorios() se a página atual for a de relatórios
     if (window.location.pathname === '/relatorios') {
         loadRelatorios();
+
+        // Recalcula os indicadores quando algum pedido muda
+        assinarEventosPedidos(agruparChamadas(() => loadRelatorios(), 2000));
     }
 });
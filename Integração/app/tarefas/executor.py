@@ -0,0 +1,177 @@
+# Arquivo: app/tarefas/executor.py
+# Execução de tarefas em segundo plano, sem broker externo.
+#
+# O estado das tarefas fica na tabela 'tarefa' e o resultado em TAREFAS_PASTA,
+# então qualquer worker do gunicorn consegue consultar e entregar uma tarefa
+# iniciada por outro. O trabalho pesado roda em um ProcessPoolExecutor criado
+# sob demanda em cada worker; cada processo do pool tem a sua própria app Flask.
+
+import os
+import json
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, func, or_, update
+
+_pool = None
+_pool_pid = None
+
+# App Flask criada em cada processo do pool (ver _iniciar_processo)
+_app_do_processo = None
+
+def _obter_pool():
+    """Cria o pool na primeira tarefa do processo atual (seguro após fork do gunicorn)."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        # 'spawn' evita herdar conexões do banco e threads do worker web
+        contexto = multiprocessing.get_context('spawn')
+        _pool = ProcessPoolExecutor(
+            max_workers=current_app.config['TAREFAS_MAX_PROCESSOS'],
+            mp_context=contexto,
+            initializer=_iniciar_processo,
+        )
+        _pool_pid = os.getpid()
+    return _pool
+
+def _iniciar_processo():
+    global _app_do_processo
+    from app import create_app
+    _app_do_processo = create_app()
+
+def caminho_do_resultado(tarefa_id):
+    return os.path.join(current_app.config['TAREFAS_PASTA'], tarefa_id)
+
+def validade_das_tarefas():
+    return timedelta(minutes=current_app.config['TAREFAS_VALIDADE_MINUTOS'])
+
+def enviar_tarefa(tarefa_id):
+    """Agenda a execução de uma tarefa já gravada no banco."""
+    _obter_pool().submit(executar_tarefa, tarefa_id)
+
+class _SinalDeVida:
+    """
+    Thread que renova tarefa.sinalEm a cada TAREFAS_SINAL_SEGUNDOS enquanto o processo
+    executa a tarefa. Se o processo morrer, o sinal para e limpar_expiradas a encerra.
+    """
+
+    def __init__(self, tarefa_id):
+        self._tarefa_id = tarefa_id
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._renovar, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *excecao):
+        self._parar.set()
+        self._thread.join()
+
+    def _renovar(self):
+        from app import db
+        from app.models import Tarefa
+
+        with _app_do_processo.app_context():
+            intervalo = current_app.config['TAREFAS_SINAL_SEGUNDOS']
+            while not self._parar.wait(intervalo):
+                try:
+                    with db.engine.begin() as conexao:
+                        conexao.execute(
+                            update(Tarefa)
+                            .where(Tarefa.id == self._tarefa_id, Tarefa.status == 'executando')
+                            .values(sinalEm=datetime.utcnow())
+                        )
+                except Exception as e:  # Banco fora do ar: tenta de novo no próximo intervalo
+                    current_app.logger.warning(f'Falha ao renovar o sinal da tarefa {self._tarefa_id}: {e}')
+
+def executar_tarefa(tarefa_id):
+    """Roda dentro de um processo do pool: gera o resultado e atualiza o status da tarefa."""
+    from app import db
+    from app.models import Tarefa
+    from app.tarefas.geradores import GERADORES
+    from app.replica import consultas_na_replica
+
+    with _app_do_processo.app_context():
+        tarefa = db.session.get(Tarefa, tarefa_id)
+        if tarefa is None or tarefa.status != 'pendente':
+            return  # Apagada, ou dada como perdida por limpar_expiradas enquanto esperava na fila
+        tarefa.status = 'executando'
+        tarefa.iniciadaEm = tarefa.sinalEm = datetime.utcnow()
+        db.session.commit()
+
+        caminho = caminho_do_resultado(tarefa_id)
+        caminho_parcial = caminho + '.parcial'
+        try:
+            # Os pedidos são lidos da réplica (se houver); a tarefa continua sendo gravada no primário
+            with _SinalDeVida(tarefa_id), open(caminho_parcial, 'wb') as destino, consultas_na_replica():
+                nome_arquivo, mimetype = GERADORES[tarefa.tipo](json.loads(tarefa.parametrosJson), destino)
+            os.replace(caminho_parcial, caminho)
+            tarefa.status = 'concluida'
+            tarefa.nomeArquivo = nome_arquivo
+            tarefa.mimetype = mimetype
+        except Exception as e:
+            db.session.rollback()
+            if os.path.exists(caminho_parcial):
+                os.remove(caminho_parcial)
+            tarefa.status = 'erro'
+            tarefa.mensagemErro = str(e)
+
+        tarefa.concluidaEm = datetime.utcnow()
+        tarefa.expiraEm = tarefa.concluidaEm + validade_das_tarefas()
+        db.session.commit()
+
+def limpar_expiradas():
+    """
+    Marca como 'erro' as tarefas abandonadas e apaga as tarefas finalizadas vencidas com
+    os seus arquivos de resultado. Abandonadas são as tarefas em execução sem sinal de vida
+    há TAREFAS_SINAL_LIMITE_SEGUNDOS (o processo do pool morreu) e as pendentes há mais de
+    TAREFAS_TEMPO_MAXIMO_MINUTOS na fila (o worker que as enfileirou morreu). Só o .parcial
+    de uma tarefa que perdeu o sinal é apagado. O expiraEm só vale depois que a tarefa
+    termina: uma tarefa na fila ou rodando nunca é apagada.
+    """
+    from app import db
+    from app.models import Tarefa
+
+    config = current_app.config
+    agora = datetime.utcnow()
+    abandonada = or_(
+        and_(
+            Tarefa.status == 'executando',
+            func.coalesce(Tarefa.sinalEm, Tarefa.iniciadaEm, Tarefa.createdAt)
+            < agora - timedelta(seconds=config['TAREFAS_SINAL_LIMITE_SEGUNDOS']),
+        ),
+        and_(
+            Tarefa.status == 'pendente',
+            Tarefa.createdAt < agora - timedelta(minutes=config['TAREFAS_TEMPO_MAXIMO_MINUTOS']),
+        ),
+    )
+    candidatas = db.session.execute(db.select(Tarefa.id, Tarefa.status).where(abandonada)).all()
+    interrompidas = 0
+    for tarefa_id, status in candidatas:
+        # A condição é repetida no UPDATE: se o sinal foi renovado nesse meio tempo, nada muda
+        resultado = db.session.execute(
+            update(Tarefa).where(Tarefa.id == tarefa_id, abandonada).values(
+                status='erro',
+                mensagemErro='A tarefa foi interrompida antes de terminar. Tente novamente.',
+                concluidaEm=agora,
+                expiraEm=agora + validade_das_tarefas(),
+            )
+        )
+        if resultado.rowcount:
+            interrompidas += 1
+            caminho_parcial = caminho_do_resultado(tarefa_id) + '.parcial'
+            if status == 'executando' and os.path.exists(caminho_parcial):
+                os.remove(caminho_parcial)
+
+    expiradas = Tarefa.query.filter(
+        Tarefa.status.in_(('concluida', 'erro')), Tarefa.expiraEm < agora
+    ).all()
+    for tarefa in expiradas:
+        caminho = caminho_do_resultado(tarefa.id)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        db.session.delete(tarefa)
+    if interrompidas or expiradas:
+        db.session.commit()
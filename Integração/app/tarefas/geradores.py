@@ -0,0 +1,90 @@
+# Arquivo: app/tarefas/geradores.py
+# Funções que produzem o resultado de cada tipo de tarefa.
+#
+# Cada gerador recebe os parâmetros da tarefa e um arquivo binário aberto para
+# escrita, e retorna (nome sugerido para o download, mimetype).
+
+import shutil
+from datetime import datetime
+from app import db
+from app.models import Pedido
+from app.relatorios.planilhas import consulta_exportacao, planilha_de_pedidos, MIMETYPE_XLSX
+from app.relatorios.comprovantes import (
+    comprovante_do_pedido, nome_do_comprovante, consulta_comprovantes, gerar_lote_comprovantes, MIMETYPE_DOCX,
+    FORMATOS_LOTE
+)
+from app.utils import validar_ids
+
+def gerar_exportacao_pedidos(parametros, destino):
+    """Planilha de pedidos por 'pedido_ids' ou por 'filtros' + 'excluir_ids' (como em /api/reports)."""
+    pedidos = consulta_exportacao(
+        pedido_ids=parametros.get('pedido_ids'),
+        filtros=parametros.get('filtros'),
+        excluir_ids=parametros.get('excluir_ids'),
+    )
+    buffer, total = planilha_de_pedidos("Pedidos", pedidos)
+    with buffer:
+        if not total:
+            raise ValueError('Nenhum pedido encontrado para exportação.')
+        shutil.copyfileobj(buffer, destino)
+
+    export_date = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"pedidos_{export_date}.xlsx", MIMETYPE_XLSX
+
+def gerar_comprovante_entrega(parametros, destino):
+    """Comprovante de retirada (DOCX) do pedido 'pedido_id'."""
+    pedido = db.session.get(Pedido, int(parametros['pedido_id']))
+    if not pedido:
+        raise ValueError('Pedido não encontrado.')
+    destino.write(comprovante_do_pedido(pedido))
+    return nome_do_comprovante(pedido.id), MIMETYPE_DOCX
+
+def gerar_lote_de_comprovantes(parametros, destino):
+    """Comprovantes de vários pedidos ('pedido_ids' ou 'dataRetirada') em ZIP ou DOCX único."""
+    pedidos = consulta_comprovantes(
+        pedido_ids=parametros.get('pedido_ids'),
+        data_retirada=parametros.get('dataRetirada'),
+    ).all()
+    if not pedidos:
+        raise ValueError('Nenhum pedido encontrado para gerar comprovantes.')
+
+    buffer, _, nome_arquivo, mimetype = gerar_lote_comprovantes(pedidos, parametros.get('formato', 'zip'))
+    with buffer:
+        shutil.copyfileobj(buffer, destino)
+    return nome_arquivo, mimetype
+
+# ------------------------------------------------------------------------------
+# Validação dos parâmetros, na requisição que enfileira a tarefa: cada função lança
+# ValueError com a mensagem para o cliente (as consultas são montadas, não executadas)
+# ------------------------------------------------------------------------------
+def validar_exportacao_pedidos(parametros):
+    consulta_exportacao(
+        pedido_ids=parametros.get('pedido_ids'),
+        filtros=parametros.get('filtros'),
+        excluir_ids=parametros.get('excluir_ids'),
+    )
+
+def validar_comprovante_entrega(parametros):
+    if 'pedido_id' not in parametros:
+        raise ValueError("Informe 'pedido_id'.")
+    validar_ids([parametros['pedido_id']], 'pedido_id')
+
+def validar_lote_de_comprovantes(parametros):
+    consulta_comprovantes(
+        pedido_ids=parametros.get('pedido_ids'),
+        data_retirada=parametros.get('dataRetirada'),
+    )
+    if parametros.get('formato', 'zip') not in FORMATOS_LOTE:
+        raise ValueError(f"Formato inválido. Use {' ou '.join(repr(formato) for formato in FORMATOS_LOTE)}.")
+
+GERADORES = {
+    'exportacao_pedidos': gerar_exportacao_pedidos,
+    'comprovante_entrega': gerar_comprovante_entrega,
+    'comprovantes_lote': gerar_lote_de_comprovantes,
+}
+
+VALIDADORES = {
+    'exportacao_pedidos': validar_exportacao_pedidos,
+    'comprovante_entrega': validar_comprovante_entrega,
+    'comprovantes_lote': validar_lote_de_comprovantes,
+}
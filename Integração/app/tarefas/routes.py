@@ -0,0 +1,100 @@
+# Arquivo: app/tarefas/routes.py
+
+import os
+import json
+import uuid
+from datetime import datetime
+from flask import Blueprint, request, jsonify, send_file, g
+from app import db
+from app.models import Tarefa
+from app.auth.sessao import usuario_obrigatorio
+from app.tarefas.executor import enviar_tarefa, limpar_expiradas, caminho_do_resultado, validade_das_tarefas
+from app.tarefas.geradores import GERADORES, VALIDADORES
+
+tarefas_bp = Blueprint('tarefas', __name__, url_prefix='/api/jobs')
+
+def tarefa_to_dict(tarefa):
+    return {
+        'id': tarefa.id,
+        'tipo': tarefa.tipo,
+        'status': tarefa.status,
+        'nomeArquivo': tarefa.nomeArquivo,
+        'mensagemErro': tarefa.mensagemErro,
+        'createdAt': tarefa.createdAt.isoformat(),
+        'concluidaEm': tarefa.concluidaEm.isoformat() if tarefa.concluidaEm else None,
+        'expiraEm': tarefa.expiraEm.isoformat(),
+    }
+
+def _tarefa_do_usuario(tarefa_id, user_id):
+    """Retorna a tarefa se ela existir, não tiver expirado e pertencer ao usuário; senão None."""
+    tarefa = db.session.get(Tarefa, tarefa_id)
+    if not tarefa:
+        return None
+    # Só tarefas finalizadas expiram (o expiraEm é renovado quando a tarefa termina)
+    if tarefa.status in ('concluida', 'erro') and tarefa.expiraEm < datetime.utcnow():
+        return None
+    if tarefa.user_id != user_id:
+        return None
+    return tarefa
+
+@tarefas_bp.route('', methods=['POST'])
+@usuario_obrigatorio
+def submit_tarefa():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'message': 'O corpo da requisição deve ser um objeto JSON.'}), 400
+    tipo = data.get('tipo')
+    if tipo not in GERADORES:
+        return jsonify({'message': f"Tipo de tarefa inválido. Use um de: {', '.join(GERADORES)}."}), 400
+    parametros = data.get('parametros', {})
+    if not isinstance(parametros, dict):
+        return jsonify({'message': "'parametros' deve ser um objeto."}), 400
+    try:
+        VALIDADORES[tipo](parametros)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    limpar_expiradas()
+
+    tarefa = Tarefa(
+        id=uuid.uuid4().hex,
+        tipo=tipo,
+        status='pendente',
+        parametrosJson=json.dumps(parametros),
+        expiraEm=datetime.utcnow() + validade_das_tarefas(),
+        user_id=g.usuario_id,
+    )
+    db.session.add(tarefa)
+    db.session.commit()
+
+    enviar_tarefa(tarefa.id)
+
+    return jsonify({'message': 'Tarefa enfileirada.', 'tarefa': tarefa_to_dict(tarefa)}), 202
+
+@tarefas_bp.route('/<tarefa_id>', methods=['GET'])
+@usuario_obrigatorio
+def get_tarefa(tarefa_id):
+    tarefa = _tarefa_do_usuario(tarefa_id, g.usuario_id)
+    if not tarefa:
+        return jsonify({'message': 'Tarefa não encontrada.'}), 404
+    return jsonify(tarefa_to_dict(tarefa)), 200
+
+@tarefas_bp.route('/<tarefa_id>/download', methods=['GET'])
+@usuario_obrigatorio
+def download_tarefa(tarefa_id):
+    tarefa = _tarefa_do_usuario(tarefa_id, g.usuario_id)
+    if not tarefa:
+        return jsonify({'message': 'Tarefa não encontrada.'}), 404
+    if tarefa.status != 'concluida':
+        return jsonify({'message': 'A tarefa ainda não foi concluída.', 'status': tarefa.status}), 409
+
+    caminho = caminho_do_resultado(tarefa.id)
+    if not os.path.exists(caminho):
+        return jsonify({'message': 'O resultado da tarefa não está mais disponível.'}), 410
+
+    return send_file(
+        caminho,
+        as_attachment=True,
+        download_name=tarefa.nomeArquivo,
+        mimetype=tarefa.mimetype
+    )
@@ -0,0 +1,75 @@
+# Arquivo: app/utils.py
+# Funções auxiliares compartilhadas entre os blueprints.
+
+from datetime import date, datetime, time
+
+# Formatos de data que aparecem no sistema:
+# formulário (2025-04-11), contratos (02/07/2025) e dados antigos (02-07-2025)
+FORMATOS_DATA = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y/%m/%d')
+FORMATOS_HORARIO = ('%H:%M', '%H:%M:%S', '%Hh%M', '%Hh')
+
+def validar_ids(valores, nome):
+    """
+    Converte uma lista de IDs vinda de um corpo JSON (inteiros ou texto com um inteiro)
+    para inteiros. Lança ValueError se 'valores' não for uma lista ou algum ID for inválido.
+    """
+    if not isinstance(valores, list):
+        raise ValueError(f"'{nome}' deve ser uma lista de IDs.")
+    ids = []
+    for valor in valores:
+        # bool é subclasse de int e 1.9 viraria 1: só inteiros ou texto com um inteiro
+        try:
+            if isinstance(valor, bool) or not isinstance(valor, (int, str)):
+                raise ValueError
+            ids.append(int(valor))
+        except ValueError:
+            raise ValueError(f"ID inválido em '{nome}': {valor!r}.")
+    return ids
+
+def normalizar_data(valor):
+    """
+    Converte uma data em qualquer um dos formatos conhecidos para um objeto date.
+    Retorna None para valores vazios e lança ValueError se o formato não for reconhecido.
+    """
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+
+    texto = str(valor).strip()
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: '{valor}'.")
+
+def normalizar_horario(valor):
+    """
+    Converte um horário ('12:00', '12:00:00', '12h00') para um objeto time.
+    Retorna None para valores vazios e lança ValueError se o formato não for reconhecido.
+    """
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, datetime):
+        return valor.time()
+    if isinstance(valor, time):
+        return valor
+
+    texto = str(valor).strip()
+    for formato in FORMATOS_HORARIO:
+        try:
+            return datetime.strptime(texto, formato).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Horário inválido: '{valor}'.")
+
+def data_para_iso(valor):
+    """Formata date/time para a API: 'YYYY-MM-DD' ou 'HH:MM'. None continua None."""
+    if valor is None:
+        return None
+    if isinstance(valor, time):
+        return valor.strftime('%H:%M')
+    return valor.isoformat()
@@ -0,0 +1,55 @@
+# Arquivo: benchmarks/bench_comprovantes.py
+# Compara o tempo de geração dos relatórios de entrega (.docx):
+# montagem pelo python-docx a cada relatório x cópia do modelo em cache.
+#
+# Uso (na pasta Integração): python benchmarks/bench_comprovantes.py [quantidade]
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from docx import Document
+import Extractor
+
+DADOS = {
+    'Contratante': {'Nome': 'Maria da Silva'},
+    'Data do Evento': '15/03/2025',
+    'Local do Evento': 'Salão de Festas Central',
+    'Valor Total do Pedido': '1.250,00',
+    'Produtos Contratados': [
+        {'Quantidade': '100', 'Produto': 'Brigadeiro', 'Valor Unitário': '2,50', 'Valor Total Item': '250,00'},
+        {'Quantidade': '200', 'Produto': 'Beijinho', 'Valor Unitário': '2,50', 'Valor Total Item': '500,00'},
+        {'Quantidade': '1', 'Produto': 'Bolo 3kg', 'Valor Unitário': '500,00', 'Valor Total Item': '500,00'},
+    ],
+}
+
+def gerar_sem_modelo(dados):
+    """Caminho antigo: um Document() novo por relatório."""
+    document = Document()
+    Extractor._escrever_relatorio_entrega(document, dados)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def medir(nome, funcao, quantidade):
+    funcao(DADOS)  # Aquecimento (o modelo em cache é montado aqui)
+    inicio = time.perf_counter()
+    for _ in range(quantidade):
+        funcao(DADOS)
+    decorrido = time.perf_counter() - inicio
+    print(f'{nome:<24} {decorrido * 1000 / quantidade:8.2f} ms/relatório  ({quantidade / decorrido:7.1f}/s)')
+    return decorrido
+
+if __name__ == '__main__':
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    antigo = medir('python-docx por relatório', gerar_sem_modelo, quantidade)
+    novo = medir('modelo em cache', Extractor.gerar_relatorio_entrega, quantidade)
+    print(f'Ganho: {antigo / novo:.1f}x')
+
+    inicio = time.perf_counter()
+    Extractor.gerar_relatorios_entrega_unificado([DADOS] * quantidade)
+    decorrido = time.perf_counter() - inicio
+    print(f'Unificado ({quantidade} relatórios): {decorrido * 1000:.0f} ms')
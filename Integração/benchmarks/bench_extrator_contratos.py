@@ -0,0 +1,153 @@
+# Arquivo: benchmarks/bench_extrator_contratos.py
+# Regressão + benchmark do extrator de dados de contrato (app/Extractor.py).
+#
+# 1. Confere que o extrator atual produz exatamente a mesma saída que a versão
+#    anterior (copiada abaixo como referência) em um corpus de contratos.
+# 2. Compara o tempo das duas versões, incluindo textos patológicos (contratos
+#    longos e sem os campos esperados), que travavam o upload.
+#
+# Uso (na pasta Integração): python benchmarks/bench_extrator_contratos.py [pasta_com_txts]
+# Se uma pasta for informada, os .txt dela (texto já extraído de PDFs reais) entram no corpus.
+
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import Extractor
+
+def extrair_dados_do_contrato_referencia(texto_do_contrato):
+    """Versão anterior de extrair_dados_do_contrato, mantida como referência."""
+    dados_extraidos = {}
+    flags = re.DOTALL | re.IGNORECASE
+
+    contratante_match = re.search(
+        r"CONTRATANTE\s*:\s*Sr\(a\)\s*(.*?),\s*brasileiro\(a\).*?RG:\s*([\d.\s-]+?)\s*e\s*CPF:\s*([\d.\s-]+?),",
+        texto_do_contrato, flags)
+    if contratante_match:
+        dados_extraidos['Contratante'] = {'Nome': contratante_match.group(1).strip(), 'RG': contratante_match.group(2).strip(), 'CPF': contratante_match.group(3).strip(),}
+    else:
+        dados_extraidos['Contratante'] = "Não encontrado"
+
+    contratado_match = re.search(
+        r"CONTRATADO\s*(.*?),\s*inscrito\s*sob\s*o\s*CNPJ:\s*([\d./\s-]+?),",
+        texto_do_contrato, flags)
+    if contratado_match:
+        dados_extraidos['Contratado'] = {'Nome Empresa': contratado_match.group(1).strip(), 'CNPJ': contratado_match.group(2).strip(),}
+    else:
+        dados_extraidos['Contratado'] = "Não encontrado"
+
+    dados_extraidos['Produtos Contratados'] = []
+    secao_produtos_match = re.search(r'PRODUTOS CONTRATADOS\s*(.*?)\s*CLÁUSULA 2', texto_do_contrato, flags)
+    if secao_produtos_match:
+        for linha in secao_produtos_match.group(1).strip().split('\n'):
+            linha_limpa = linha.strip()
+            if not linha_limpa or not linha_limpa[0].isdigit():
+                continue
+            produto_match = re.match(r'^\s*(\d+)\s+(.*?)\s+([\d,.]+)\s+([\d,.]+)\s*$', linha_limpa)
+            if produto_match:
+                dados_extraidos['Produtos Contratados'].append({
+                    'Quantidade': produto_match.group(1).strip(),
+                    'Produto': produto_match.group(2).strip().strip(),
+                    'Valor Unitário': produto_match.group(3).strip(),
+                    'Valor Total Item': produto_match.group(4).strip()
+                })
+
+    valor_total_match = re.search(r"O valor total de R\$\s*([\d,.]+)", texto_do_contrato, flags)
+    dados_extraidos['Valor Total do Pedido'] = valor_total_match.group(1).strip() if valor_total_match else "Não encontrado"
+    data_pagamento_match = re.search(r"pagos no dia\s*(\d{2}/\d{2}/\d{4})", texto_do_contrato, flags)
+    dados_extraidos['Data de Pagamento'] = data_pagamento_match.group(1).strip() if data_pagamento_match else "Não encontrada"
+    data_evento_match = re.search(r"O evento acontecerá no dia:\s*([\d/]+)", texto_do_contrato, flags)
+    dados_extraidos['Data do Evento'] = data_evento_match.group(1).strip() if data_evento_match else "Não encontrada"
+    local_evento_match = re.search(r"Local do\s*evento\s*:\s*(.*?)\n", texto_do_contrato, flags)
+    dados_extraidos['Local do Evento'] = local_evento_match.group(1).strip() if local_evento_match else "Não encontrado"
+    return dados_extraidos
+
+# ------------------------------------------------------------------------------
+# Corpus
+# ------------------------------------------------------------------------------
+CONTRATO_MODELO = """CONTRATO DE PRESTAÇÃO DE SERVIÇOS
+CONTRATANTE: Sr(a) {nome}, brasileiro(a), casado(a), residente na Rua das Flores, 123,
+portador(a) do RG: {rg} e CPF: {cpf}, doravante denominado CONTRATANTE.
+CONTRATADO {empresa}, inscrito sob o CNPJ: {cnpj}, com sede na Av. Brasil, 500.
+CLÁUSULA 1 - DO OBJETO
+PRODUTOS CONTRATADOS
+Quantidade Produto Valor Unitário Valor Total
+{produtos}
+CLÁUSULA 2 - DO PAGAMENTO
+O valor total de R$ {valor} será pagos no dia {pagamento} via PIX.
+CLÁUSULA 3 - DO EVENTO
+O evento acontecerá no dia: {evento}
+Local do evento: {local}
+{rodape}
+"""
+
+def _contrato(indice, quantidade_produtos=3, rodape=''):
+    produtos = '\n'.join(
+        f'{10 * (i + 1)} Doce sabor {i} especial {i * 0.5 + 1:.2f} {10 * (i + 1) * (i * 0.5 + 1):.2f}'
+        for i in range(quantidade_produtos)
+    )
+    return CONTRATO_MODELO.format(
+        nome=f'Cliente Número {indice}', rg=f'12.345.{indice:03d}-X'.replace('X', '9'),
+        cpf=f'123.456.{indice:03d}-00', empresa='Doces & Cia LTDA', cnpj='12.345.678/0001-90',
+        produtos=produtos, valor=f'{indice * 10},00', pagamento=f'{(indice % 28) + 1:02d}/03/2025',
+        evento=f'{(indice % 28) + 1:02d}/04/2025', local=f'Salão {indice}, Centro', rodape=rodape,
+    )
+
+def montar_corpus(pasta=None):
+    corpus = {f'modelo_{i}': _contrato(i, quantidade_produtos=i % 8) for i in range(40)}
+    clausulas = '\n'.join(f'CLÁUSULA {n} - Texto padrão da cláusula número {n}, com vírgulas, pontos.' for n in range(4, 400))
+    corpus['longo'] = _contrato(1, quantidade_produtos=60, rodape=clausulas)
+    corpus['sem_campos'] = 'CONTRATANTE: Sr(a) ' + 'texto sem estrutura, ' * 4000
+    corpus['marcadores_repetidos'] = ('CONTRATANTE: Sr(a) X, brasileiro(a) ' + 'a, ' * 300 + '\n') * 30 + _contrato(2)
+    corpus['brasileiros_sem_rg'] = 'CONTRATANTE: Sr(a) X, brasileiro(a), ' * 400
+    corpus['minusculas'] = _contrato(3).lower()
+    corpus['s_longo'] = _contrato(4).replace('CONTRATANTE', 'CONTRATANTE\u017f', 1) + 'İ'
+    corpus['vazio'] = ''
+    corpus['produtos_sem_clausula'] = 'PRODUTOS CONTRATADOS\n10 Bolo 1,00 10,00\n'
+    # Valores longe do marcador, além das janelas mínimas de REGRAS_CONTRATO (mas dentro da seção)
+    qualificacao = ', '.join(f'representante do espólio número {n}' for n in range(80))
+    corpus['valores_distantes'] = (
+        _contrato(5)
+        .replace('casado(a),', f'casado(a), {qualificacao},', 1)
+        .replace('Local do evento: Salão 5, Centro', 'Local do evento: Salão 5, ' + 'Bloco B, ' * 80 + 'Centro', 1)
+    )
+    for caminho in glob.glob(os.path.join(pasta, '*.txt')) if pasta else []:
+        with open(caminho, encoding='utf-8') as arquivo:
+            corpus[os.path.basename(caminho)] = arquivo.read()
+    return corpus
+
+def medir(funcao, texto, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao(texto)
+    return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+if __name__ == '__main__':
+    corpus = montar_corpus(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    divergentes = []
+    for nome, texto in corpus.items():
+        if Extractor.extrair_dados_do_contrato(texto) != extrair_dados_do_contrato_referencia(texto):
+            divergentes.append(nome)
+    print(f'Regressão: {len(corpus) - len(divergentes)}/{len(corpus)} contratos com saída idêntica')
+    for nome in divergentes:
+        print(f'  DIVERGENTE: {nome}')
+
+    print(f'\n{"contrato":<24} {"anterior (ms)":>14} {"atual (ms)":>12}')
+    for nome in ('modelo_5', 'longo', 'sem_campos', 'marcadores_repetidos', 'brasileiros_sem_rg'):
+        texto = corpus[nome]
+        repeticoes = 3 if nome in ('sem_campos', 'marcadores_repetidos', 'brasileiros_sem_rg') else 200
+        anterior = medir(extrair_dados_do_contrato_referencia, texto, repeticoes)
+        atual = medir(Extractor.extrair_dados_do_contrato, texto, repeticoes)
+        print(f'{nome:<24} {anterior:14.3f} {atual:12.3f}')
+
+    _, detalhes = Extractor.extrair_dados_do_contrato_detalhado(corpus['modelo_5'])
+    print('\nDetalhes por campo (modelo_5):')
+    for campo, info in detalhes.items():
+        print(f'  {campo:<24} {info["tempo_ms"]:8.3f} ms  confiança {info["confianca"]:.2f}')
+
+    sys.exit(1 if divergentes else 0)
@@ -0,0 +1,84 @@
+# Arquivo: benchmarks/bench_inicializacao.py
+# Mede a subida de um worker: tempo de importação de cada módulo (python -X importtime)
+# e o tempo total de 'from app import create_app; create_app()', num processo novo.
+# Também avisa se alguma biblioteca pesada (PDF, planilhas, docx) foi carregada no boot:
+# elas devem ser importadas só no primeiro uso.
+#
+# Uso (na pasta Integração): python benchmarks/bench_inicializacao.py [--top N] [--repeticoes N] [--saida medicao.json]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PASTA_PROJETO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Módulos que não devem ser importados pela fábrica da aplicação
+MODULOS_PESADOS = ('PyPDF2', 'openpyxl', 'docx', 'lxml')
+
+CODIGO_DO_BOOT = f"""
+import json, sys, time
+inicio = time.perf_counter()
+from app import create_app
+create_app()
+decorrido = time.perf_counter() - inicio
+print(json.dumps({{'segundos': decorrido, 'pesados': [m for m in {MODULOS_PESADOS!r} if m in sys.modules]}}))
+"""
+
+def medir_boot(banco):
+    """Roda o boot num processo novo. Retorna (resultado do boot, linhas do -X importtime)."""
+    ambiente = {**os.environ, 'DATABASE_URL': f'sqlite:///{banco}'}
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CODIGO_DO_BOOT],
+        cwd=PASTA_PROJETO, env=ambiente, capture_output=True, text=True, check=True,
+    )
+    return json.loads(processo.stdout.strip().splitlines()[-1]), processo.stderr.splitlines()
+
+def tempos_de_importacao(linhas):
+    """{módulo: (próprio µs, acumulado µs)} a partir da saída do -X importtime."""
+    tempos = {}
+    for linha in linhas:
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, acumulado, modulo = linha[len('import time:'):].split('|')
+        tempos[modulo.strip()] = (int(proprio), int(acumulado))
+    return tempos
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mede o tempo de inicialização da aplicação.')
+    parser.add_argument('--top', type=int, default=20, help='Quantos módulos listar (pelo tempo acumulado)')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Quantas vezes subir a aplicação')
+    parser.add_argument('--saida', help='Grava a medição em JSON (para acompanhar entre versões)')
+    args = parser.parse_args()
+
+    banco = os.path.join(tempfile.mkdtemp(), 'boot.db')
+    medicoes = [medir_boot(banco) for _ in range(args.repeticoes)]
+    boots = sorted(resultado['segundos'] for resultado, _ in medicoes)
+    mediana = boots[len(boots) // 2]
+    # Tempos de importação da execução mediana (as primeiras sofrem com o cache de disco frio)
+    resultado, linhas = sorted(medicoes, key=lambda m: m[0]['segundos'])[len(medicoes) // 2]
+    tempos = tempos_de_importacao(linhas)
+
+    print(f'create_app (import + fábrica): mediana {mediana * 1000:.0f} ms  '
+          f'(mín {boots[0] * 1000:.0f} ms, máx {boots[-1] * 1000:.0f} ms, {len(boots)} execuções)')
+    print(f"Import do pacote app: {tempos.get('app', (0, 0))[1] / 1000:.0f} ms, {len(tempos)} módulos importados")
+    print(f'\n{"acumulado":>10} {"próprio":>9}  módulo')
+    for modulo, (proprio, acumulado) in sorted(tempos.items(), key=lambda t: t[1][1], reverse=True)[:args.top]:
+        print(f'{acumulado / 1000:8.1f}ms {proprio / 1000:7.1f}ms  {modulo}')
+
+    if resultado['pesados']:
+        print(f"\nATENÇÃO: importados no boot: {', '.join(resultado['pesados'])}")
+    else:
+        print(f"\nNenhum módulo pesado importado no boot ({', '.join(MODULOS_PESADOS)}).")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump({
+                'boot_segundos': boots,
+                'boot_mediana_segundos': mediana,
+                'modulos_pesados': resultado['pesados'],
+                'importacao_us': {modulo: acumulado for modulo, (_, acumulado) in tempos.items()},
+            }, arquivo, ensure_ascii=False, indent=2)
+        print(f'Medição gravada em {args.saida}')
\ No newline at end of file
@@ -0,0 +1,133 @@
+# Arquivo: benchmarks/bench_listagem_pedidos.py
+# Compara o caminho de leitura da listagem de pedidos (GET /api/pedidos):
+# objetos Pedido do ORM + pedido_to_dict + JSON da biblioteca padrão (caminho antigo)
+# x select() do Core + serializador por linha + orjson (caminho atual).
+# Percorre todos os pedidos em páginas de PEDIDOS_LIMITE_MAXIMO, como um cliente
+# seguindo o X-Next-Cursor, num banco SQLite temporário.
+#
+# Uso (na pasta Integração): python benchmarks/bench_listagem_pedidos.py [quantidade]
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, time as horario, timedelta
+
+PASTA_BANCO = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(PASTA_BANCO, 'bench.db')}"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert, tuple_
+from app import create_app, db
+from app.models import Pedido, User
+from app.pedidos.routes import pedido_to_dict, pagina_por_keyset
+from app.pedidos.leitura import CAMPOS_PEDIDO, consulta_da_listagem, serializador
+from app.serializacao import OrjsonProvider, orjson
+
+PRODUTOS_JSON = (
+    '[{"Quantidade": "100", "Produto": "Brigadeiro", "Valor Unitário": "2,50", "Valor Total Item": "250,00"}, '
+    '{"Quantidade": "200", "Produto": "Beijinho", "Valor Unitário": "2,50", "Valor Total Item": "500,00"}, '
+    '{"Quantidade": "1", "Produto": "Bolo 3kg", "Valor Unitário": "500,00", "Valor Total Item": "500,00"}]'
+)
+
+def popular(quantidade, user_id):
+    inicio = datetime(2025, 1, 1, 8, 0)
+    linhas = [
+        {
+            'clienteNome': f'Cliente {i}', 'dataEvento': date(2025, 1, 1) + timedelta(days=i % 365),
+            'dataRetirada': date(2025, 1, 1) + timedelta(days=i % 365), 'horarioRetirada': horario(10 + i % 8, 0),
+            'tipoPedido': 'Doces finos', 'quantidade': 100 + i % 400, 'sabores': 'Brigadeiro, Beijinho, Bolo 3kg',
+            'tipoEmbalagem': 'Simples', 'observacoes': 'Extraído de contrato.', 'status': 'confirmado',
+            'createdAt': inicio + timedelta(seconds=i), 'updatedAt': inicio + timedelta(seconds=i), 'versao': 1,
+            'user_id': user_id, 'clienteRG': '12.345.678-9', 'clienteCPF': '123.456.789-00',
+            'nomeContratado': 'Divinos Doces Finos', 'cnpjContratado': '18.826.801/0001-76',
+            'valorTotalPedidoContrato': '1.250,00', 'dataPagamentoContrato': date(2025, 1, 1),
+            'localEvento': 'Salão de Festas Central', 'produtosContratadosJson': PRODUTOS_JSON,
+        }
+        for i in range(quantidade)
+    ]
+    db.session.execute(insert(Pedido), linhas)
+    db.session.commit()
+
+def pagina_orm(cursor, limite):
+    """Caminho antigo: Pedido.query com objetos do ORM e pedido_to_dict."""
+    query = Pedido.query
+    if cursor:
+        query = query.filter(tuple_(Pedido.createdAt, Pedido.id) < tuple_(*cursor))
+    pedidos = query.order_by(Pedido.createdAt.desc(), Pedido.id.desc()).limit(limite + 1).all()
+    pagina = pedidos[:limite]
+    proximo = (pagina[-1].createdAt, pagina[-1].id) if len(pedidos) > limite else None
+    return [pedido_to_dict(p) for p in pagina], proximo
+
+def pagina_core(cursor, limite):
+    """Caminho atual: select() do Core e serializador da combinação de campos."""
+    campos = tuple(CAMPOS_PEDIDO)
+    linhas, tem_proxima = pagina_por_keyset(consulta_da_listagem(campos, ['id', 'createdAt']), cursor, limite)
+    serializar = serializador(campos)
+    proximo = (linhas[-1].createdAt, linhas[-1].id) if tem_proxima else None
+    return [serializar(linha) for linha in linhas], proximo
+
+def percorrer(paginar, provider, limite):
+    """Lê todas as páginas e codifica cada uma. Retorna (segundos na leitura, segundos no JSON, pedidos, bytes)."""
+    leitura = codificacao = 0.0
+    total = tamanho = 0
+    cursor = None
+    while True:
+        inicio = time.perf_counter()
+        pedidos, cursor = paginar(cursor, limite)
+        meio = time.perf_counter()
+        corpo = provider.response(pedidos).get_data()
+        leitura += meio - inicio
+        codificacao += time.perf_counter() - meio
+        total += len(pedidos)
+        tamanho += len(corpo)
+        db.session.remove()
+        if cursor is None:
+            return leitura, codificacao, total, tamanho
+
+def memoria_por_pagina(paginar, provider, limite):
+    """Pico de memória alocada (tracemalloc) ao montar e codificar uma página."""
+    paginar(None, limite)
+    db.session.remove()
+    tracemalloc.start()
+    pedidos, _ = paginar(None, limite)
+    provider.response(pedidos)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.session.remove()
+    return pico
+
+def medir(nome, paginar, provider, limite):
+    percorrer(paginar, provider, limite)  # Aquecimento (cache de páginas do SQLite e das consultas compiladas)
+    leitura, codificacao, total, tamanho = percorrer(paginar, provider, limite)
+    pico = memoria_por_pagina(paginar, provider, limite)
+    decorrido = leitura + codificacao
+    print(
+        f'{nome:<34} {decorrido:6.2f} s  (leitura {leitura:5.2f} s, JSON {codificacao:5.2f} s)  '
+        f'{decorrido * 1e6 / total:6.1f} µs/pedido  pico {pico / 1024:7.0f} KiB/página  [{total} pedidos, {tamanho / 1e6:.0f} MB]'
+    )
+    return decorrido
+
+if __name__ == '__main__':
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        usuario = User(email='bench@exemplo.com', password_hash='x')
+        db.session.add(usuario)
+        db.session.commit()
+        print(f'Gerando {quantidade} pedidos...')
+        popular(quantidade, usuario.id)
+
+        limite = app.config['PEDIDOS_LIMITE_MAXIMO']
+        padrao = DefaultJSONProvider(app)
+        rapido = OrjsonProvider(app) if orjson is not None else padrao
+        if orjson is None:
+            print('orjson não instalado: o caminho atual usa o JSON da biblioteca padrão.')
+
+        antigo = medir('ORM + pedido_to_dict + json', pagina_orm, padrao, limite)
+        medir('Core + serializador + json', pagina_core, padrao, limite)
+        novo = medir('Core + serializador + orjson', pagina_core, rapido, limite)
+        print(f'Ganho: {antigo / novo:.1f}x')
\ No newline at end of file
@@ -0,0 +1,171 @@
+# Arquivo: benchmarks/verificar_migracoes.py
+# Verificação das migrações (flask migrar) num banco SQLite temporário:
+#   1. banco com o esquema original (datas em texto, sem índices), com pedidos em
+#      formatos de data misturados, atualizado até a última migração;
+#   2. banco novo (create_all + migrações).
+# Os dois precisam terminar com as mesmas tabelas, colunas e índices, as datas
+# convertidas, e um segundo 'flask migrar' não pode ter nada a aplicar.
+#
+# Uso (na pasta Integração): python benchmarks/verificar_migracoes.py
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+PASTA_PROJETO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Esquema do banco antes da primeira migração (congelado: não acompanha o modelo)
+ESQUEMA_ORIGINAL = '''
+CREATE TABLE user (
+    id INTEGER NOT NULL,
+    email VARCHAR(120) NOT NULL,
+    password_hash VARCHAR(256) NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (email)
+);
+CREATE TABLE pedido (
+    id INTEGER NOT NULL,
+    "clienteNome" VARCHAR(150) NOT NULL,
+    "dataEvento" VARCHAR(10) NOT NULL,
+    "dataRetirada" VARCHAR(10) NOT NULL,
+    "horarioRetirada" VARCHAR(5) NOT NULL,
+    "tipoPedido" VARCHAR(100) NOT NULL,
+    quantidade INTEGER NOT NULL,
+    sabores TEXT,
+    "tipoEmbalagem" VARCHAR(100),
+    observacoes TEXT,
+    status VARCHAR(50) NOT NULL,
+    "createdAt" DATETIME NOT NULL,
+    "clienteRG" VARCHAR(20),
+    "clienteCPF" VARCHAR(20),
+    "nomeContratado" VARCHAR(150),
+    "cnpjContratado" VARCHAR(20),
+    "valorTotalPedidoContrato" VARCHAR(50),
+    "dataPagamentoContrato" VARCHAR(10),
+    "localEvento" VARCHAR(200),
+    "produtosContratadosJson" TEXT,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES user (id)
+);
+'''
+
+PRODUTOS = '[{"Quantidade": "10", "Produto": "Brigadeiro", "Valor Unitário": "2,50", "Valor Total Item": "25,00"}]'
+
+# (id, dataEvento, dataRetirada, horarioRetirada, dataPagamentoContrato, status)
+PEDIDOS_ORIGINAIS = [
+    (1, '2025-04-11', '2025-04-11', '12:00', None, 'pendente'),
+    (2, '02/07/2025', '02/07/2025', '10h30', '01/06/2025', 'confirmado'),
+    (3, '02-07-2025', '03-07-2025', '09:00:00', '', 'confirmado'),
+    (4, 'sem data', 'xx', '??', 'nunca', 'pendente'),
+]
+
+# Valores esperados depois da 0001 (os inválidos obrigatórios viram a data de criação)
+DATAS_ESPERADAS = {
+    1: ('2025-04-11', '2025-04-11', '12:00:00.000000', None),
+    2: ('2025-07-02', '2025-07-02', '10:30:00.000000', '2025-06-01'),
+    3: ('2025-07-02', '2025-07-03', '09:00:00.000000', None),
+    4: ('2025-01-01', '2025-01-01', '08:00:00.000000', None),
+}
+
+def criar_banco_original(caminho):
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript(ESQUEMA_ORIGINAL)
+    conexao.execute("INSERT INTO user (id, email, password_hash) VALUES (1, 'a@exemplo.com', 'x')")
+    for pedido_id, evento, retirada, horario, pagamento, status in PEDIDOS_ORIGINAIS:
+        conexao.execute(
+            'INSERT INTO pedido (id, "clienteNome", "dataEvento", "dataRetirada", "horarioRetirada", '
+            '"tipoPedido", quantidade, status, "createdAt", "dataPagamentoContrato", '
+            '"produtosContratadosJson", user_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)',
+            (pedido_id, f'Cliente {pedido_id}', evento, retirada, horario, 'Doces finos', 10, status,
+             '2025-01-01 08:00:00.000000', pagamento, PRODUTOS),
+        )
+    conexao.commit()
+    conexao.close()
+
+def migrar(caminho):
+    """Roda 'flask migrar' num processo novo (a Config lê a DATABASE_URL na importação)."""
+    ambiente = {**os.environ, 'DATABASE_URL': f'sqlite:///{caminho}', 'FLASK_APP': 'run.py'}
+    processo = subprocess.run(
+        [sys.executable, '-m', 'flask', 'migrar'],
+        cwd=PASTA_PROJETO, env=ambiente, capture_output=True, text=True,
+    )
+    if processo.returncode != 0:
+        raise SystemExit(f'flask migrar falhou em {caminho}:\n{processo.stdout}\n{processo.stderr}')
+    return processo.stdout
+
+def esquema(caminho):
+    """{tabela: (colunas, índices)} com os índices como (nome, colunas, único)."""
+    conexao = sqlite3.connect(caminho)
+    resultado = {}
+    tabelas = [linha[0] for linha in conexao.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    for tabela in tabelas:
+        colunas = {linha[1] for linha in conexao.execute(f'PRAGMA table_info("{tabela}")')}
+        indices = set()
+        for _, nome, unico, origem, _ in conexao.execute(f'PRAGMA index_list("{tabela}")'):
+            if origem != 'c':
+                continue  # Índices implícitos de PRIMARY KEY/UNIQUE
+            colunas_indice = tuple(linha[2] for linha in conexao.execute(f'PRAGMA index_info("{nome}")'))
+            indices.add((nome, colunas_indice, bool(unico)))
+        resultado[tabela] = (colunas, indices)
+    conexao.close()
+    return resultado
+
+def comparar(atualizado, novo):
+    erros = []
+    for tabela in sorted(set(atualizado) | set(novo)):
+        if tabela not in atualizado or tabela not in novo:
+            erros.append(f'tabela {tabela} só existe em um dos bancos')
+            continue
+        colunas_a, indices_a = atualizado[tabela]
+        colunas_n, indices_n = novo[tabela]
+        if colunas_a != colunas_n:
+            erros.append(f'{tabela}: colunas diferentes {sorted(colunas_a ^ colunas_n)}')
+        for indice in sorted(indices_a - indices_n):
+            erros.append(f'{tabela}: índice só no banco atualizado {indice}')
+        for indice in sorted(indices_n - indices_a):
+            erros.append(f'{tabela}: índice só no banco novo {indice}')
+    return erros
+
+def conferir_dados(caminho):
+    conexao = sqlite3.connect(caminho)
+    erros = []
+    linhas = conexao.execute(
+        'SELECT id, "dataEvento", "dataRetirada", "horarioRetirada", "dataPagamentoContrato" FROM pedido ORDER BY id')
+    for pedido_id, *datas in linhas:
+        if tuple(datas) != DATAS_ESPERADAS[pedido_id]:
+            erros.append(f'pedido {pedido_id}: datas {tuple(datas)}, esperado {DATAS_ESPERADAS[pedido_id]}')
+    for nome, consulta, esperado in (
+        ('itens', 'SELECT count(*) FROM pedido_item', len(PEDIDOS_ORIGINAIS)),
+        ('versões', 'SELECT count(*) FROM pedido WHERE versao = 1 AND "updatedAt" = "createdAt"', len(PEDIDOS_ORIGINAIS)),
+        ('métricas', "SELECT sum(pedidos) FROM metrica_diaria WHERE dimensao = 'status'", len(PEDIDOS_ORIGINAIS)),
+    ):
+        valor = conexao.execute(consulta).fetchone()[0]
+        if valor != esperado:
+            erros.append(f'{nome}: {valor}, esperado {esperado}')
+    conexao.close()
+    return erros
+
+if __name__ == '__main__':
+    pasta = tempfile.mkdtemp()
+    original = os.path.join(pasta, 'original.db')
+    novo = os.path.join(pasta, 'novo.db')
+
+    criar_banco_original(original)
+    print(migrar(original).strip())
+    segunda = migrar(original)
+    migrar(novo)
+
+    erros = comparar(esquema(original), esquema(novo)) + conferir_dados(original)
+    if 'Nenhuma migração pendente' not in segunda:
+        erros.append(f'o segundo flask migrar ainda aplicou migrações:\n{segunda}')
+
+    if erros:
+        print('\nFALHOU:')
+        for erro in erros:
+            print(f'  - {erro}')
+        sys.exit(1)
+    print('\nOK: banco original atualizado igual ao banco novo (tabelas, colunas e índices) e dados convertidos.')
\ No newline at end of file
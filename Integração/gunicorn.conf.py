@@ -0,0 +1,33 @@
+# Arquivo: gunicorn.conf.py
+# Configuração do Gunicorn, lida automaticamente ao rodar nesta pasta: gunicorn wsgi:app
+#
+# Com preload_app a aplicação é criada uma única vez no processo mestre e os workers
+# nascem por fork com os módulos já importados, então sobem quase na hora (no deploy
+# e quando o autoscaling cria instâncias). create_app não abre conexões com o banco,
+# mas cada worker ainda descarta o pool herdado do mestre (post_fork) para nunca
+# compartilhar uma conexão entre processos.
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Workers com threads: cada stream de GET /api/pedidos/stream ocupa uma thread enquanto
+# está aberto. Cada worker aceita no máximo EVENTOS_MAX_STREAMS_POR_WORKER streams (padrão 4,
+# metade das threads) e responde 503 com Retry-After aos seguintes, para as demais
+# requisições sempre terem thread livre; o limite precisa ficar abaixo de GUNICORN_THREADS.
+# Com muitas telas abertas, rode os streams num pool de workers separado, atrás do proxy
+# (só /api/pedidos/stream vai para ele), com mais threads e o limite perto delas, ex.:
+#   GUNICORN_BIND=127.0.0.1:8001 GUNICORN_THREADS=64 EVENTOS_MAX_STREAMS_POR_WORKER=60 gunicorn wsgi:app
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+    from wsgi import app
+    from app import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
\ No newline at end of file